@@ -1,22 +1,26 @@
+import time
+
+# Início da execução do script, para medir o tempo até a primeira tela
+INICIO_SCRIPT = time.perf_counter()
+
+import os
+import tempfile
+from datetime import date
+from pathlib import Path
+
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import io
-from datetime import datetime, date
-import numpy as np
-
-# Configuração da página
-st.set_page_config(
-    page_title="📊 Relatório de Cursos",
-    page_icon="📚",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
+
+from cache import all_stats, get_bytes_cache, get_cache, hash_bytes
+from profiling import StageTimer, cache_deltas, capture_profile, etapa, first_run, log_rerun
+
+# pandas, numpy, plotly e os módulos do pipeline e do relatório são importados
+# dentro das funções que os usam: a tela de upload aparece sem carregá-los
+
+# Ícone da barra lateral, servido do próprio app (sem requisição externa a cada rerun)
+ICONE_SIDEBAR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'assets', 'icone_treinamento.svg')
 
 # CSS customizado
-st.markdown("""
+CSS = """
 <style>
     .main-header {
         font-size: 2.5rem;
@@ -70,68 +74,26 @@ st.markdown("""
         border-left: 4px solid #dc3545;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
 
 
-def load_data(uploaded_file):
-    """Carrega os dados do arquivo Excel"""
-    xl = pd.ExcelFile(uploaded_file)
-    
-    # Identifica as abas (pode ser Plano/Real ou Plano/Realizado)
-    sheet_names = xl.sheet_names
-    
-    df_plano = pd.read_excel(xl, 'Plano')
-    
-    # Tenta encontrar a aba de realizados
-    real_sheet = 'Real' if 'Real' in sheet_names else 'Realizado'
-    df_real = pd.read_excel(xl, real_sheet)
-    
-    return df_plano, df_real
+# Acima deste número de colaboradores os gráficos por pessoa passam para o modo
+# de times grandes: só os destaques (em WebGL) mais histogramas da distribuição
+LIMITE_GRAFICO_COMPLETO = 60
+N_DESTAQUES = 15
 
 
-def process_data(df_plano, df_real):
-    """Processa e agrega os dados"""
-    
-    # Normaliza a coluna de finalização
-    df_real['Status'] = df_real['Finalizou o curso?'].apply(
-        lambda x: 'Concluído' if str(x).lower() in ['sim', 'yes', 's'] else 
-                  ('Em Andamento' if str(x).lower() in ['em andamento', 'andamento', 'in progress'] else 'Pendente')
-    )
+def create_bar_chart(df_merged, limite=LIMITE_GRAFICO_COMPLETO, n_destaques=N_DESTAQUES):
+    """Cria gráfico de barras horizontais comparando planejado vs realizado
     
-    # Verifica se tem data de início para classificar como "Em Andamento"
-    if 'Data de início' in df_real.columns:
-        df_real['Status'] = df_real.apply(
-            lambda row: 'Em Andamento' if (row['Status'] == 'Pendente' and 
-                                           pd.notna(row['Data de início']) and 
-                                           str(row['Data de início']) != '-') else row['Status'],
-            axis=1
-        )
-    
-    # Calcula horas realizadas por colaborador
-    df_real['Horas_Realizadas'] = df_real.apply(
-        lambda row: row['Carga Horária'] if row['Status'] == 'Concluído' else 0,
-        axis=1
-    )
-    
-    # Agrupa por colaborador
-    horas_realizadas = df_real.groupby(['Id colaborador(a)', 'Colaborador(a)'])['Horas_Realizadas'].sum().reset_index()
+    Com mais de `limite` colaboradores, mostra só os `n_destaques` de menor e de
+    maior progresso (a distribuição completa fica em create_distribution_chart).
+    """
+    import plotly.graph_objects as go
     
-    # Merge com plano
-    df_merged = pd.merge(
-        df_plano,
-        horas_realizadas,
-        on=['Id colaborador(a)', 'Colaborador(a)'],
-        how='left'
-    )
-    df_merged['Horas_Realizadas'] = df_merged['Horas_Realizadas'].fillna(0)
-    df_merged['Percentual'] = (df_merged['Horas_Realizadas'] / df_merged['horas totais'] * 100).round(1)
-    df_merged['Horas_Pendentes'] = df_merged['horas totais'] - df_merged['Horas_Realizadas']
+    if len(df_merged) > limite:
+        return _create_progress_highlights(df_merged, n_destaques)
     
-    return df_merged, df_real
-
-
-def create_bar_chart(df_merged):
-    """Cria gráfico de barras horizontais comparando planejado vs realizado"""
     df_sorted = df_merged.sort_values('Percentual', ascending=True)
     
     fig = go.Figure()
@@ -175,12 +137,85 @@ def create_bar_chart(df_merged):
     return fig
 
 
-def create_pie_chart(df_merged):
-    """Cria gráfico de pizza com percentual geral de conclusão"""
-    total_planejado = df_merged['horas totais'].sum()
-    total_realizado = df_merged['Horas_Realizadas'].sum()
-    total_pendente = total_planejado - total_realizado
-    percentual_geral = (total_realizado / total_planejado * 100)
+def _create_progress_highlights(df_merged, n_destaques):
+    """Menores e maiores percentuais de conclusão, em pontos WebGL (tamanho fixo)"""
+    import plotly.graph_objects as go
+    
+    menores = df_merged.nsmallest(n_destaques, 'Percentual')
+    maiores = df_merged.nlargest(n_destaques, 'Percentual').iloc[::-1]
+    
+    fig = go.Figure()
+    for df_destaque, nome in ((menores, f'{n_destaques} menores'), (maiores, f'{n_destaques} maiores')):
+        fig.add_trace(go.Scattergl(
+            x=df_destaque['Percentual'],
+            y=df_destaque['Colaborador(a)'],
+            name=nome,
+            mode='markers',
+            marker=dict(
+                size=12,
+                color=df_destaque['Percentual'].apply(
+                    lambda x: '#28a745' if x >= 70 else ('#ffc107' if x >= 30 else '#dc3545')
+                ),
+            ),
+            hovertemplate='<b>%{y}</b><br>%{x:.1f}% concluído<br>%{customdata[0]:.0f}h de %{customdata[1]:.0f}h<extra></extra>',
+            customdata=df_destaque[['Horas_Realizadas', 'horas totais']].values
+        ))
+    
+    fig.update_layout(
+        title=f'📊 Progresso: {n_destaques} menores e {n_destaques} maiores de {len(df_merged)} colaboradores',
+        height=max(400, 2 * n_destaques * 22),
+        xaxis=dict(title='% concluído', range=[0, max(df_merged['Percentual'].max(), 100) * 1.05]),
+        yaxis=dict(title='', categoryorder='array', categoryarray=list(menores['Colaborador(a)']) + list(maiores['Colaborador(a)'])),
+        legend=dict(orientation='h', yanchor='bottom', y=1.02, xanchor='right', x=1),
+        margin=dict(l=10, r=10, t=60, b=40)
+    )
+    
+    return fig
+
+
+def create_distribution_chart(df, coluna, titulo, eixo_x, n_bins=20, cor='#4A6FA5'):
+    """Histograma de uma coluna, com as faixas calculadas no servidor
+    
+    Só as contagens por faixa são enviadas ao navegador, então o tamanho da
+    figura não cresce com o número de colaboradores.
+    """
+    import numpy as np
+    import plotly.graph_objects as go
+    
+    valores = df[coluna].to_numpy(dtype=float)
+    valores = valores[np.isfinite(valores)]
+    contagens, bordas = np.histogram(valores, bins=n_bins)
+    
+    fig = go.Figure(go.Bar(
+        x=(bordas[:-1] + bordas[1:]) / 2,
+        y=contagens,
+        width=np.diff(bordas),
+        marker_color=cor,
+        customdata=np.column_stack([bordas[:-1], bordas[1:]]),
+        hovertemplate='%{customdata[0]:.1f} a %{customdata[1]:.1f}: <b>%{y}</b> colaboradores<extra></extra>'
+    ))
+    
+    fig.update_layout(
+        title=titulo,
+        height=300,
+        xaxis_title=eixo_x,
+        yaxis_title='Colaboradores',
+        bargap=0.05,
+        margin=dict(l=10, r=10, t=60, b=40),
+        showlegend=False
+    )
+    
+    return fig
+
+
+def create_pie_chart(cubo):
+    """Cria gráfico de pizza com percentual geral de conclusão a partir do KpiCube"""
+    import plotly.graph_objects as go
+    
+    total_planejado = cubo.total_planejado
+    total_realizado = cubo.total_realizado
+    total_pendente = cubo.total_pendente
+    percentual_geral = cubo.percentual_geral
     
     fig = go.Figure(data=[go.Pie(
         labels=['Concluído', 'Pendente'],
@@ -210,114 +245,91 @@ def create_pie_chart(df_merged):
 
 
 def calcular_dias_uteis_2026(data_inicio, data_fim):
-    """Calcula dias úteis entre duas datas, descontando fins de semana e feriados nacionais de 2026"""
-    
-    # Feriados nacionais de 2026 (Brasil)
-    feriados_2026 = [
-        date(2026, 1, 1),   # Confraternização Universal
-        date(2026, 2, 16),  # Carnaval (segunda)
-        date(2026, 2, 17),  # Carnaval (terça)
-        date(2026, 2, 18),  # Quarta de cinzas (ponto facultativo, mas muitas empresas emendam)
-        date(2026, 4, 3),   # Sexta-feira Santa
-        date(2026, 4, 21),  # Tiradentes
-        date(2026, 5, 1),   # Dia do Trabalho
-        date(2026, 6, 4),   # Corpus Christi
-        date(2026, 9, 7),   # Independência do Brasil
-        date(2026, 10, 12), # Nossa Senhora Aparecida
-        date(2026, 11, 2),  # Finados
-        date(2026, 11, 15), # Proclamação da República
-        date(2026, 12, 25), # Natal
-    ]
-    
-    dias_uteis = 0
-    data_atual = data_inicio
-    
-    while data_atual <= data_fim:
-        # Verifica se não é fim de semana (0=segunda, 6=domingo)
-        if data_atual.weekday() < 5:  # Segunda a sexta
-            # Verifica se não é feriado
-            if data_atual not in feriados_2026:
-                dias_uteis += 1
-        data_atual += pd.Timedelta(days=1)
-    
-    return dias_uteis
-
-
-def create_pace_chart(df_merged):
-    """Cria gráfico de ritmo necessário para cada colaborador cumprir o prazo"""
-    
-    # Configurações
-    data_atual = date.today()
-    data_limite = date(2026, 12, 20)
-    
-    # Calcula dias totais e dias úteis
-    dias_totais = (data_limite - data_atual).days
-    dias_uteis_total = calcular_dias_uteis_2026(data_atual, data_limite)
-    
-    # Considera apenas 70% dos dias úteis (margem para imprevistos, reuniões, etc.)
-    dias_uteis = int(dias_uteis_total * 0.70)
-    
-    # Calcula ritmo necessário para cada colaborador
-    df_pace = df_merged.copy()
-    df_pace['Horas_Restantes'] = df_pace['horas totais'] - df_pace['Horas_Realizadas']
-    df_pace['Ritmo_Necessario'] = (df_pace['Horas_Restantes'] / dias_uteis).round(2)
-    
-    # Calcula ritmo ideal (horas totais / dias efetivos - o que deveria fazer desde o início)
-    df_pace['Ritmo_Ideal'] = (df_pace['horas totais'] / dias_uteis).round(2)
-    
-    # Classifica o status por valores fixos
-    def classify_status(ritmo):
-        if ritmo <= 0:
-            return '✅ Concluído'
-        elif ritmo <= 1:
-            return '🔵 Tranquilo'
-        elif ritmo <= 1.5:
-            return '🟢 Bom Ritmo'
-        elif ritmo <= 2:
-            return '🟡 Atenção'
-        elif ritmo <= 3:
-            return '🟠 Crítico'
-        else:
-            return '🔴 Plano de Ação'
+    """Calcula dias úteis entre duas datas, descontando fins de semana e feriados
     
-    df_pace['Status_Ritmo'] = df_pace['Ritmo_Necessario'].apply(classify_status)
+    Mantida por compatibilidade: delega ao calendário de `business_calendar`,
+    que cobre qualquer ano e memoiza os resultados.
+    """
+    import business_calendar
+    import pace
     
-    # Ordena pelo ritmo necessário (mais crítico primeiro)
-    df_pace = df_pace.sort_values('Ritmo_Necessario', ascending=True)
+    return business_calendar.count_business_days(data_inicio, data_fim, pace.REGIAO_FERIADOS)
+
+
+def create_pace_chart(df_merged, limite=LIMITE_GRAFICO_COMPLETO, n_destaques=N_DESTAQUES, parametros=None, base=None):
+    """Cria gráfico de ritmo necessário para cada colaborador cumprir o prazo
     
-    # Define cores baseadas no ritmo (valores fixos)
-    colors = df_pace['Ritmo_Necessario'].apply(
-        lambda x: '#28a745' if x <= 0 else ('#3498db' if x <= 1 else ('#2ecc71' if x <= 1.5 else ('#f1c40f' if x <= 2 else ('#e67e22' if x <= 3 else '#e74c3c'))))
-    ).tolist()
+    Com mais de `limite` colaboradores, o gráfico mostra só os `n_destaques`
+    de maior ritmo necessário; o df_pace retornado continua completo.
+    `parametros` é o cenário (pace.PaceParams; padrão: prazo 20/12/2026, 70%
+    dos dias úteis) e `base` os arrays de horas já extraídos do df_merged.
+    """
+    import plotly.graph_objects as go
     
-    fig = go.Figure()
+    import pace
     
-    # Barras do ritmo necessário atual
-    fig.add_trace(go.Bar(
-        y=df_pace['Colaborador(a)'],
-        x=df_pace['Ritmo_Necessario'],
-        orientation='h',
-        name='Ritmo Necessário',
-        marker_color=colors,
-        text=df_pace.apply(lambda row: f"{row['Ritmo_Necessario']:.1f}h/dia" if row['Ritmo_Necessario'] > 0 else "✅", axis=1),
-        textposition='outside',
-        textfont=dict(size=11, color='#333'),
-        hovertemplate='<b>%{y}</b><br>Ritmo necessário: %{x:.2f}h/dia<br>Horas restantes: %{customdata[0]:.0f}h<br>Ritmo ideal: %{customdata[1]:.2f}h/dia<extra></extra>',
-        customdata=df_pace[['Horas_Restantes', 'Ritmo_Ideal']].values
-    ))
+    parametros = parametros or pace.PARAMETROS_PADRAO
+    base = base if base is not None else pace.pace_base(df_merged)
+    
+    # Dias corridos, dias úteis e dias efetivos (fração dos úteis, margem para imprevistos)
+    dias_totais, dias_uteis_total, dias_uteis = pace.deadline_days(parametros)
     
-    # Linhas de referência fixas
-    fig.add_vline(x=1.5, line_dash="dash", line_color="#2ecc71", line_width=2, 
-                  annotation_text="1.5h/dia (ideal)", annotation_position="top")
-    fig.add_vline(x=2, line_dash="dash", line_color="#e74c3c", line_width=2,
-                  annotation_text="2h/dia (máx)", annotation_position="top")
+    # Ritmo necessário, ritmo ideal (o que deveria fazer desde o início) e faixa de cada colaborador
+    ritmo, ritmo_ideal, codigos = pace.compute_pace(base, dias_uteis, parametros.faixas)
+    df_pace = df_merged.copy()
+    df_pace['Horas_Restantes'] = base.horas_restantes
+    df_pace['Ritmo_Necessario'] = ritmo
+    df_pace['Ritmo_Ideal'] = ritmo_ideal
+    df_pace['Status_Ritmo'] = pace.ROTULOS_FAIXA[codigos]
+    df_pace['_cor'] = pace.CORES_FAIXA[codigos]
+    
+    # Ordena pelo ritmo necessário (mais crítico primeiro)
+    df_pace = df_pace.sort_values('Ritmo_Necessario', ascending=True)
+    colors = df_pace.pop('_cor').tolist()
+    
+    fig = go.Figure()
     
+    if len(df_pace) > limite:
+        # Times grandes: só os piores ritmos, em pontos WebGL
+        df_destaque = df_pace.tail(n_destaques)
+        fig.add_trace(go.Scattergl(
+            y=df_destaque['Colaborador(a)'],
+            x=df_destaque['Ritmo_Necessario'],
+            mode='markers',
+            name='Ritmo Necessário',
+            marker=dict(size=12, color=colors[-len(df_destaque):]),
+            hovertemplate='<b>%{y}</b><br>Ritmo necessário: %{x:.2f}h/dia<br>Horas restantes: %{customdata[0]:.0f}h<br>Ritmo ideal: %{customdata[1]:.2f}h/dia<extra></extra>',
+            customdata=df_destaque[['Horas_Restantes', 'Ritmo_Ideal']].values
+        ))
+        fig.update_layout(yaxis=dict(categoryorder='array', categoryarray=list(df_destaque['Colaborador(a)'])))
+    else:
+        # Barras do ritmo necessário atual
+        fig.add_trace(go.Bar(
+            y=df_pace['Colaborador(a)'],
+            x=df_pace['Ritmo_Necessario'],
+            orientation='h',
+            name='Ritmo Necessário',
+            marker_color=colors,
+            text=df_pace.apply(lambda row: f"{row['Ritmo_Necessario']:.1f}h/dia" if row['Ritmo_Necessario'] > 0 else "✅", axis=1),
+            textposition='outside',
+            textfont=dict(size=11, color='#333'),
+            hovertemplate='<b>%{y}</b><br>Ritmo necessário: %{x:.2f}h/dia<br>Horas restantes: %{customdata[0]:.0f}h<br>Ritmo ideal: %{customdata[1]:.2f}h/dia<extra></extra>',
+            customdata=df_pace[['Horas_Restantes', 'Ritmo_Ideal']].values
+        ))
+    
+    # Linhas de referência do cenário
+    fig.add_vline(x=parametros.ritmo_ideal, line_dash="dash", line_color="#2ecc71", line_width=2, 
+                  annotation_text=f"{parametros.ritmo_ideal:g}h/dia (ideal)", annotation_position="top")
+    fig.add_vline(x=parametros.ritmo_maximo, line_dash="dash", line_color="#e74c3c", line_width=2,
+                  annotation_text=f"{parametros.ritmo_maximo:g}h/dia (máx)", annotation_position="top")
+    
+    destaque = f' ({n_destaques} maiores de {len(df_pace)})' if len(df_pace) > limite else ''
     fig.update_layout(
-        title=f'⏱️ Ritmo Necessário para Concluir até 20/12/2026<br><sub>Restam {dias_totais} dias corridos | {dias_uteis_total} dias úteis | <b>{dias_uteis} dias efetivos (70%)</b></sub>',
-        height=400,
+        title=f'⏱️ Ritmo Necessário para Concluir até {parametros.data_limite:%d/%m/%Y}{destaque}<br><sub>Restam {dias_totais} dias corridos | {dias_uteis_total} dias úteis | <b>{dias_uteis} dias efetivos ({parametros.fator_efetivo:.0%})</b></sub>',
+        height=max(400, n_destaques * 26) if len(df_pace) > limite else 400,
         xaxis_title='Horas por dia efetivo necessárias',
         yaxis_title='',
-        xaxis=dict(range=[0, max(df_pace['Ritmo_Necessario'].max() * 1.3, df_pace['Ritmo_Ideal'].max() * 1.3, 3)]),
+        xaxis=dict(range=[0, max(df_pace['Ritmo_Necessario'].max() * 1.3, df_pace['Ritmo_Ideal'].max() * 1.3, parametros.faixas[-1])]),
         margin=dict(l=10, r=80, t=80, b=40),
         showlegend=False
     )
@@ -325,8 +337,53 @@ def create_pace_chart(df_merged):
     return fig, df_pace, dias_totais, dias_uteis, dias_uteis_total
 
 
+def create_burnup_chart(df_evolucao, titulo):
+    """Cria gráfico de burn-up (horas realizadas x planejadas) a partir do histórico"""
+    import plotly.graph_objects as go
+    
+    fig = go.Figure()
+    
+    fig.add_trace(go.Scatter(
+        x=df_evolucao['data_referencia'],
+        y=df_evolucao['total_planejado'],
+        mode='lines',
+        name='Planejado',
+        line=dict(color='#1E3A5F', dash='dash', width=2),
+        hovertemplate='%{x|%d/%m/%Y}<br>Planejado: %{y:.0f}h<extra></extra>'
+    ))
+    
+    fig.add_trace(go.Scatter(
+        x=df_evolucao['data_referencia'],
+        y=df_evolucao['total_realizado'],
+        mode='lines+markers',
+        name='Realizado',
+        line=dict(color='#28a745', width=3),
+        fill='tozeroy',
+        fillcolor='rgba(40, 167, 69, 0.15)',
+        customdata=df_evolucao['percentual'],
+        hovertemplate='%{x|%d/%m/%Y}<br>Realizado: %{y:.0f}h (%{customdata:.1f}%)<extra></extra>'
+    ))
+    
+    fig.update_layout(
+        title=titulo,
+        xaxis_title='Data do upload',
+        yaxis_title='Horas',
+        height=380,
+        margin=dict(l=10, r=10, t=60, b=10),
+        legend=dict(orientation='h', yanchor='bottom', y=1.02, xanchor='right', x=1),
+        plot_bgcolor='white',
+        hovermode='x unified'
+    )
+    fig.update_xaxes(showgrid=True, gridcolor='#f0f0f0')
+    fig.update_yaxes(showgrid=True, gridcolor='#f0f0f0', rangemode='tozero')
+    
+    return fig
+
+
 def create_gauge_chart(percentual, nome):
     """Cria gráfico de gauge para progresso individual"""
+    import plotly.graph_objects as go
+    
     color = '#28a745' if percentual >= 70 else ('#ffc107' if percentual >= 30 else '#dc3545')
     
     fig = go.Figure(go.Indicator(
@@ -360,16 +417,72 @@ def create_gauge_chart(percentual, nome):
     return fig
 
 
-def create_status_table(df_real, colaborador):
+# Cache de figuras Plotly, compartilhado entre reruns e sessões
+FIGURE_CACHE_MAX_ENTRIES = 64
+
+
+def dataset_fingerprint(df):
+    """Hash do conteúdo de um DataFrame (valores e índice), usado em chaves de cache"""
+    import pandas as pd
+    
+    return hash_bytes(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+
+
+def cached_figure(tipo, builder, *args, chave_dataset=None, data_referencia=None, cenario=None, **params):
+    """Retorna builder(*args, **params), reaproveitando o resultado se já foi construído
+    
+    A chave é (chave_dataset, tipo, params, data_referencia, cenario). Os dados
+    em `args` não entram na chave: são identificados por `chave_dataset` (veja
+    dataset_fingerprint). Use `data_referencia` para figuras que dependem da
+    data atual, como o gráfico de ritmo, e `cenario` para as que dependem dos
+    parâmetros do simulador de prazo.
+    """
+    chave = (chave_dataset, tipo, tuple(sorted(params.items())), data_referencia, cenario)
+    cache = get_cache('figuras', max_entries=FIGURE_CACHE_MAX_ENTRIES)
+    resultado, _ = cache.get_or_compute(chave, lambda: builder(*args, **params))
+    return resultado
+
+
+def cached_forecast(df_merged, df_real, chave, data_limite):
+    """Previsão Monte Carlo do dataset, refeita só quando muda o dataset, o prazo ou o dia"""
+    import forecast
+    import pace
+    
+    cache = get_cache('previsao', max_entries=FIGURE_CACHE_MAX_ENTRIES)
+    with etapa('previsao', linhas=len(df_merged)):
+        return cache.get_or_compute(
+            (chave, data_limite, date.today()),
+            lambda: forecast.forecast_completion(df_merged, df_real, data_limite, regiao=pace.REGIAO_FERIADOS)
+        )[0]
+
+
+def cached_pace_base(df_merged, chave_dataset):
+    """Horas restantes e totais por colaborador, extraídas uma vez por dataset"""
+    import pace
+    
+    cache = get_cache('ritmo_base', max_entries=FIGURE_CACHE_MAX_ENTRIES)
+    return cache.get_or_compute(chave_dataset, lambda: pace.pace_base(df_merged))[0]
+
+
+def cached_kpi_cube(df_merged, df_real, chave):
+    """KpiCube do dataset, montado uma vez por `chave` e reaproveitado nos reruns"""
+    import kpis
+    
+    cache = get_cache('kpis', max_entries=FIGURE_CACHE_MAX_ENTRIES)
+    with etapa('cubo_kpis', linhas=len(df_real)):
+        return cache.get_or_compute(chave, lambda: kpis.build_kpi_cube(df_merged, df_real))[0]
+
+
+def create_status_table(df_real, colaborador, grupos=None):
     """Cria tabela de status dos cursos por colaborador"""
-    df_colab = df_real[df_real['Colaborador(a)'] == colaborador].copy()
+    import pipeline
     
-    # Ordena por status
-    status_order = {'Concluído': 0, 'Em Andamento': 1, 'Pendente': 2}
-    df_colab['Status_Order'] = df_colab['Status'].map(status_order)
-    df_colab = df_colab.sort_values('Status_Order')
+    if grupos is None:
+        grupos = pipeline.GroupIndex(df_real)
+    df_colab = grupos.get(colaborador)
     
-    return df_colab[['Curso', 'Carga Horária', 'Status']]
+    # Ordena por status (a ordem das categorias é Concluído, Em Andamento, Pendente)
+    return df_colab[['Curso', 'Carga Horária', 'Status']].sort_values('Status')
 
 
 def get_status_icon(status):
@@ -382,6 +495,18 @@ def get_status_icon(status):
         return '❌'
 
 
+def course_display(df_cursos):
+    """Tabela de cursos exibida no app, com o ícone do status na primeira coluna"""
+    import pandas as pd
+    
+    return pd.DataFrame({
+        'Ícone': df_cursos['Status'].map(get_status_icon),
+        'Curso': df_cursos['Curso'],
+        'Carga Horária': df_cursos['Carga Horária'],
+        'Status': df_cursos['Status'],
+    })
+
+
 def get_status_color(status):
     """Retorna cor baseada no status"""
     if status == 'Concluído':
@@ -392,338 +517,509 @@ def get_status_color(status):
         return '#dc3545'
 
 
-def generate_pdf_content(df_merged, df_real, percentual_geral, total_realizado, total_planejado):
-    """Gera conteúdo HTML para PDF com gráficos"""
+# Faixas de progresso da visão geral: rótulo -> (mínimo inclusivo, máximo exclusivo)
+FAIXAS_PROGRESSO = {
+    'Todas': (None, None),
+    '🟢 ≥ 70%': (70, None),
+    '🟡 30% a 70%': (30, 70),
+    '🔴 < 30%': (None, 30),
+}
+
+# Ordenações da visão geral: rótulo -> (coluna, crescente)
+ORDENACOES_VISAO_GERAL = {
+    'Maior progresso': ('Percentual', False),
+    'Menor progresso': ('Percentual', True),
+    'Nome (A-Z)': ('Colaborador(a)', True),
+    'Mais horas pendentes': ('Horas_Pendentes', False),
+}
+
+
+def filter_overview(df_merged, faixa='Todas', busca='', ordem='Maior progresso'):
+    """Filtra e ordena os colaboradores da visão geral"""
+    import pandas as pd
+    
+    minimo, maximo = FAIXAS_PROGRESSO[faixa]
+    mascara = pd.Series(True, index=df_merged.index)
+    if minimo is not None:
+        mascara &= df_merged['Percentual'] >= minimo
+    if maximo is not None:
+        mascara &= df_merged['Percentual'] < maximo
+    if busca:
+        mascara &= df_merged['Colaborador(a)'].astype(str).str.contains(busca, case=False, regex=False)
+    
+    coluna, crescente = ORDENACOES_VISAO_GERAL[ordem]
+    return df_merged[mascara].sort_values(coluna, ascending=crescente, kind='stable')
+
+
+# Tamanho até o qual o relatório gerado fica em memória antes de ir para o disco
+RELATORIO_MAX_MEMORIA = 8 * 1024 * 1024
+
+# Intervalo (segundos) de atualização da barra de progresso do relatório
+INTERVALO_PROGRESSO = 1
+# Espera pelo job logo após o clique: relatórios do cache saem sem barra de progresso
+ESPERA_RELATORIO = 0.5
+
+# Relatórios gerados, em disco e compartilhados entre sessões (por planilha, dia e cenário)
+RELATORIO_ARTEFATOS_DIR = os.environ.get(
+    'RELATORIO_ARTEFATOS_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'relatorios')
+)
+RELATORIO_ARTEFATOS_MAX_MB = int(os.environ.get('RELATORIO_ARTEFATOS_MAX_MB', 200))
+
+
+def report_cache_key(chave_arquivo, chave_dataset, parametros):
+    """Chave do relatório em disco: conteúdo da planilha, recorte, data de hoje e cenário"""
+    return hash_bytes(repr((chave_arquivo, chave_dataset, date.today().isoformat(), tuple(parametros))).encode())
+
+
+# Log (JSON lines) com as etapas de cada rerun; desativado por padrão, pois
+# cresce uma linha por rerun (ex.: RELATORIO_LOG_DESEMPENHO=.cache/desempenho.jsonl)
+LOG_DESEMPENHO = os.environ.get('RELATORIO_LOG_DESEMPENHO', '')
+
+
+# Pasta do servidor sob a qual o campo "pasta com planilhas" pode ler; vazio
+# (padrão) esconde o campo, para que quem usa o navegador não leia pastas do servidor
+PASTA_PLANILHAS_RAIZ = os.environ.get('RELATORIO_PASTA_PLANILHAS', '')
+
+
+def resolve_folder(pasta, raiz=PASTA_PLANILHAS_RAIZ):
+    """Caminho da `pasta` informada, relativo a `raiz`; None se ele sair da raiz"""
+    raiz = Path(raiz).resolve()
+    caminho = (raiz / pasta).resolve()
+    return caminho if caminho.is_relative_to(raiz) else None
+
+
+def split_duplicate_departments(arquivos):
+    """Separa os (departamento, bytes) com nome de departamento repetido
     
-    # Encontra melhores e piores desempenhos
-    melhor = df_merged.loc[df_merged['Percentual'].idxmax()]
-    pior = df_merged.loc[df_merged['Percentual'].idxmin()]
+    O departamento é o nome do arquivo sem extensão; só o primeiro arquivo de
+    cada nome é mantido, para que dois arquivos não virem um só departamento.
+    Retorna (arquivos, nomes repetidos).
+    """
+    unicos, repetidos = {}, []
+    for nome, dados in arquivos:
+        if nome in unicos:
+            repetidos.append(nome)
+        else:
+            unicos[nome] = dados
+    return list(unicos.items()), repetidos
+
+
+def render_scenario_controls():
+    """Controles do simulador de cenários na barra lateral; retorna o pace.PaceParams escolhido
     
-    # Calcula dados de ritmo
-    data_atual = date.today()
-    data_limite = date(2026, 12, 20)
-    dias_totais = (data_limite - data_atual).days
-    dias_uteis_total = calcular_dias_uteis_2026(data_atual, data_limite)
-    dias_uteis = int(dias_uteis_total * 0.70)  # 70% dos dias úteis (margem para imprevistos)
+    Os valores ficam no session_state, então o cenário continua valendo ao
+    trocar de arquivo. Limites fora de ordem voltam para o padrão.
+    """
+    import pace
     
-    # Prepara dados de ritmo
-    df_pace = df_merged.copy()
-    df_pace['Horas_Restantes'] = df_pace['horas totais'] - df_pace['Horas_Realizadas']
-    df_pace['Ritmo_Necessario'] = (df_pace['Horas_Restantes'] / dias_uteis).round(2)
-    df_pace = df_pace.sort_values('Ritmo_Necessario', ascending=False)
-    
-    # Contagem de status
-    cursos_concluidos = len(df_real[df_real['Status'] == 'Concluído'])
-    cursos_andamento = len(df_real[df_real['Status'] == 'Em Andamento'])
-    cursos_pendentes = len(df_real[df_real['Status'] == 'Pendente'])
-    total_cursos = len(df_real)
-    
-    # Críticos (> 2h/dia)
-    criticos = len(df_pace[df_pace['Ritmo_Necessario'] > 2])
-    
-    html_content = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <meta charset="UTF-8">
-        <style>
-            @page {{ size: A4; margin: 1.2cm; }}
-            body {{ font-family: Arial, sans-serif; font-size: 10px; line-height: 1.3; color: #333; }}
-            .header {{ text-align: center; margin-bottom: 15px; border-bottom: 3px solid #1E3A5F; padding-bottom: 8px; }}
-            .header h1 {{ color: #1E3A5F; margin: 0; font-size: 20px; }}
-            .header p {{ color: #666; margin: 3px 0 0 0; font-size: 11px; }}
-            .section {{ margin-bottom: 12px; }}
-            .section-title {{ background: #1E3A5F; color: white; padding: 6px 10px; font-size: 12px; font-weight: bold; margin-bottom: 8px; border-radius: 4px; }}
-            .storytelling {{ background: #f5f7fa; padding: 10px; border-left: 4px solid #1E3A5F; margin-bottom: 12px; font-size: 10px; }}
-            .metrics-row {{ display: flex; justify-content: space-between; margin-bottom: 12px; gap: 8px; }}
-            .metric-box {{ text-align: center; padding: 8px; border-radius: 6px; flex: 1; }}
-            .metric-box.blue {{ background: #e3f2fd; border: 2px solid #1976d2; }}
-            .metric-box.green {{ background: #e8f5e9; border: 2px solid #28a745; }}
-            .metric-box.orange {{ background: #fff3e0; border: 2px solid #ff9800; }}
-            .metric-box.red {{ background: #ffebee; border: 2px solid #dc3545; }}
-            .metric-box.purple {{ background: #f3e5f5; border: 2px solid #9c27b0; }}
-            .metric-value {{ font-size: 18px; font-weight: bold; }}
-            .metric-label {{ font-size: 9px; color: #666; }}
-            table {{ width: 100%; border-collapse: collapse; font-size: 9px; margin-bottom: 8px; }}
-            th {{ background: #1E3A5F; color: white; padding: 5px; text-align: left; }}
-            td {{ padding: 4px; border-bottom: 1px solid #ddd; }}
-            .status-green {{ color: #28a745; font-weight: bold; }}
-            .status-yellow {{ color: #ff9800; font-weight: bold; }}
-            .status-red {{ color: #dc3545; font-weight: bold; }}
-            .progress-bar {{ width: 100%; height: 12px; background: #e0e0e0; border-radius: 6px; overflow: hidden; }}
-            .progress-fill {{ height: 100%; border-radius: 6px; }}
-            .highlight {{ display: flex; gap: 10px; margin-bottom: 12px; }}
-            .highlight-box {{ flex: 1; padding: 8px; border-radius: 6px; font-size: 10px; }}
-            .highlight-box.success {{ background: #d4edda; border-left: 4px solid #28a745; }}
-            .highlight-box.danger {{ background: #f8d7da; border-left: 4px solid #dc3545; }}
-            .highlight-box.warning {{ background: #fff3cd; border-left: 4px solid #ffc107; }}
-            .page-break {{ page-break-before: always; }}
-            .two-col {{ display: flex; gap: 15px; }}
-            .two-col > div {{ flex: 1; }}
-            .chart-container {{ margin-bottom: 12px; }}
-            .bar-chart {{ width: 100%; }}
-            .bar-row {{ display: flex; align-items: center; margin-bottom: 6px; }}
-            .bar-label {{ width: 140px; font-size: 9px; font-weight: 500; }}
-            .bar-container {{ flex: 1; height: 18px; background: #e0e0e0; border-radius: 4px; position: relative; overflow: hidden; }}
-            .bar-fill {{ height: 100%; border-radius: 4px; display: flex; align-items: center; justify-content: flex-end; padding-right: 5px; }}
-            .bar-text {{ font-size: 8px; color: white; font-weight: bold; }}
-            .bar-value {{ width: 70px; text-align: right; font-size: 9px; font-weight: bold; margin-left: 8px; }}
-            .pie-container {{ display: flex; justify-content: center; align-items: center; gap: 20px; }}
-            .pie-chart {{ width: 120px; height: 120px; border-radius: 50%; position: relative; }}
-            .pie-legend {{ font-size: 10px; }}
-            .pie-legend-item {{ display: flex; align-items: center; gap: 5px; margin-bottom: 4px; }}
-            .legend-color {{ width: 12px; height: 12px; border-radius: 3px; }}
-            .ritmo-bar {{ display: flex; align-items: center; margin-bottom: 4px; }}
-            .ritmo-name {{ width: 130px; font-size: 9px; }}
-            .ritmo-container {{ flex: 1; height: 16px; background: #f0f0f0; border-radius: 4px; position: relative; }}
-            .ritmo-fill {{ height: 100%; border-radius: 4px; }}
-            .ritmo-value {{ width: 60px; text-align: right; font-size: 9px; font-weight: bold; }}
-            .ritmo-line {{ position: absolute; top: 0; bottom: 0; width: 2px; z-index: 10; }}
-            .colaborador-section {{ margin-bottom: 12px; padding: 8px; border: 1px solid #ddd; border-radius: 6px; page-break-inside: avoid; }}
-            .colaborador-header {{ display: flex; justify-content: space-between; align-items: center; margin-bottom: 6px; }}
-            .colaborador-name {{ font-size: 11px; font-weight: bold; color: #1E3A5F; }}
-            .info-grid {{ display: grid; grid-template-columns: repeat(4, 1fr); gap: 8px; margin-bottom: 10px; }}
-            .info-item {{ text-align: center; padding: 5px; background: #f8f9fa; border-radius: 4px; }}
-            .info-value {{ font-size: 14px; font-weight: bold; }}
-            .info-label {{ font-size: 8px; color: #666; }}
-        </style>
-    </head>
-    <body>
-        <div class="header">
-            <h1>📊 Relatório de Acompanhamento de Cursos</h1>
-            <p>Gerado em {datetime.now().strftime('%d/%m/%Y às %H:%M')} | Prazo: 20/12/2026</p>
-        </div>
-        
-        <div class="section">
-            <div class="storytelling">
-                <strong>🎯 Contexto:</strong> Plano de desenvolvimento focado em <b>liderança, estatística, dados e ferramentas digitais</b>.
-                <strong>📈 Status:</strong> <b>{int(total_realizado)}h</b> de <b>{int(total_planejado)}h</b> concluídas (<b>{percentual_geral:.1f}%</b>).
-                <strong>⏱️ Prazo:</strong> {dias_totais} dias corridos | <b>{dias_uteis} dias efetivos</b> (70% dos dias úteis, considerando imprevistos).
-            </div>
-        </div>
+    padrao = pace.PARAMETROS_PADRAO
+    with st.sidebar.expander("🎛️ Simulador de Cenários"):
+        data_limite = st.date_input(
+            "Prazo final", value=padrao.data_limite, format="DD/MM/YYYY", key='cenario_prazo'
+        )
+        fator = st.slider(
+            "Dias úteis efetivos (%)", min_value=30, max_value=100,
+            value=int(round(padrao.fator_efetivo * 100)), step=5, key='cenario_fator'
+        )
+        st.caption("Limites das faixas de ritmo (h/dia)")
+        col1, col2 = st.columns(2)
+        rotulos = ['🔵 Tranquilo até', '🟢 Bom ritmo até', '🟡 Atenção até', '🟠 Crítico até']
+        faixas = tuple(
+            (col1 if i % 2 == 0 else col2).number_input(
+                rotulo, min_value=0.25, max_value=12.0, value=limite, step=0.25, key=f'cenario_faixa_{i}'
+            )
+            for i, (rotulo, limite) in enumerate(zip(rotulos, padrao.faixas))
+        )
+        if any(a >= b for a, b in zip(faixas, faixas[1:])):
+            st.error("Os limites devem ser crescentes; usando o padrão.")
+            faixas = padrao.faixas
+    
+    return pace.PaceParams(data_limite, fator / 100, tuple(float(f) for f in faixas))
 
-        <div class="section">
-            <div class="section-title">📊 RESUMO EXECUTIVO</div>
-            
-            <div class="metrics-row">
-                <div class="metric-box blue">
-                    <div class="metric-value">{len(df_merged)}</div>
-                    <div class="metric-label">Colaboradores</div>
-                </div>
-                <div class="metric-box green">
-                    <div class="metric-value">{int(total_realizado)}h</div>
-                    <div class="metric-label">Concluídas</div>
-                </div>
-                <div class="metric-box orange">
-                    <div class="metric-value">{int(total_planejado - total_realizado)}h</div>
-                    <div class="metric-label">Pendentes</div>
-                </div>
-                <div class="metric-box {'green' if percentual_geral >= 50 else 'red'}">
-                    <div class="metric-value">{percentual_geral:.1f}%</div>
-                    <div class="metric-label">Progresso</div>
-                </div>
-                <div class="metric-box purple">
-                    <div class="metric-value">{dias_uteis}</div>
-                    <div class="metric-label">Dias Úteis</div>
-                </div>
-                <div class="metric-box {'green' if criticos == 0 else 'red'}">
-                    <div class="metric-value">{criticos}</div>
-                    <div class="metric-label">Críticos</div>
-                </div>
-            </div>
 
-            <div class="highlight">
-                <div class="highlight-box success">
-                    <strong>🏆 Melhor:</strong> {melhor['Colaborador(a)']}<br>
-                    <span style="font-size: 14px; color: #28a745;"><b>{melhor['Percentual']:.1f}%</b></span> ({int(melhor['Horas_Realizadas'])}h/{int(melhor['horas totais'])}h)
-                </div>
-                <div class="highlight-box danger">
-                    <strong>⚠️ Atenção:</strong> {pior['Colaborador(a)']}<br>
-                    <span style="font-size: 14px; color: #dc3545;"><b>{pior['Percentual']:.1f}%</b></span> ({int(pior['Horas_Realizadas'])}h/{int(pior['horas totais'])}h)
-                </div>
-                <div class="highlight-box warning">
-                    <strong>📚 Cursos:</strong><br>
-                    ✅ {cursos_concluidos} | 🔄 {cursos_andamento} | ❌ {cursos_pendentes}
-                </div>
-            </div>
-        </div>
-
-        <div class="section">
-            <div class="section-title">📈 PROGRESSO POR COLABORADOR (Horas Planejadas vs Realizadas)</div>
-            <div class="chart-container">
-    """
+def render_diagnostics(cronometro, caches, memoria=None):
+    """Painel opcional na barra lateral com as etapas do rerun e o perfil do cProfile
     
-    # Gráfico de barras - Progresso
-    max_horas = df_merged['horas totais'].max()
-    for _, row in df_merged.sort_values('Percentual', ascending=False).iterrows():
-        color = '#28a745' if row['Percentual'] >= 70 else ('#ff9800' if row['Percentual'] >= 30 else '#dc3545')
-        width_total = (row['horas totais'] / max_horas * 100)
-        width_realizado = (row['Horas_Realizadas'] / max_horas * 100)
+    `memoria` é o relatório de compact_frames do dataset carregado, se houver.
+    """
+    with st.sidebar:
+        st.markdown("---")
+        if not st.toggle("🩺 Diagnóstico de desempenho", key='diagnostico'):
+            return
         
-        html_content += f"""
-                <div class="bar-row">
-                    <div class="bar-label">{row['Colaborador(a)'][:20]}</div>
-                    <div class="bar-container">
-                        <div class="bar-fill" style="width: {width_realizado}%; background: {color};">
-                            <span class="bar-text">{row['Percentual']:.0f}%</span>
-                        </div>
-                    </div>
-                    <div class="bar-value" style="color: {color};">{int(row['Horas_Realizadas'])}h / {int(row['horas totais'])}h</div>
-                </div>
-        """
-    
-    html_content += """
-            </div>
-        </div>
+        import pandas as pd
+        
+        st.caption(f"Rerun em {cronometro.total:.3f}s")
+        etapas = pd.DataFrame(cronometro.tabela())
+        etapas['etapa'] = ['　' * nivel + nome for nome, nivel in zip(etapas['etapa'], etapas['nivel'])]
+        st.dataframe(
+            etapas[['etapa', 'segundos', 'linhas', 'memoria_delta_mb']],
+            hide_index=True,
+            column_config={
+                'segundos': st.column_config.NumberColumn("s", format="%.3f"),
+                'memoria_delta_mb': st.column_config.NumberColumn("Δ MB", format="%.1f"),
+            }
+        )
+        st.dataframe(pd.DataFrame(caches).T.rename_axis('cache').reset_index(), hide_index=True)
+        if memoria is not None:
+            st.caption("Memória dos frames processados (antes e depois da compactação)")
+            st.dataframe(memoria, hide_index=True)
+        
+        st.button(
+            "🔬 Capturar perfil (cProfile) do próximo rerun",
+            on_click=lambda: st.session_state.update(capturar_perfil=True)
+        )
+        perfil = st.session_state.get('perfil')
+        if perfil:
+            with st.expander("Perfil do último rerun capturado"):
+                st.code(perfil['resumo'])
+                st.download_button(
+                    "📥 Baixar perfil (.prof)",
+                    data=perfil['dados'],
+                    file_name="perfil_rerun.prof",
+                    mime="application/octet-stream"
+                )
+
 
-        <div class="section">
-            <div class="section-title">⏱️ RITMO NECESSÁRIO PARA CUMPRIR O PRAZO (Horas por dia útil)</div>
-            <div class="chart-container" style="position: relative;">
+def detail_index(df_merged, chave_dataset):
+    """Opções do seletor do detalhamento e a linha de cada colaborador no df_merged
+    
+    Retorna (opcoes, posicoes, rotulos, historico): as chaves dos
+    colaboradores (pipeline.collaborator_key_columns) do maior para o menor
+    percentual, a linha de cada chave, o texto exibido no seletor (com o
+    departamento no modo consolidado) e, na mesma ordem, a chave de cada um no
+    histórico (history.collaborator_keys) com o seu texto. Calculado uma vez
+    por dataset, para que trocar de colaborador não ordene nem filtre a tabela
+    inteira.
     """
-    
-    # Gráfico de ritmo
-    max_ritmo = max(df_pace['Ritmo_Necessario'].max(), 3)
-    for _, row in df_pace.iterrows():
-        ritmo = row['Ritmo_Necessario']
-        if ritmo <= 0:
-            color = '#28a745'
-            status = '✅'
-        elif ritmo <= 1:
-            color = '#3498db'
-            status = '🔵'
-        elif ritmo <= 1.5:
-            color = '#2ecc71'
-            status = '🟢'
-        elif ritmo <= 2:
-            color = '#f1c40f'
-            status = '🟡'
-        elif ritmo <= 3:
-            color = '#e67e22'
-            status = '🟠'
+    import history
+    import pipeline
+    
+    def _montar():
+        ordenado = df_merged.sort_values('Percentual', ascending=False)
+        opcoes = pipeline.collaborator_index(ordenado).tolist()
+        posicoes = {}
+        for posicao, chave in enumerate(pipeline.collaborator_index(df_merged).tolist()):
+            posicoes.setdefault(chave, posicao)
+        nomes = ordenado['Colaborador(a)'].tolist()
+        if 'Departamento' in df_merged.columns:
+            rotulos = {
+                chave: f"{nome} · {departamento}"
+                for chave, nome, departamento in zip(opcoes, nomes, ordenado['Departamento'].tolist())
+            }
         else:
-            color = '#e74c3c'
-            status = '🔴'
-        
-        width = min((ritmo / max_ritmo * 100), 100) if ritmo > 0 else 0
-        
-        html_content += f"""
-                <div class="ritmo-bar">
-                    <div class="ritmo-name">{row['Colaborador(a)'][:18]}</div>
-                    <div class="ritmo-container">
-                        <div class="ritmo-fill" style="width: {width}%; background: {color};"></div>
-                        <div class="ritmo-line" style="left: {1.5/max_ritmo*100}%; background: #2ecc71;"></div>
-                        <div class="ritmo-line" style="left: {2/max_ritmo*100}%; background: #e74c3c;"></div>
-                    </div>
-                    <div class="ritmo-value" style="color: {color};">{status} {ritmo:.1f}h/dia</div>
-                </div>
-        """
-    
-    html_content += f"""
-            </div>
-            <div style="font-size: 8px; color: #666; margin-top: 5px;">
-                Legenda: 🔵 Tranquilo (≤1h) | 🟢 Bom Ritmo (1-1.5h) | 🟡 Atenção (1.5-2h) | 🟠 Crítico (2-3h) | 🔴 Plano de Ação (>3h)
-            </div>
-        </div>
+            rotulos = dict(zip(opcoes, nomes))
+        historico = dict(zip(history.collaborator_keys(ordenado), (rotulos[chave] for chave in opcoes)))
+        return opcoes, posicoes, rotulos, historico
+    
+    cache = get_cache('detalhe', max_entries=FIGURE_CACHE_MAX_ENTRIES)
+    return cache.get_or_compute(chave_dataset, _montar)[0]
 
-        <div class="page-break"></div>
-        
-        <div class="section">
-            <div class="section-title">📋 DETALHAMENTO POR COLABORADOR</div>
+
+@st.fragment
+def render_collaborator_detail(df_merged, grupos, chave_dataset, cubo):
+    """Seção de detalhamento por colaborador
+    
+    É um fragmento: trocar o colaborador reexecuta só esta função, e ela só
+    consulta a linha e os cursos da pessoa escolhida.
     """
+    st.markdown("---")
+    st.markdown("## 📋 Detalhamento por Colaborador")
+    
+    # Seletor de colaborador
+    opcoes, posicoes, rotulos, _ = detail_index(df_merged, chave_dataset)
+    colaborador_selecionado = st.selectbox(
+        "Selecione um colaborador para ver detalhes:",
+        options=opcoes,
+        format_func=rotulos.get
+    )
+    
+    # Dados do colaborador selecionado
+    dados_colab = df_merged.iloc[posicoes[colaborador_selecionado]]
+    df_cursos_colab = grupos.get(colaborador_selecionado)
+    
+    col1, col2 = st.columns([1, 2])
     
-    # Detalhamento compacto
-    for i, (_, row) in enumerate(df_merged.sort_values('Percentual', ascending=False).iterrows()):
-        if i > 0 and i % 4 == 0:
-            html_content += '<div class="page-break"></div>'
+    with col1:
+        # Gauge de progresso
+        fig_gauge = cached_figure(
+            'gauge', create_gauge_chart,
+            percentual=float(dados_colab['Percentual']), nome=dados_colab['Colaborador(a)']
+        )
+        st.plotly_chart(fig_gauge, use_container_width=True)
         
-        df_colab = df_real[df_real['Colaborador(a)'] == row['Colaborador(a)']].copy()
+        # Métricas
+        st.markdown(f"**Horas Planejadas:** {int(dados_colab['horas totais'])}h")
+        st.markdown(f"**Horas Concluídas:** {int(dados_colab['Horas_Realizadas'])}h")
+        st.markdown(f"**Horas Pendentes:** {int(dados_colab['Horas_Pendentes'])}h")
+    
+    with col2:
+        # Contagem por status
+        status_counts = cubo.contagem(colaborador_selecionado)
         
-        concluidos = len(df_colab[df_colab['Status'] == 'Concluído'])
-        andamento = len(df_colab[df_colab['Status'] == 'Em Andamento'])
-        pendentes = len(df_colab[df_colab['Status'] == 'Pendente'])
+        col_a, col_b, col_c = st.columns(3)
+        with col_a:
+            st.metric("✅ Concluídos", status_counts.get('Concluído', 0))
+        with col_b:
+            st.metric("🔄 Em Andamento", status_counts.get('Em Andamento', 0))
+        with col_c:
+            st.metric("❌ Pendentes", status_counts.get('Pendente', 0))
         
-        ritmo_colab = df_pace[df_pace['Colaborador(a)'] == row['Colaborador(a)']]['Ritmo_Necessario'].values[0]
-        color = '#28a745' if row['Percentual'] >= 70 else ('#ff9800' if row['Percentual'] >= 30 else '#dc3545')
-        # Cores: Azul (≤1h), Verde (1-1.5h), Amarelo (1.5-2h), Laranja (2-3h), Vermelho (>3h)
-        ritmo_color = '#3498db' if ritmo_colab <= 1 else ('#2ecc71' if ritmo_colab <= 1.5 else ('#f1c40f' if ritmo_colab <= 2 else ('#e67e22' if ritmo_colab <= 3 else '#e74c3c')))
+        # Tabela de cursos
+        st.markdown("#### Cursos")
         
-        html_content += f"""
-            <div class="colaborador-section">
-                <div class="colaborador-header">
-                    <span class="colaborador-name">👤 {row['Colaborador(a)']}</span>
-                    <span style="color: {color}; font-weight: bold; font-size: 12px;">{row['Percentual']:.1f}%</span>
-                </div>
-                <div class="progress-bar" style="margin-bottom: 6px; height: 10px;">
-                    <div class="progress-fill" style="width: {min(row['Percentual'], 100)}%; background: {color};"></div>
-                </div>
-                <div class="info-grid">
-                    <div class="info-item">
-                        <div class="info-value" style="color: #1976d2;">{int(row['horas totais'])}h</div>
-                        <div class="info-label">Planejado</div>
-                    </div>
-                    <div class="info-item">
-                        <div class="info-value" style="color: #28a745;">{int(row['Horas_Realizadas'])}h</div>
-                        <div class="info-label">Concluído</div>
-                    </div>
-                    <div class="info-item">
-                        <div class="info-value" style="color: #dc3545;">{int(row['Horas_Pendentes'])}h</div>
-                        <div class="info-label">Pendente</div>
-                    </div>
-                    <div class="info-item">
-                        <div class="info-value" style="color: {ritmo_color};">{ritmo_colab:.1f}h</div>
-                        <div class="info-label">Ritmo/dia</div>
-                    </div>
-                </div>
-                <div style="font-size: 9px; margin-bottom: 4px;">
-                    <span class="status-green">✅ {concluidos}</span> |
-                    <span class="status-yellow">🔄 {andamento}</span> |
-                    <span class="status-red">❌ {pendentes}</span>
-                </div>
-                <table>
-                    <tr><th>Curso</th><th style="width: 45px;">Carga</th><th style="width: 70px;">Status</th></tr>
-        """
+        df_display = course_display(df_cursos_colab)
         
-        for _, curso in df_colab.iterrows():
-            icon = '✅' if curso['Status'] == 'Concluído' else ('🔄' if curso['Status'] == 'Em Andamento' else '❌')
-            status_class = 'status-green' if curso['Status'] == 'Concluído' else ('status-yellow' if curso['Status'] == 'Em Andamento' else 'status-red')
-            
-            html_content += f"""
-                    <tr>
-                        <td>{str(curso['Curso'])[:50]}{'...' if len(str(curso['Curso'])) > 50 else ''}</td>
-                        <td>{int(curso['Carga Horária'])}h</td>
-                        <td class="{status_class}">{icon}</td>
-                    </tr>
-            """
+        # Aplica estilo
+        def highlight_status(row):
+            if row['Status'] == 'Concluído':
+                return ['background-color: #d4edda'] * len(row)
+            elif row['Status'] == 'Em Andamento':
+                return ['background-color: #fff3cd'] * len(row)
+            else:
+                return ['background-color: #f8d7da'] * len(row)
         
-        html_content += """
-                </table>
-            </div>
-        """
+        st.dataframe(
+            df_display.style.apply(highlight_status, axis=1),
+            use_container_width=True,
+            height=300
+        )
+
+
+@st.fragment
+def render_history_trend(fonte, colaboradores):
+    """Seção de evolução (burn-up) a partir do histórico de uploads em SQLite
+    
+    Só entram os snapshots da mesma `fonte` (planilha ou conjunto de
+    departamentos) do upload atual. `colaboradores` leva a chave de cada
+    colaborador atual no histórico ao texto exibido no seletor. É um
+    fragmento: trocar entre a equipe e um colaborador só refaz a consulta ao
+    histórico, que lê as tabelas já agregadas.
+    """
+    import history
     
-    html_content += """
-        </div>
-    </body>
-    </html>
+    df_equipe = history.team_trend(fonte)
+    if len(df_equipe) < 2:
+        return
+    
+    st.markdown("---")
+    st.markdown("## 📈 Evolução do Plano")
+    
+    # Colaboradores do upload atual que já aparecem no histórico desta fonte
+    no_historico = set(history.list_collaborators(fonte))
+    opcoes = [None] + [chave for chave in colaboradores if chave in no_historico]
+    selecionado = st.selectbox(
+        "Evolução de:", opcoes,
+        format_func=lambda chave: 'Equipe toda' if chave is None else colaboradores[chave],
+        key="evolucao_selecionado"
+    )
+    
+    if selecionado is None:
+        df_evolucao = df_equipe
+        titulo = '📈 Burn-up da Equipe'
+    else:
+        df_evolucao = history.collaborator_trend(selecionado, fonte)
+        titulo = f'📈 Burn-up - {colaboradores[selecionado]}'
+    
+    primeiro, ultimo = df_evolucao.iloc[0], df_evolucao.iloc[-1]
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("🗂️ Uploads no Histórico", len(df_evolucao))
+    with col2:
+        st.metric(
+            "⏱️ Horas Realizadas",
+            f"{ultimo['total_realizado']:.0f}h",
+            delta=f"{ultimo['total_realizado'] - primeiro['total_realizado']:+.0f}h desde {primeiro['data_referencia']:%d/%m/%Y}"
+        )
+    with col3:
+        st.metric(
+            "🎯 Progresso",
+            f"{ultimo['percentual']:.1f}%",
+            delta=f"{ultimo['percentual'] - primeiro['percentual']:+.1f} p.p."
+        )
+    
+    st.plotly_chart(create_burnup_chart(df_evolucao, titulo), use_container_width=True, key="burnup_chart")
+
+
+def build_report_html(df_merged, df_real, grupos, cubo, parametros, chave=None, progresso=None):
+    """Bytes do relatório HTML (executado na thread do job de relatório)
+    
+    Com `chave` (veja report_cache_key), o relatório já gerado hoje para a mesma
+    planilha e cenário vem do cache em disco, e um relatório novo é gravado nele.
+    """
+    import report
+    
+    artefatos = get_bytes_cache('relatorios', RELATORIO_ARTEFATOS_DIR, max_bytes=RELATORIO_ARTEFATOS_MAX_MB * 2**20)
+    if chave is not None:
+        html_bytes = artefatos.get(chave)
+        if html_bytes is not None:
+            return html_bytes
+    
+    # Grava o relatório em pedaços já codificados; acima do limite o arquivo vai
+    # para o disco, e no fim só os bytes lidos dele ficam em memória
+    with tempfile.SpooledTemporaryFile(max_size=RELATORIO_MAX_MEMORIA, mode='w+b') as arquivo:
+        report.generate_pdf_content(
+            df_merged, df_real, cubo.percentual_geral,
+            cubo.total_realizado, cubo.total_planejado, grupos, output=arquivo, cube=cubo,
+            parametros=parametros, progresso=progresso, encoding='utf-8'
+        )
+        arquivo.seek(0)
+        html_bytes = arquivo.read()
+    
+    if chave is not None:
+        artefatos.put(chave, html_bytes)
+    return html_bytes
+
+
+@st.fragment(run_every=INTERVALO_PROGRESSO)
+def render_report_progress(job):
+    """Barra de progresso do job em andamento, atualizada sozinha a cada INTERVALO_PROGRESSO"""
+    if not job.ativo:
+        # Terminou: o rerun completo troca o progresso pelo resultado
+        st.rerun()
+    
+    texto = "Na fila..." if job.status == 'na_fila' else f"Gerando relatório... {job.progresso:.0%}"
+    st.progress(job.progresso, text=texto)
+    if st.button("✖️ Cancelar", key="relatorio_cancelar", use_container_width=True):
+        job.cancel()
+
+
+@st.fragment
+def render_report_export(df_merged, df_real, grupos, cubo, parametros, chave_relatorio=None):
+    """Seção de exportação do relatório (fragmento: o botão não reexecuta o dashboard)
+    
+    O relatório é gerado em segundo plano (veja jobs.py): o dashboard continua
+    utilizável e o botão de download aparece quando o relatório fica pronto.
+    `chave_relatorio` identifica o relatório no cache em disco.
     """
+    import jobs
     
-    return html_content
+    st.markdown("---")
+    st.markdown("## 📄 Exportar Relatório")
+    
+    col1, col2, col3 = st.columns([1, 2, 1])
+    
+    with col2:
+        st.markdown("""
+        <div style="text-align: center; padding: 20px; background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); border-radius: 15px; color: white;">
+            <h3>📥 Gerar Relatório em PDF</h3>
+            <p>Clique no botão abaixo para gerar o relatório executivo em PDF (máx. 3 páginas)</p>
+        </div>
+        """, unsafe_allow_html=True)
+        
+        st.markdown("")
+        
+        job_id = st.session_state.get('relatorio_job')
+        job = jobs.get_job(job_id)
+        if job_id and job is None:
+            st.warning("O relatório anterior expirou; gere-o novamente.")
+            del st.session_state['relatorio_job']
+        
+        if job is None or not job.ativo:
+            if st.button("📄 Gerar PDF", type="primary", use_container_width=True):
+                job = jobs.submit_report(
+                    build_report_html, df_merged, df_real, grupos, cubo, parametros, chave=chave_relatorio
+                )
+                st.session_state['relatorio_job'] = job.id
+                job.wait(ESPERA_RELATORIO)
+        
+        if job is None:
+            return
+        if job.ativo:
+            render_report_progress(job)
+        elif job.status == 'concluido':
+            # Salva HTML
+            st.download_button(
+                label="📥 Baixar HTML do Relatório",
+                data=job.resultado,
+                file_name=f"relatorio_cursos_{job.concluido_em.strftime('%Y%m%d_%H%M')}.html",
+                mime="text/html",
+                on_click="ignore",
+                use_container_width=True
+            )
+            
+            st.success(f"✅ Relatório gerado em {job.segundos:.1f}s! Abra o arquivo HTML no navegador e use Ctrl+P para salvar como PDF.")
+            st.info("💡 **Dica:** No Chrome/Edge, ao imprimir, selecione 'Salvar como PDF' e marque 'Gráficos de fundo' nas opções.")
+        elif job.status == 'cancelado':
+            st.info("Geração do relatório cancelada.")
+        else:
+            st.error(f"Falha ao gerar o relatório: {job.erro}")
 
 
 # ==================== INTERFACE PRINCIPAL ====================
 
 def main():
+    # O script começou em INICIO_SCRIPT; até aqui foram os imports e definições
+    cronometro = StageTimer(inicio=INICIO_SCRIPT)
+    cronometro.registrar('importacoes', time.perf_counter() - INICIO_SCRIPT)
+    
+    cronometro.marcar('configuracao_pagina')
+    # Configuração da página
+    st.set_page_config(
+        page_title="📊 Relatório de Cursos",
+        page_icon="📚",
+        layout="wide",
+        initial_sidebar_state="expanded"
+    )
+    
+    st.markdown(CSS, unsafe_allow_html=True)
+    
+    caches_antes = all_stats()
+    # Reruns interrompidos (por um erro ou por st.stop()) também são registrados
+    contexto = {'tela': 'interrompida'}
+    perfil = None
+    try:
+        with cronometro.ativo(), capture_profile(st.session_state.pop('capturar_perfil', False)) as perfil:
+            contexto = render_dashboard(cronometro)
+    finally:
+        cronometro.encerrar()
+        caches = cache_deltas(caches_antes, all_stats())
+        log_rerun(LOG_DESEMPENHO, cronometro, partida_a_frio=first_run(), cache=caches, **contexto)
+        if perfil:
+            st.session_state['perfil'] = perfil
+        memoria = None
+        if 'chave' in contexto:
+            import pipeline
+            memoria = pipeline.memory_report(contexto['chave'])
+        render_diagnostics(cronometro, caches, memoria)
+
+
+def render_dashboard(cronometro):
+    """Monta o dashboard, marcando cada seção como uma etapa no `cronometro`
+
+    Retorna um resumo da tela exibida e do dataset (origem, colaboradores,
+    cursos) para o log.
+    """
+    cronometro.marcar('entrada')
     st.markdown('<h1 class="main-header">📚 Relatório de Cursos</h1>', unsafe_allow_html=True)
     st.markdown('<p class="sub-header">Automatização de relatórios de acompanhamento de capacitação</p>', unsafe_allow_html=True)
     
     # Sidebar
     with st.sidebar:
-        st.image("https://img.icons8.com/fluency/96/training.png", width=80)
+        st.image(ICONE_SIDEBAR, width=80)
         st.markdown("### 📁 Upload de Dados")
         
-        uploaded_file = st.file_uploader(
-            "Selecione o arquivo Excel",
+        uploaded_files = st.file_uploader(
+            "Selecione os arquivos Excel",
             type=['xlsx', 'xls'],
-            help="O arquivo deve conter as abas 'Plano' e 'Real/Realizado'"
+            accept_multiple_files=True,
+            help="O arquivo deve conter as abas 'Plano' e 'Real/Realizado'. "
+                 "Com vários arquivos (um por departamento), o dashboard é consolidado"
+        )
+        
+        pasta = None
+        if PASTA_PLANILHAS_RAIZ:
+            pasta = st.text_input(
+                "📂 Ou informe uma pasta com planilhas",
+                help=f"Pasta dentro de {PASTA_PLANILHAS_RAIZ}; todos os arquivos .xlsx/.xls "
+                     "dela são carregados, um por departamento"
+            )
+        
+        modo_incremental = st.toggle(
+            "🔁 Comparar com o upload anterior",
+            value=True,
+            help="Recalcula só o que mudou em relação ao último arquivo carregado e destaca as diferenças"
         )
         
         st.markdown("---")
@@ -734,8 +1030,26 @@ def main():
         3. Clique em **Gerar PDF** para exportar
         """)
     
+    arquivos = [(Path(f.name).stem, f.getvalue()) for f in uploaded_files or []]
+    if pasta:
+        caminho_pasta = resolve_folder(pasta)
+        if caminho_pasta is not None and caminho_pasta.is_dir():
+            arquivos += [
+                (caminho.stem, caminho.read_bytes())
+                for caminho in sorted(caminho_pasta.iterdir())
+                if caminho.suffix.lower() in ('.xlsx', '.xls') and not caminho.name.startswith('~$')
+            ]
+        else:
+            st.sidebar.error(f"Pasta não encontrada em {PASTA_PLANILHAS_RAIZ}: {pasta}")
+    arquivos, repetidos = split_duplicate_departments(arquivos)
+    if repetidos:
+        st.sidebar.error(
+            "Arquivos ignorados: já há um departamento com o mesmo nome "
+            f"({', '.join(dict.fromkeys(repetidos))}). Renomeie-os para incluí-los."
+        )
+    
     # Aguarda upload do arquivo
-    if uploaded_file is None:
+    if not arquivos:
         st.info("👆 Por favor, faça upload do arquivo Excel na barra lateral.")
         st.markdown("""
         ### 📋 Formato esperado do arquivo:
@@ -752,16 +1066,110 @@ def main():
         |-------------------|----------------|-------|---------------|-------------------|
         | 123456 | Nome do Colaborador | Nome do Curso | 10 | Sim/Não |
         """)
-        st.stop()
+        # Tempo até a tela de upload fica no log como o rerun com tela='upload'
+        return {'tela': 'upload'}
     else:
-        df_plano, df_real = load_data(uploaded_file)
-        st.sidebar.success("✅ Arquivo carregado com sucesso!")
+        # Só a partir daqui (com um arquivo carregado) o pandas e o pipeline são necessários
+        import pandas as pd
+        
+        import forecast
+        import history
+        import incremental
+        import pace
+        import pipeline
+        
+        consolidado = len(arquivos) > 1
+        # Fonte dos snapshots no histórico: a planilha, ou o conjunto de departamentos
+        fonte_historico = ' + '.join(sorted(nome for nome, _ in arquivos))
+        chave_arquivo = pipeline.chave_consolidada(arquivos) if consolidado else hash_bytes(arquivos[0][1])
+        
+        # Ao trocar de arquivo, o snapshot atual vira a base de comparação
+        snapshot_atual = st.session_state.get('snapshot')
+        if snapshot_atual is not None and snapshot_atual.chave != chave_arquivo:
+            st.session_state['snapshot_anterior'] = snapshot_atual
+        anterior = st.session_state.get('snapshot_anterior') if modo_incremental else None
+        
+        # Carrega e processa dados (reaproveita o cache se o arquivo não mudou)
+        etapa_pipeline = cronometro.marcar('pipeline')
+        if consolidado:
+            df_merged, df_real, grupos, origem, mudancas = pipeline.load_and_process_many(arquivos, anterior)
+        else:
+            df_merged, df_real, grupos, origem, mudancas = pipeline.load_and_process(arquivos[0][1], anterior)
+        st.session_state['snapshot'] = incremental.Snapshot(chave_arquivo, df_merged, df_real)
+        etapa_pipeline['linhas'] = len(df_real)
+        # O df_real entra pela chave do arquivo: mudar só o status de um curso não altera o df_merged
+        chave_dataset = dataset_fingerprint(df_merged)
+        cubo = cached_kpi_cube(df_merged, df_real, (chave_arquivo, chave_dataset))
+        
+        # Histórico de evolução: grava o dataset completo, antes do filtro por departamento
+        with etapa('historico'):
+            history.record_snapshot(chave_arquivo, df_merged, cubo, fonte=fonte_historico)
+        
+        if consolidado:
+            st.sidebar.success(f"✅ {len(arquivos)} arquivos carregados com sucesso!")
+            todos_departamentos = list(dict.fromkeys(df_merged['Departamento']))
+            departamentos = st.sidebar.multiselect(
+                "🏢 Departamentos",
+                todos_departamentos,
+                default=todos_departamentos,
+                key='departamentos'
+            )
+            if set(departamentos) != set(todos_departamentos):
+                df_merged = df_merged[df_merged['Departamento'].isin(departamentos)].reset_index(drop=True)
+                df_real = df_real[df_real['Departamento'].isin(departamentos)].reset_index(drop=True)
+                grupos = pipeline.GroupIndex(df_real)
+                chave_dataset = dataset_fingerprint(df_merged)
+                cubo = cached_kpi_cube(df_merged, df_real, (chave_arquivo, chave_dataset))
+            if df_merged.empty:
+                st.warning("Selecione ao menos um departamento.")
+                # Retorna em vez de st.stop(): o log e o diagnóstico do rerun ainda são gravados
+                return {'tela': 'sem_departamento', 'chave': chave_arquivo, 'origem': origem, 'arquivos': len(arquivos)}
+        else:
+            st.sidebar.success("✅ Arquivo carregado com sucesso!")
+        
+        cronometro.marcar('barra_lateral')
+        parametros = render_scenario_controls()
+        stats = get_cache('pipeline').stats()
+        mensagens_origem = {
+            'memoria': '⚡ Cache hit: leitura reaproveitada',
+            'disco': '💾 Cache em disco: Excel não foi relido',
+            'excel': '🔄 Cache miss: arquivo processado',
+        }
+        st.sidebar.caption(
+            f"{mensagens_origem[origem]} "
+            f"| hits {stats['hits']} · misses {stats['misses']} · {stats['entradas']}/{stats['max_entradas']} entradas"
+        )
+    
+    # ==================== MUDANÇAS DESDE O UPLOAD ANTERIOR ====================
     
-    # Processa dados
-    df_merged, df_real = process_data(df_plano, df_real)
+    cronometro.marcar('mudancas')
+    
+    if mudancas is not None:
+        st.markdown("---")
+        st.markdown("## 🔄 Mudanças desde o Upload Anterior")
+        
+        if mudancas.vazio:
+            st.info("Nenhuma mudança em relação ao arquivo anterior.")
+        else:
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                st.metric("👥 Colaboradores Afetados", len(mudancas.colaboradores))
+            with col2:
+                st.metric("✏️ Cursos Alterados", mudancas.linhas_alteradas)
+            with col3:
+                st.metric("🆕 Cursos Novos", mudancas.linhas_novas)
+            with col4:
+                st.metric("🗑️ Cursos Removidos", mudancas.linhas_removidas)
+            
+            st.dataframe(
+                incremental.summarize_changes(anterior.df_merged, df_merged, mudancas),
+                use_container_width=True,
+                hide_index=True
+            )
     
     # ==================== PÁGINA 1: STORYTELLING + RESUMO ====================
     
+    cronometro.marcar('contexto')
     # Storytelling
     st.markdown("---")
     st.markdown("## 🎯 Contexto e Objetivo")
@@ -786,38 +1194,52 @@ def main():
     
     with col2:
         # Métricas rápidas
-        total_planejado = df_merged['horas totais'].sum()
-        total_realizado = df_merged['Horas_Realizadas'].sum()
-        percentual_geral = (total_realizado / total_planejado * 100)
-        
-        st.metric("👥 Colaboradores", len(df_merged))
-        st.metric("📚 Total de Cursos", len(df_real))
-        st.metric("⏱️ Horas Planejadas", f"{int(total_planejado)}h")
+        st.metric("👥 Colaboradores", cubo.colaboradores)
+        st.metric("📚 Total de Cursos", cubo.total_cursos)
+        st.metric("⏱️ Horas Planejadas", f"{int(cubo.total_planejado)}h")
+    
+    # ==================== POR DEPARTAMENTO ====================
+    
+    cronometro.marcar('departamentos')
+    if 'Departamento' in df_merged.columns:
+        st.markdown("---")
+        st.markdown("## 🏢 Por Departamento")
+        st.dataframe(
+            pipeline.summarize_departments(df_merged),
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                'Planejado': st.column_config.NumberColumn(format="%dh"),
+                'Realizado': st.column_config.NumberColumn(format="%dh"),
+                'Percentual': st.column_config.ProgressColumn(format="%.1f%%", min_value=0, max_value=100),
+            }
+        )
     
     # ==================== RESUMO EXECUTIVO ====================
     
+    cronometro.marcar('resumo_executivo')
     st.markdown("---")
     st.markdown("## 📊 Resumo Executivo")
     
     # KPIs em cards
     col1, col2, col3, col4 = st.columns(4)
     
-    cursos_concluidos = len(df_real[df_real['Status'] == 'Concluído'])
-    cursos_andamento = len(df_real[df_real['Status'] == 'Em Andamento'])
-    cursos_pendentes = len(df_real[df_real['Status'] == 'Pendente'])
+    cursos_concluidos = int(cubo.cursos_por_status['Concluído'])
+    cursos_andamento = int(cubo.cursos_por_status['Em Andamento'])
+    cursos_pendentes = int(cubo.cursos_por_status['Pendente'])
     
     with col1:
         st.metric(
             "🎯 Progresso Geral",
-            f"{percentual_geral:.1f}%",
-            delta=f"{total_realizado:.0f}h concluídas"
+            f"{cubo.percentual_geral:.1f}%",
+            delta=f"{cubo.total_realizado:.0f}h concluídas"
         )
     
     with col2:
         st.metric(
             "✅ Cursos Concluídos",
             cursos_concluidos,
-            delta=f"{(cursos_concluidos/len(df_real)*100):.1f}%"
+            delta=f"{(cursos_concluidos/cubo.total_cursos*100):.1f}%"
         )
     
     with col3:
@@ -831,7 +1253,7 @@ def main():
         st.metric(
             "❌ Pendentes",
             cursos_pendentes,
-            delta=f"-{(cursos_pendentes/len(df_real)*100):.1f}%",
+            delta=f"-{(cursos_pendentes/cubo.total_cursos*100):.1f}%",
             delta_color="inverse"
         )
     
@@ -839,46 +1261,76 @@ def main():
     col1, col2 = st.columns([3, 2])
     
     with col1:
-        fig_bar = create_bar_chart(df_merged)
+        fig_bar = cached_figure('barras', create_bar_chart, df_merged, chave_dataset=chave_dataset)
         st.plotly_chart(fig_bar, use_container_width=True, key="bar_chart")
     
     with col2:
-        fig_pie, percentual_geral, total_realizado, total_planejado = create_pie_chart(df_merged)
+        fig_pie, _, _, _ = cached_figure('pizza', create_pie_chart, cubo, chave_dataset=chave_dataset)
         st.plotly_chart(fig_pie, use_container_width=True, key="pie_chart")
     
+    if len(df_merged) > LIMITE_GRAFICO_COMPLETO:
+        fig_dist = cached_figure(
+            'distribuicao_percentual', create_distribution_chart, df_merged, chave_dataset=chave_dataset,
+            coluna='Percentual', titulo='📊 Distribuição do Progresso (% concluído)', eixo_x='% concluído'
+        )
+        st.plotly_chart(fig_dist, use_container_width=True, key="dist_percentual_chart")
+    
     # ==================== GRÁFICO DE RITMO ====================
     
+    cronometro.marcar('ritmo')
     st.markdown("---")
     st.markdown("## ⏱️ Análise de Ritmo para Cumprimento do Prazo")
     
-    fig_pace, df_pace, dias_totais, dias_estudo, dias_uteis_total = create_pace_chart(df_merged)
+    # Cenário: dias e faixas saem dos arrays do dataset, sem reprocessar a planilha
+    base_ritmo = cached_pace_base(df_merged, chave_dataset)
+    dias_totais, dias_uteis_total, dias_estudo = pace.deadline_days(parametros)
+    _, _, codigos_faixa = pace.compute_pace(base_ritmo, dias_estudo, parametros.faixas)
+    contagem_faixas = pace.band_counts(codigos_faixa)
+    
+    fig_pace, df_pace, *_ = cached_figure(
+        'ritmo', create_pace_chart, df_merged, LIMITE_GRAFICO_COMPLETO, N_DESTAQUES, parametros, base_ritmo,
+        chave_dataset=chave_dataset, data_referencia=date.today(), cenario=parametros
+    )
     
     # Info box explicativo
     col1, col2, col3, col4, col5 = st.columns(5)
     with col1:
-        st.metric("📅 Prazo Final", "20/12/2026")
+        st.metric("📅 Prazo Final", f"{parametros.data_limite:%d/%m/%Y}")
     with col2:
         st.metric("⏳ Dias Corridos", f"{dias_totais}")
     with col3:
         st.metric("📆 Dias Úteis", f"{dias_uteis_total}")
     with col4:
-        st.metric("📚 Dias Efetivos (70%)", f"{dias_estudo}")
+        st.metric(f"📚 Dias Efetivos ({parametros.fator_efetivo:.0%})", f"{dias_estudo}")
     with col5:
-        plano_acao = len(df_pace[df_pace['Ritmo_Necessario'] > 3])
+        plano_acao = int(contagem_faixas[pace.FAIXA_PLANO_ACAO])
         st.metric("🔴 Plano de Ação", f"{plano_acao} pessoas", delta=None if plano_acao == 0 else "atenção", delta_color="inverse")
     
+    st.caption(" | ".join(
+        f"{rotulo}: **{quantidade}**" for rotulo, quantidade in zip(pace.ROTULOS_FAIXA, contagem_faixas.tolist())
+    ))
+    
     st.plotly_chart(fig_pace, use_container_width=True, key="pace_chart")
     
+    if len(df_pace) > LIMITE_GRAFICO_COMPLETO:
+        fig_dist_ritmo = cached_figure(
+            'distribuicao_ritmo', create_distribution_chart, df_pace, chave_dataset=chave_dataset,
+            data_referencia=date.today(), cenario=parametros, coluna='Ritmo_Necessario',
+            titulo='⏱️ Distribuição do Ritmo Necessário', eixo_x='Horas por dia efetivo', cor='#e67e22'
+        )
+        st.plotly_chart(fig_dist_ritmo, use_container_width=True, key="dist_ritmo_chart")
+    
     # Legenda explicativa
+    f1, f2, f3, f4 = parametros.faixas
     st.markdown(f"""
     <div style="background: #f8f9fa; padding: 15px; border-radius: 10px; margin-top: -20px;">
         <strong>📊 Como interpretar:</strong>
-        <span style="color: #3498db;">●</span> <b>Tranquilo</b> (≤1h/dia) |
-        <span style="color: #2ecc71;">●</span> <b>Bom Ritmo</b> (1-1.5h/dia) |
-        <span style="color: #f1c40f;">●</span> <b>Atenção</b> (1.5-2h/dia) |
-        <span style="color: #e67e22;">●</span> <b>Crítico</b> (2-3h/dia) |
-        <span style="color: #e74c3c;">●</span> <b>Plano de Ação</b> (>3h/dia)
-        <br><small>💡 <b>Considerando 70% dos dias úteis</b> (margem para reuniões e imprevistos)</small>
+        <span style="color: #3498db;">●</span> <b>Tranquilo</b> (≤{f1:g}h/dia) |
+        <span style="color: #2ecc71;">●</span> <b>Bom Ritmo</b> ({f1:g}-{f2:g}h/dia) |
+        <span style="color: #f1c40f;">●</span> <b>Atenção</b> ({f2:g}-{f3:g}h/dia) |
+        <span style="color: #e67e22;">●</span> <b>Crítico</b> ({f3:g}-{f4:g}h/dia) |
+        <span style="color: #e74c3c;">●</span> <b>Plano de Ação</b> (>{f4:g}h/dia)
+        <br><small>💡 <b>Considerando {parametros.fator_efetivo:.0%} dos dias úteis</b> (margem para reuniões e imprevistos)</small>
     </div>
     """, unsafe_allow_html=True)
     
@@ -910,77 +1362,97 @@ def main():
         </div>
         """, unsafe_allow_html=True)
     
-    # ==================== DETALHAMENTO ====================
+    # ==================== PREVISÃO ====================
     
+    cronometro.marcar('previsao')
     st.markdown("---")
-    st.markdown("## 📋 Detalhamento por Colaborador")
+    st.markdown("## 🔮 Previsão de Conclusão")
+    st.caption(
+        f"Simulação Monte Carlo ({forecast.SIMULACOES} trajetórias por pessoa) a partir do ritmo de "
+        "conclusão de cada colaborador desde o início dos cursos."
+    )
     
-    # Seletor de colaborador
-    colaborador_selecionado = st.selectbox(
-        "Selecione um colaborador para ver detalhes:",
-        options=df_merged.sort_values('Percentual', ascending=False)['Colaborador(a)'].tolist()
+    data_limite = parametros.data_limite
+    df_previsao = cached_forecast(df_merged, df_real, (chave_arquivo, chave_dataset), data_limite)
+    concluem_p50 = (df_previsao['Conclusao_P50'].isna() | (df_previsao['Conclusao_P50'] <= pd.Timestamp(data_limite))).sum()
+    em_risco = (df_previsao['Prob_Prazo'] < 50).sum()
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("🎲 Chance Média de Cumprir o Prazo", f"{df_previsao['Prob_Prazo'].mean():.1f}%")
+    with col2:
+        st.metric("📅 Concluem até o Prazo (P50)", f"{concluem_p50} de {len(df_previsao)}")
+    with col3:
+        st.metric("⚠️ Em Risco (< 50%)", f"{em_risco} pessoas", delta=None if em_risco == 0 else "atenção", delta_color="inverse")
+    
+    st.dataframe(
+        df_previsao.sort_values('Prob_Prazo', kind='stable'),
+        use_container_width=True,
+        hide_index=True,
+        height=300,
+        column_config={
+            'Colaborador(a)': st.column_config.TextColumn('Colaborador(a)'),
+            'Horas_Restantes': st.column_config.NumberColumn('Horas Restantes', format="%dh"),
+            'Ritmo_Historico': st.column_config.NumberColumn('Ritmo Atual', format="%.2fh/dia"),
+            'Conclusao_P50': st.column_config.DateColumn('Conclusão (P50)', format="DD/MM/YYYY"),
+            'Conclusao_P90': st.column_config.DateColumn('Conclusão (P90)', format="DD/MM/YYYY"),
+            'Prob_Prazo': st.column_config.ProgressColumn('Chance no Prazo', format="%.1f%%", min_value=0, max_value=100),
+        }
     )
     
-    # Dados do colaborador selecionado
-    dados_colab = df_merged[df_merged['Colaborador(a)'] == colaborador_selecionado].iloc[0]
-    df_cursos_colab = df_real[df_real['Colaborador(a)'] == colaborador_selecionado].copy()
+    # ==================== EVOLUÇÃO ====================
     
-    col1, col2 = st.columns([1, 2])
+    cronometro.marcar('evolucao')
+    render_history_trend(fonte_historico, detail_index(df_merged, chave_dataset)[3])
     
-    with col1:
-        # Gauge de progresso
-        fig_gauge = create_gauge_chart(dados_colab['Percentual'], colaborador_selecionado)
-        st.plotly_chart(fig_gauge, use_container_width=True)
-        
-        # Métricas
-        st.markdown(f"**Horas Planejadas:** {int(dados_colab['horas totais'])}h")
-        st.markdown(f"**Horas Concluídas:** {int(dados_colab['Horas_Realizadas'])}h")
-        st.markdown(f"**Horas Pendentes:** {int(dados_colab['Horas_Pendentes'])}h")
+    # ==================== DETALHAMENTO ====================
     
-    with col2:
-        # Contagem por status
-        status_counts = df_cursos_colab['Status'].value_counts()
-        
-        col_a, col_b, col_c = st.columns(3)
-        with col_a:
-            st.metric("✅ Concluídos", status_counts.get('Concluído', 0))
-        with col_b:
-            st.metric("🔄 Em Andamento", status_counts.get('Em Andamento', 0))
-        with col_c:
-            st.metric("❌ Pendentes", status_counts.get('Pendente', 0))
-        
-        # Tabela de cursos
-        st.markdown("#### Cursos")
-        
-        df_display = df_cursos_colab[['Curso', 'Carga Horária', 'Status']].copy()
-        df_display['Ícone'] = df_display['Status'].apply(get_status_icon)
-        df_display = df_display[['Ícone', 'Curso', 'Carga Horária', 'Status']]
-        
-        # Aplica estilo
-        def highlight_status(row):
-            if row['Status'] == 'Concluído':
-                return ['background-color: #d4edda'] * len(row)
-            elif row['Status'] == 'Em Andamento':
-                return ['background-color: #fff3cd'] * len(row)
-            else:
-                return ['background-color: #f8d7da'] * len(row)
-        
-        st.dataframe(
-            df_display.style.apply(highlight_status, axis=1),
-            use_container_width=True,
-            height=300
-        )
+    cronometro.marcar('detalhamento')
+    render_collaborator_detail(df_merged, grupos, chave_dataset, cubo)
     
     # ==================== VISÃO GERAL DE TODOS ====================
     
+    cronometro.marcar('visao_geral')
     st.markdown("---")
     st.markdown("## 👥 Visão Geral - Todos os Colaboradores")
     
-    # Expanders para cada colaborador
-    for _, row in df_merged.sort_values('Percentual', ascending=False).iterrows():
-        df_colab = df_real[df_real['Colaborador(a)'] == row['Colaborador(a)']].copy()
+    # Filtros e ordenação (aplicados no servidor, antes de montar a página)
+    col1, col2, col3, col4 = st.columns([2, 1, 1, 1])
+    with col1:
+        busca = st.text_input("🔎 Buscar colaborador", key="visao_geral_busca")
+    with col2:
+        faixa = st.selectbox("Faixa de progresso", list(FAIXAS_PROGRESSO), key="visao_geral_faixa")
+    with col3:
+        ordem = st.selectbox("Ordenar por", list(ORDENACOES_VISAO_GERAL), key="visao_geral_ordem")
+    with col4:
+        por_pagina = st.selectbox("Por página", [10, 25, 50, 100], key="visao_geral_por_pagina")
+    
+    df_visao = filter_overview(df_merged, faixa, busca, ordem)
+    total_paginas = max(1, -(-len(df_visao) // por_pagina))
+    
+    # Filtros mais restritivos podem deixar a página atual fora do intervalo
+    if st.session_state.get('visao_geral_pagina', 1) > total_paginas:
+        st.session_state['visao_geral_pagina'] = total_paginas
+    
+    col1, col2 = st.columns([1, 3])
+    with col1:
+        pagina = st.number_input("Página", min_value=1, max_value=total_paginas, step=1, key="visao_geral_pagina")
+    inicio = (pagina - 1) * por_pagina
+    df_pagina = df_visao.iloc[inicio:inicio + por_pagina]
+    with col2:
+        st.caption(
+            f"Mostrando {inicio + 1 if len(df_pagina) else 0}–{inicio + len(df_pagina)} "
+            f"de {len(df_visao)} colaboradores (página {pagina} de {total_paginas})"
+        )
+    
+    # Expanders apenas para os colaboradores da página atual
+    colunas_chave = pipeline.collaborator_key_columns(df_merged)
+    alterados = mudancas.afetados(df_pagina) if mudancas is not None else [False] * len(df_pagina)
+    for colab_alterado, (_, row) in zip(alterados, df_pagina.iterrows()):
+        chave_colab = pipeline.collaborator_key(row, colunas_chave)
+        df_colab = grupos.get(chave_colab)
         
-        status_counts = df_colab['Status'].value_counts()
+        status_counts = cubo.contagem(chave_colab)
         concluidos = status_counts.get('Concluído', 0)
         andamento = status_counts.get('Em Andamento', 0)
         pendentes = status_counts.get('Pendente', 0)
@@ -993,7 +1465,10 @@ def main():
         else:
             icon = "🔴"
         
-        with st.expander(f"{icon} **{row['Colaborador(a)']}** - {row['Percentual']:.1f}% ({int(row['Horas_Realizadas'])}h / {int(row['horas totais'])}h)"):
+        alterado = "✏️ " if colab_alterado else ""
+        departamento = f" · {row['Departamento']}" if 'Departamento' in row else ""
+        
+        with st.expander(f"{icon} {alterado}**{row['Colaborador(a)']}** - {row['Percentual']:.1f}% ({int(row['Horas_Realizadas'])}h / {int(row['horas totais'])}h){departamento}"):
             col1, col2, col3, col4 = st.columns(4)
             
             with col1:
@@ -1015,51 +1490,30 @@ def main():
             
             st.markdown("")
             
-            # Lista de cursos resumida
-            df_display = df_colab[['Curso', 'Carga Horária', 'Status']].copy()
-            df_display['Ícone'] = df_display['Status'].apply(get_status_icon)
-            
-            st.dataframe(
-                df_display[['Ícone', 'Curso', 'Carga Horária', 'Status']],
-                use_container_width=True,
-                hide_index=True
-            )
+            # Lista de cursos: só é montada e enviada ao navegador quando pedida
+            if st.toggle("📚 Ver cursos", key=f"visao_geral_cursos_{row.get('Departamento', '')}_{row['Id colaborador(a)']}_{row['Colaborador(a)']}"):
+                st.dataframe(
+                    course_display(df_colab),
+                    use_container_width=True,
+                    hide_index=True
+                )
     
     # ==================== BOTÃO GERAR PDF ====================
     
-    st.markdown("---")
-    st.markdown("## 📄 Exportar Relatório")
-    
-    col1, col2, col3 = st.columns([1, 2, 1])
+    cronometro.marcar('exportar')
+    render_report_export(
+        df_merged, df_real, grupos, cubo, parametros,
+        chave_relatorio=report_cache_key(chave_arquivo, chave_dataset, parametros)
+    )
     
-    with col2:
-        st.markdown("""
-        <div style="text-align: center; padding: 20px; background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); border-radius: 15px; color: white;">
-            <h3>📥 Gerar Relatório em PDF</h3>
-            <p>Clique no botão abaixo para gerar o relatório executivo em PDF (máx. 3 páginas)</p>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        st.markdown("")
-        
-        if st.button("📄 Gerar PDF", type="primary", use_container_width=True):
-            with st.spinner("Gerando PDF..."):
-                html_content = generate_pdf_content(
-                    df_merged, df_real, percentual_geral, 
-                    total_realizado, total_planejado
-                )
-                
-                # Salva HTML
-                st.download_button(
-                    label="📥 Baixar HTML do Relatório",
-                    data=html_content,
-                    file_name=f"relatorio_cursos_{datetime.now().strftime('%Y%m%d_%H%M')}.html",
-                    mime="text/html",
-                    use_container_width=True
-                )
-                
-                st.success("✅ Relatório gerado! Abra o arquivo HTML no navegador e use Ctrl+P para salvar como PDF.")
-                st.info("💡 **Dica:** No Chrome/Edge, ao imprimir, selecione 'Salvar como PDF' e marque 'Gráficos de fundo' nas opções.")
+    return {
+        'tela': 'dashboard',
+        'chave': chave_arquivo,
+        'origem': origem,
+        'arquivos': len(arquivos),
+        'colaboradores': len(df_merged),
+        'cursos': len(df_real),
+    }
 
 
 if __name__ == "__main__":
@@ -0,0 +1,63 @@
+"""Gerador de planilhas sintéticas (abas Plano e Real) para os benchmarks.
+
+Uso:
+    python -m benchmarks.generate_workbook 1000 100000 planilha.xlsx
+
+As linhas são gravadas com o modo write-only do openpyxl, então mesmo
+planilhas com 1M de cursos são geradas sem carregar tudo em memória.
+"""
+
+import argparse
+from datetime import datetime
+
+import numpy as np
+from openpyxl import Workbook
+
+RESPOSTAS = np.array(['Sim', 'Não', 'sim', 'Em andamento', 'S', None], dtype=object)
+CARGAS = np.array([4, 8, 16, 20, 40])
+HORAS_PLANO = np.array([80, 120, 200])
+DATAS_INICIO = np.array([None, '-', datetime(2026, 3, 1), datetime(2026, 6, 15)], dtype=object)
+
+
+def generate_workbook(destino, colaboradores, cursos, seed=0):
+    """Grava uma planilha com `colaboradores` no plano e `cursos` linhas no Real
+
+    Os cursos são distribuídos entre os colaboradores de forma aproximadamente
+    uniforme; respostas, cargas horárias e datas são sorteadas com `seed`.
+    """
+    rng = np.random.default_rng(seed)
+    wb = Workbook(write_only=True)
+
+    plano = wb.create_sheet('Plano')
+    plano.append(['Id colaborador(a)', 'Colaborador(a)', 'horas totais', 'Área'])
+    horas = rng.choice(HORAS_PLANO, colaboradores)
+    for i in range(colaboradores):
+        plano.append([i + 1, f'Colaborador {i + 1}', int(horas[i]), 'Área sintética'])
+
+    real = wb.create_sheet('Real')
+    real.append(['Id colaborador(a)', 'Colaborador(a)', 'Curso', 'Carga Horária',
+                 'Finalizou o curso?', 'Data de início'])
+    ids = np.sort(rng.integers(1, colaboradores + 1, cursos))
+    cargas = rng.choice(CARGAS, cursos)
+    respostas = rng.choice(RESPOSTAS, cursos)
+    datas = rng.choice(DATAS_INICIO, cursos)
+    for i in range(cursos):
+        colab = int(ids[i])
+        real.append([colab, f'Colaborador {colab}', f'Curso {i % 500}', int(cargas[i]), respostas[i], datas[i]])
+
+    wb.save(destino)
+    return destino
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gera uma planilha sintética de cursos.")
+    parser.add_argument('colaboradores', type=int)
+    parser.add_argument('cursos', type=int)
+    parser.add_argument('destino')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+    generate_workbook(args.destino, args.colaboradores, args.cursos, args.seed)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""Custo dos cartões do detalhamento do relatório, para o corte do paralelismo.
+
+Uso:
+    python -m benchmarks.report_cards                         # 10k colaboradores, 100k cursos
+    python -m benchmarks.report_cards --colaboradores 1000 --cursos 10000
+
+Mede, por cartão, o tempo de renderização e o custo que o processo principal
+paga para enviar os argumentos a um processo do pool e receber o HTML de volta
+(pickle nos dois sentidos), além do tempo para subir o pool. Com `w` processos,
+o pool só compensa quando n * (render * (1 - 1/w) - ipc) > subida do pool; o
+comando imprime esse número de colaboradores para alguns valores de `w`. As
+constantes CUSTO_* do report.py vêm daqui.
+"""
+
+import argparse
+import pickle
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from pace import PARAMETROS_PADRAO
+from pipeline import load_and_process
+from report import _render_args
+
+from .generate_workbook import generate_workbook
+
+DADOS_DIR = Path(__file__).resolve().parent / '.data'
+
+
+def measure_card_costs(colaboradores, cursos):
+    """Retorna (render, ipc, subida do pool) em segundos; os dois primeiros por cartão"""
+    DADOS_DIR.mkdir(parents=True, exist_ok=True)
+    caminho = DADOS_DIR / f'planilha_{colaboradores}_{cursos}.xlsx'
+    if not caminho.exists():
+        generate_workbook(caminho, colaboradores, cursos)
+    df_merged, _, grupos, _, _ = load_and_process(caminho.read_bytes())
+    cursos_por_colab = grupos.records(['Curso', 'Carga Horária', 'Status'])
+    args = [
+        (nome, 50.0, 100, 50, 50, 1.5, cursos_por_colab.get(nome, []), PARAMETROS_PADRAO.faixas)
+        for nome in df_merged['Colaborador(a)'].tolist()
+    ]
+
+    inicio = time.perf_counter()
+    cartoes = [_render_args(a) for a in args]
+    render = (time.perf_counter() - inicio) / len(args)
+
+    inicio = time.perf_counter()
+    for a, cartao in zip(args, cartoes):
+        pickle.loads(pickle.dumps(a))
+        pickle.loads(pickle.dumps(cartao))
+    ipc = (time.perf_counter() - inicio) / len(args)
+
+    inicio = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        list(pool.map(abs, [1, 2]))
+    subida = time.perf_counter() - inicio
+    return render, ipc, subida
+
+
+def break_even(render, ipc, subida, workers):
+    """Colaboradores a partir dos quais `workers` processos compensam (None: nunca)"""
+    ganho = render * (1 - 1 / workers) - ipc
+    return round(subida / ganho) if ganho > 0 else None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Custo dos cartões do detalhamento do relatório.")
+    parser.add_argument('--colaboradores', type=int, default=10_000)
+    parser.add_argument('--cursos', type=int, default=100_000)
+    args = parser.parse_args(argv)
+
+    render, ipc, subida = measure_card_costs(args.colaboradores, args.cursos)
+    print(f"render {render * 1e6:.1f} µs/cartão · ipc {ipc * 1e6:.1f} µs/cartão · subida do pool {subida * 1e3:.0f} ms")
+    for workers in (2, 4, 8, 16):
+        minimo = break_even(render, ipc, subida, workers)
+        print(f"  {workers:>2} processos: compensa a partir de {minimo if minimo else '—'} colaboradores")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,201 @@
+"""Benchmark das etapas do pipeline em planilhas sintéticas de vários tamanhos.
+
+Uso:
+    python -m benchmarks.run                      # tamanhos xs, s e m
+    python -m benchmarks.run --tamanhos l xl      # até 1M de cursos
+    python -m benchmarks.run --salvar-baseline    # grava a referência
+
+Para cada etapa mede o melhor tempo entre as repetições, a vazão (linhas de
+curso por segundo) e o pico de memória alocada (tracemalloc, numa execução à
+parte para não distorcer o tempo). Havendo um baseline salvo, as etapas que
+ficaram mais lentas que a tolerância são marcadas como regressão e o comando
+termina com código 1.
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import date, datetime
+from pathlib import Path
+
+import pandas as pd
+
+from app import calcular_dias_uteis_2026, create_bar_chart, create_pace_chart
+from business_calendar import count_business_days
+from forecast import forecast_completion
+from pace import PARAMETROS_PADRAO
+from pipeline import load_data, process_data
+from report import generate_pdf_content
+
+from .generate_workbook import generate_workbook
+
+# Nome -> (colaboradores, linhas de curso)
+TAMANHOS = {
+    'xs': (10, 100),
+    's': (100, 1_000),
+    'm': (1_000, 10_000),
+    'l': (10_000, 100_000),
+    'xl': (10_000, 1_000_000),
+}
+
+DIRETORIO = Path(__file__).resolve().parent
+DADOS_DIR = DIRETORIO / '.data'
+BASELINE = DIRETORIO / 'baseline.json'
+
+# Quanto uma etapa pode ficar mais lenta que o baseline antes de ser regressão
+TOLERANCIA = 0.25
+# Diferenças absolutas menores que isso (segundos) são ruído de medição
+MIN_DIFERENCA = 0.005
+
+
+def _planilha(colaboradores, cursos):
+    """Caminho da planilha sintética do tamanho pedido, gerando-a se preciso"""
+    DADOS_DIR.mkdir(parents=True, exist_ok=True)
+    caminho = DADOS_DIR / f'planilha_{colaboradores}_{cursos}.xlsx'
+    if not caminho.exists():
+        generate_workbook(caminho, colaboradores, cursos)
+    return caminho
+
+
+def _medir(func, repeticoes, preparar=tuple):
+    """Retorna (melhor tempo, pico de memória em bytes, resultado) de func(*preparar())"""
+    tempos = []
+    for _ in range(repeticoes):
+        args = preparar()
+        inicio = time.perf_counter()
+        resultado = func(*args)
+        tempos.append(time.perf_counter() - inicio)
+
+    args = preparar()
+    tracemalloc.start()
+    try:
+        func(*args)
+        pico = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return min(tempos), pico, resultado
+
+
+def _gerar_relatorio(df_merged, df_real, workers):
+    total_planejado = df_merged['horas totais'].sum()
+    total_realizado = df_merged['Horas_Realizadas'].sum()
+    with open(os.devnull, 'w', encoding='utf-8') as destino:
+        generate_pdf_content(
+            df_merged, df_real, total_realizado / total_planejado * 100, total_realizado, total_planejado,
+            output=destino, workers=workers
+        )
+
+
+def run_size(colaboradores, cursos, repeticoes=3, workers=1):
+    """Mede cada etapa do pipeline numa planilha com o tamanho informado"""
+    dados = _planilha(colaboradores, cursos).read_bytes()
+    etapas = {}
+
+    def medir(nome, func, preparar=tuple, por_linha=True):
+        segundos, pico, resultado = _medir(func, repeticoes, preparar)
+        etapas[nome] = {
+            'segundos': round(segundos, 6),
+            'linhas_por_segundo': round(cursos / segundos) if segundos and por_linha else None,
+            'pico_memoria_mb': round(pico / 2**20, 2),
+        }
+        return resultado
+
+    df_plano, df_real = medir('load_data', lambda: load_data(io.BytesIO(dados)))
+    df_merged, df_real = medir(
+        'process_data', process_data, lambda: (df_plano.copy(), df_real.copy())
+    )
+    medir(
+        'calcular_dias_uteis_2026',
+        lambda: calcular_dias_uteis_2026(date.today(), PARAMETROS_PADRAO.data_limite),
+        lambda: count_business_days.cache_clear() or (),
+        por_linha=False,
+    )
+    medir('create_pace_chart', lambda: create_pace_chart(df_merged))
+    medir('create_bar_chart', lambda: create_bar_chart(df_merged))
+    medir('forecast_completion', lambda: forecast_completion(df_merged, df_real, PARAMETROS_PADRAO.data_limite))
+    medir('generate_pdf_content', lambda: _gerar_relatorio(df_merged, df_real, workers))
+
+    return {'colaboradores': colaboradores, 'cursos': cursos, 'etapas': etapas}
+
+
+def compare(atual, baseline, tolerancia=TOLERANCIA):
+    """Lista (tamanho, etapa, segundos no baseline, segundos agora) das regressões"""
+    regressoes = []
+    for tamanho, resultado in atual['tamanhos'].items():
+        referencia = baseline.get('tamanhos', {}).get(tamanho)
+        if referencia is None:
+            continue
+        for etapa, medida in resultado['etapas'].items():
+            antes = referencia['etapas'].get(etapa, {}).get('segundos')
+            agora = medida['segundos']
+            if antes is not None and agora > antes * (1 + tolerancia) and agora - antes > MIN_DIFERENCA:
+                regressoes.append((tamanho, etapa, antes, agora))
+    return regressoes
+
+
+def _imprimir(tamanho, resultado):
+    print(f"\n[{tamanho}] {resultado['colaboradores']} colaboradores, {resultado['cursos']} cursos")
+    print(f"  {'etapa':<26}{'tempo (s)':>12}{'linhas/s':>14}{'pico (MB)':>12}")
+    for etapa, medida in resultado['etapas'].items():
+        vazao = medida['linhas_por_segundo']
+        print(f"  {etapa:<26}{medida['segundos']:>12.4f}{vazao if vazao is not None else '-':>14}"
+              f"{medida['pico_memoria_mb']:>12.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark das etapas do pipeline.")
+    parser.add_argument('--tamanhos', nargs='+', choices=TAMANHOS, default=['xs', 's', 'm'])
+    parser.add_argument('--repeticoes', type=int, default=3)
+    parser.add_argument('--workers', type=int, default=1, help="Processos do relatório (padrão: 1)")
+    parser.add_argument('--baseline', type=Path, default=BASELINE)
+    parser.add_argument('--salvar-baseline', action='store_true', help="Grava o resultado como baseline")
+    parser.add_argument('--tolerancia', type=float, default=TOLERANCIA)
+    parser.add_argument('--saida', type=Path, help="Grava o resultado desta execução em JSON")
+    args = parser.parse_args(argv)
+
+    atual = {
+        'executado_em': datetime.now().isoformat(timespec='seconds'),
+        'ambiente': {
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'plataforma': platform.platform(),
+            'cpus': os.cpu_count(),
+        },
+        'tamanhos': {},
+    }
+    for tamanho in args.tamanhos:
+        resultado = run_size(*TAMANHOS[tamanho], repeticoes=args.repeticoes, workers=args.workers)
+        atual['tamanhos'][tamanho] = resultado
+        _imprimir(tamanho, resultado)
+
+    if args.saida:
+        args.saida.write_text(json.dumps(atual, indent=2, ensure_ascii=False), encoding='utf-8')
+
+    if args.salvar_baseline:
+        # Mantém os tamanhos do baseline que não foram medidos nesta execução
+        baseline = json.loads(args.baseline.read_text(encoding='utf-8')) if args.baseline.exists() else {}
+        baseline.update({k: v for k, v in atual.items() if k != 'tamanhos'})
+        baseline.setdefault('tamanhos', {}).update(atual['tamanhos'])
+        args.baseline.write_text(json.dumps(baseline, indent=2, ensure_ascii=False), encoding='utf-8')
+        print(f"\nBaseline gravado em {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print(f"\nSem baseline em {args.baseline} (use --salvar-baseline para criar)")
+        return 0
+
+    regressoes = compare(atual, json.loads(args.baseline.read_text(encoding='utf-8')), args.tolerancia)
+    for tamanho, etapa, antes, agora in regressoes:
+        print(f"REGRESSÃO [{tamanho}] {etapa}: {antes:.4f}s -> {agora:.4f}s ({agora / antes - 1:+.0%})")
+    if not regressoes:
+        print("\nSem regressões em relação ao baseline")
+    return 1 if regressoes else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,129 @@
+"""Calendário de dias úteis com feriados plugáveis por ano e região.
+
+A contagem usa `numpy.busday_count` (vetorizada, em C) sobre um
+`numpy.busdaycalendar` com os feriados do período, e os resultados são
+memoizados por (região, início, fim). Novos conjuntos de feriados podem ser
+registrados com `register_holidays`.
+"""
+
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+
+import numpy as np
+
+
+def _pascoa(ano):
+    """Data do domingo de Páscoa (algoritmo gregoriano anônimo)"""
+    a = ano % 19
+    b, c = divmod(ano, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    mes, dia = divmod(h + l - 7 * m + 114, 31)
+    return date(ano, mes, dia + 1)
+
+
+def feriados_nacionais_br(ano):
+    """Feriados nacionais do Brasil (mais a quarta de cinzas, que muitas empresas emendam)"""
+    pascoa = _pascoa(ano)
+    return [
+        date(ano, 1, 1),                 # Confraternização Universal
+        pascoa - timedelta(days=48),     # Carnaval (segunda)
+        pascoa - timedelta(days=47),     # Carnaval (terça)
+        pascoa - timedelta(days=46),     # Quarta de cinzas
+        pascoa - timedelta(days=2),      # Sexta-feira Santa
+        date(ano, 4, 21),                # Tiradentes
+        date(ano, 5, 1),                 # Dia do Trabalho
+        pascoa + timedelta(days=60),     # Corpus Christi
+        date(ano, 9, 7),                 # Independência do Brasil
+        date(ano, 10, 12),               # Nossa Senhora Aparecida
+        date(ano, 11, 2),                # Finados
+        date(ano, 11, 15),               # Proclamação da República
+        date(ano, 12, 25),               # Natal
+    ]
+
+
+# Região -> lista de funções ano -> feriados; os conjuntos de uma região são somados
+_PROVEDORES = {
+    'BR': [feriados_nacionais_br],
+}
+
+
+def register_holidays(regiao, provedor, base='BR'):
+    """Registra feriados de uma região (ex.: estaduais/municipais)
+
+    `provedor` recebe o ano e devolve uma lista de datas. A região herda os
+    feriados de `base` (use base=None para um calendário independente).
+    """
+    provedores = list(_PROVEDORES.get(regiao) or (_PROVEDORES[base] if base else []))
+    provedores.append(provedor)
+    _PROVEDORES[regiao] = provedores
+    _calendario.cache_clear()
+    count_business_days.cache_clear()
+
+
+def holidays(regiao, ano_inicio, ano_fim):
+    """Feriados da região entre os anos informados (inclusive), como datetime64[D]"""
+    if regiao not in _PROVEDORES:
+        raise KeyError(f"Região de feriados desconhecida: {regiao!r}")
+    datas = {
+        d
+        for ano in range(ano_inicio, ano_fim + 1)
+        for provedor in _PROVEDORES[regiao]
+        for d in provedor(ano)
+    }
+    return np.array(sorted(datas), dtype='datetime64[D]')
+
+
+@lru_cache(maxsize=64)
+def _calendario(regiao, ano_inicio, ano_fim):
+    return np.busdaycalendar(weekmask='1111100', holidays=holidays(regiao, ano_inicio, ano_fim))
+
+
+@lru_cache(maxsize=1024)
+def count_business_days(data_inicio, data_fim, regiao='BR'):
+    """Dias úteis entre duas datas (ambas inclusive), sem fins de semana e feriados"""
+    if isinstance(data_inicio, datetime):
+        data_inicio = data_inicio.date()
+    if isinstance(data_fim, datetime):
+        data_fim = data_fim.date()
+    if data_fim < data_inicio:
+        return 0
+    calendario = _calendario(regiao, data_inicio.year, data_fim.year)
+    return int(np.busday_count(data_inicio, data_fim + timedelta(days=1), busdaycal=calendario))
+
+
+def count_business_days_array(datas_inicio, data_fim, regiao='BR'):
+    """Versão vetorizada de count_business_days: vários inícios, um mesmo fim
+
+    `datas_inicio` é um array datetime64[D]; inícios depois do fim contam 0.
+    """
+    datas_inicio = np.asarray(datas_inicio, dtype='datetime64[D]')
+    if isinstance(data_fim, datetime):
+        data_fim = data_fim.date()
+    if len(datas_inicio) == 0:
+        return np.zeros(0, dtype=np.int64)
+    ano_inicio = min(int(str(datas_inicio.min())[:4]), data_fim.year)
+    calendario = _calendario(regiao, ano_inicio, data_fim.year)
+    fim = np.datetime64(data_fim + timedelta(days=1), 'D')
+    return np.maximum(np.busday_count(datas_inicio, fim, busdaycal=calendario), 0)
+
+
+def add_business_days(data_inicio, dias, regiao='BR'):
+    """Data em que se completam `dias` dias úteis a partir de `data_inicio` (vetorizada)
+
+    `dias` pode ser um escalar ou um array de inteiros; o resultado é
+    datetime64[D]. Com dias=1 e `data_inicio` útil, devolve a própria data.
+    """
+    if isinstance(data_inicio, datetime):
+        data_inicio = data_inicio.date()
+    dias = np.asarray(dias, dtype=np.int64)
+    # Anos suficientes para cobrir o maior deslocamento (~250 dias úteis por ano)
+    ano_fim = data_inicio.year + int(dias.max(initial=0)) // 240 + 1
+    calendario = _calendario(regiao, data_inicio.year, ano_fim)
+    inicio = np.busday_offset(np.datetime64(data_inicio, 'D'), 0, roll='forward', busdaycal=calendario)
+    return np.busday_offset(inicio, np.maximum(dias - 1, 0), roll='forward', busdaycal=calendario)
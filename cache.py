@@ -0,0 +1,272 @@
+"""Caches compartilhados entre reruns e sessões do Streamlit.
+
+O Streamlit reexecuta o app.py a cada interação, então variáveis globais do
+script são recriadas em todo rerun. Este módulo é apenas importado (não é
+reexecutado), por isso os caches registrados aqui sobrevivem aos reruns e são
+compartilhados por todas as sessões do mesmo processo. O cache em disco
+(`FrameDiskCache`) sobrevive também a reinícios do servidor.
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+
+class LRUCache:
+    """Cache LRU com limite de entradas e expiração opcional (TTL, em segundos)"""
+
+    def __init__(self, max_entries=8, ttl=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.RLock()
+
+    def _expirado(self, criado_em):
+        return self.ttl is not None and (time.monotonic() - criado_em) > self.ttl
+
+    def get(self, key, default=None):
+        """Retorna o valor da chave (ou `default`), atualizando hits/misses"""
+        with self._lock:
+            item = self._data.get(key)
+            if item is None or self._expirado(item[1]):
+                if item is not None:
+                    del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def put(self, key, value):
+        """Armazena o valor, descartando as entradas menos usadas se passar do limite"""
+        with self._lock:
+            self._data[key] = (value, time.monotonic())
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def get_or_compute(self, key, func):
+        """Retorna (valor, hit). Em caso de miss, calcula com `func()` e armazena"""
+        sentinela = object()
+        valor = self.get(key, sentinela)
+        if valor is not sentinela:
+            return valor, True
+        valor = func()
+        self.put(key, valor)
+        return valor, False
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """Resumo do estado do cache para exibição na interface"""
+        with self._lock:
+            return {
+                'entradas': len(self._data),
+                'max_entradas': self.max_entries,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            return item is not None and not self._expirado(item[1])
+
+
+class FrameDiskCache:
+    """Cache em disco de DataFrames em Parquet, chaveado pelo hash do arquivo
+
+    Cada entrada é um diretório com um arquivo .parquet por frame. Ao passar do
+    limite de entradas, as mais antigas são removidas.
+    """
+
+    def __init__(self, directory, max_entries=20):
+        self.directory = Path(directory)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _entrada(self, key):
+        return self.directory / key
+
+    def get(self, key, nomes):
+        """Retorna {nome: DataFrame} da entrada, ou None se ela não existir"""
+        # Import local: o app importa este módulo antes de precisar do pandas
+        import pandas as pd
+        
+        entrada = self._entrada(key)
+        try:
+            frames = {
+                nome: pd.read_parquet(entrada / f'{nome}.parquet', memory_map=True)
+                for nome in nomes
+            }
+        except (OSError, ValueError, ImportError):
+            # Entrada ausente, incompleta ou corrompida: trata como miss
+            self.misses += 1
+            return None
+        self.hits += 1
+        return frames
+
+    def put(self, key, frames):
+        """Grava os frames ({nome: DataFrame}) de forma atômica e aplica a eviction"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp = Path(tempfile.mkdtemp(prefix='.tmp-', dir=self.directory))
+        try:
+            for nome, df in frames.items():
+                df.to_parquet(tmp / f'{nome}.parquet', index=False)
+            os.replace(tmp, self._entrada(key))
+        except (OSError, ValueError, TypeError, ImportError):
+            # Frame não serializável ou entrada gravada ao mesmo tempo por outra
+            # sessão: o cache em disco é só uma otimização, então segue sem ele
+            shutil.rmtree(tmp, ignore_errors=True)
+            return
+        self._evict()
+
+    def _evict(self):
+        with self._lock:
+            entradas = [p for p in self.directory.iterdir() if p.is_dir() and not p.name.startswith('.')]
+            entradas.sort(key=lambda p: p.stat().st_mtime)
+            for antiga in entradas[:max(len(entradas) - self.max_entries, 0)]:
+                shutil.rmtree(antiga, ignore_errors=True)
+
+    def stats(self):
+        entradas = len([p for p in self.directory.glob('*') if p.is_dir() and not p.name.startswith('.')]) \
+            if self.directory.is_dir() else 0
+        return {
+            'entradas': entradas,
+            'max_entradas': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+        }
+
+
+class BytesDiskCache:
+    """Cache em disco de artefatos (bytes), um arquivo por chave, limitado pelo tamanho total
+
+    Ler uma entrada atualiza o mtime dela; ao passar de `max_bytes`, as entradas
+    lidas ou gravadas há mais tempo são removidas primeiro.
+    """
+
+    def __init__(self, directory, max_bytes=200 * 1024 * 1024):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _entrada(self, key):
+        return self.directory / f'{key}.bin'
+
+    def get(self, key):
+        """Retorna os bytes da entrada, ou None se ela não existir"""
+        entrada = self._entrada(key)
+        try:
+            dados = entrada.read_bytes()
+            os.utime(entrada)
+        except OSError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return dados
+
+    def put(self, key, dados):
+        """Grava a entrada de forma atômica e aplica a eviction por tamanho"""
+        tmp = None
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            descritor, tmp = tempfile.mkstemp(prefix='.tmp-', dir=self.directory)
+            with os.fdopen(descritor, 'wb') as arquivo:
+                arquivo.write(dados)
+            os.replace(tmp, self._entrada(key))
+        except OSError:
+            # Disco cheio ou sem permissão: o cache é só uma otimização
+            if tmp is not None:
+                Path(tmp).unlink(missing_ok=True)
+            return
+        self._evict()
+
+    def _arquivos(self):
+        arquivos = []
+        for p in self.directory.glob('*.bin'):
+            try:
+                info = p.stat()
+            except OSError:
+                continue
+            arquivos.append((info.st_mtime, info.st_size, p))
+        return arquivos
+
+    def _evict(self):
+        with self._lock:
+            arquivos = sorted(self._arquivos())
+            total = sum(tamanho for _, tamanho, _ in arquivos)
+            for _, tamanho, antigo in arquivos:
+                if total <= self.max_bytes:
+                    break
+                antigo.unlink(missing_ok=True)
+                total -= tamanho
+
+    def stats(self):
+        arquivos = self._arquivos() if self.directory.is_dir() else []
+        return {
+            'entradas': len(arquivos),
+            'tamanho_mb': round(sum(tamanho for _, tamanho, _ in arquivos) / 2**20, 2),
+            'max_mb': round(self.max_bytes / 2**20, 2),
+            'hits': self.hits,
+            'misses': self.misses,
+        }
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(nome, max_entries=8, ttl=None):
+    """Retorna o cache registrado com este nome, criando-o na primeira chamada"""
+    with _caches_lock:
+        if nome not in _caches:
+            _caches[nome] = LRUCache(max_entries=max_entries, ttl=ttl)
+        return _caches[nome]
+
+
+def get_disk_cache(nome, directory, max_entries=20):
+    """Retorna o cache em disco registrado com este nome, criando-o na primeira chamada"""
+    with _caches_lock:
+        if nome not in _caches:
+            _caches[nome] = FrameDiskCache(directory, max_entries=max_entries)
+        return _caches[nome]
+
+
+def get_bytes_cache(nome, directory, max_bytes=200 * 1024 * 1024):
+    """Retorna o cache de artefatos em disco registrado com este nome, criando-o na primeira chamada"""
+    with _caches_lock:
+        if nome not in _caches:
+            _caches[nome] = BytesDiskCache(directory, max_bytes=max_bytes)
+        return _caches[nome]
+
+
+def all_stats():
+    """Estatísticas de todos os caches registrados, por nome"""
+    with _caches_lock:
+        caches = dict(_caches)
+    return {nome: cache.stats() for nome, cache in caches.items()}
+
+
+def hash_bytes(data):
+    """Hash SHA-256 do conteúdo, usado como chave de cache de arquivos enviados"""
+    return hashlib.sha256(data).hexdigest()
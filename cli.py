@@ -0,0 +1,98 @@
+"""Geração dos relatórios executivos em lote, sem o Streamlit.
+
+Uso:
+    python cli.py planilhas/*.xlsx -o relatorios/
+    python cli.py planilhas/ --consolidado -o relatorios/
+
+Cada planilha gera um relatório HTML (<nome da planilha>.html) no diretório de
+saída. As planilhas são processadas em paralelo, uma por processo. O módulo não
+importa o Streamlit nem o Plotly, então inicia rápido e pode rodar num cron.
+"""
+
+import argparse
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from kpis import build_kpi_cube
+from pipeline import PIPELINE_WORKERS, load_and_process, load_and_process_many
+from report import generate_pdf_content
+
+EXTENSOES = ('.xlsx', '.xls')
+
+
+def listar_planilhas(caminhos):
+    """Expande diretórios nas planilhas .xlsx/.xls que eles contêm"""
+    planilhas = []
+    for caminho in map(Path, caminhos):
+        if caminho.is_dir():
+            planilhas += sorted(
+                p for p in caminho.iterdir()
+                if p.suffix.lower() in EXTENSOES and not p.name.startswith('~$')
+            )
+        else:
+            planilhas.append(caminho)
+    return planilhas
+
+
+def gerar_relatorio(df_merged, df_real, grupos, destino):
+    """Grava o relatório HTML do dataset processado em `destino`"""
+    cube = build_kpi_cube(df_merged, df_real)
+    with open(destino, 'w', encoding='utf-8') as arquivo:
+        generate_pdf_content(
+            df_merged, df_real, cube.percentual_geral, cube.total_realizado, cube.total_planejado,
+            grupos=grupos, output=arquivo, workers=1, cube=cube
+        )
+    return destino
+
+
+def _processar_planilha(caminho, saida):
+    """Lê, processa e gera o relatório de uma planilha (executado no pool)"""
+    df_merged, df_real, grupos, origem, _ = load_and_process(caminho.read_bytes())
+    destino = gerar_relatorio(df_merged, df_real, grupos, saida / f'{caminho.stem}.html')
+    return destino, len(df_merged), origem
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gera os relatórios de cursos a partir das planilhas.")
+    parser.add_argument('planilhas', nargs='+', help="Planilhas .xlsx/.xls ou diretórios com elas")
+    parser.add_argument('-o', '--saida', default='.', help="Diretório dos relatórios (padrão: atual)")
+    parser.add_argument('-j', '--workers', type=int, default=PIPELINE_WORKERS,
+                        help=f"Planilhas processadas em paralelo (padrão: {PIPELINE_WORKERS})")
+    parser.add_argument('--consolidado', action='store_true',
+                        help="Gera também um relatório consolidado de todas as planilhas")
+    args = parser.parse_args(argv)
+
+    planilhas = listar_planilhas(args.planilhas)
+    if not planilhas:
+        parser.error("nenhuma planilha encontrada")
+    saida = Path(args.saida)
+    saida.mkdir(parents=True, exist_ok=True)
+
+    inicio = time.perf_counter()
+    falhas = 0
+    with ProcessPoolExecutor(max_workers=max(1, min(args.workers, len(planilhas)))) as pool:
+        futuros = {pool.submit(_processar_planilha, caminho, saida): caminho for caminho in planilhas}
+        for futuro in as_completed(futuros):
+            try:
+                destino, colaboradores, origem = futuro.result()
+            except Exception as erro:
+                falhas += 1
+                print(f"✗ {futuros[futuro]}: {erro}", file=sys.stderr)
+            else:
+                print(f"✓ {destino} ({colaboradores} colaboradores, {origem})")
+
+    if args.consolidado and not falhas:
+        # As abas já lidas ficam no cache em disco, então o Excel não é relido
+        arquivos = [(caminho.stem, caminho.read_bytes()) for caminho in planilhas]
+        df_merged, df_real, grupos, _, _ = load_and_process_many(arquivos, workers=1)
+        destino = gerar_relatorio(df_merged, df_real, grupos, saida / 'consolidado.html')
+        print(f"✓ {destino} ({len(df_merged)} colaboradores, {len(planilhas)} planilhas)")
+
+    print(f"{len(planilhas) - falhas}/{len(planilhas)} planilhas em {time.perf_counter() - inicio:.1f}s")
+    return 1 if falhas else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
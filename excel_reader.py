@@ -0,0 +1,115 @@
+"""Leitura em streaming das abas do Excel, apenas com as colunas usadas pelo app.
+
+Usa o modo read-only do openpyxl, que percorre as linhas sob demanda em vez de
+carregar a planilha inteira, e monta o DataFrame em blocos de linhas. Assim o
+pico de memória fica limitado mesmo em exportações com centenas de milhares de
+linhas.
+"""
+
+import pandas as pd
+from openpyxl import load_workbook
+
+# Chave do merge entre as abas
+ID_COLUMN = 'Id colaborador(a)'
+
+# Colunas que o pipeline realmente lê de cada aba
+PLANO_COLUMNS = ['Id colaborador(a)', 'Colaborador(a)', 'horas totais']
+REAL_COLUMNS = [
+    'Id colaborador(a)', 'Colaborador(a)', 'Curso', 'Carga Horária',
+    'Finalizou o curso?', 'Data de início',
+]
+
+CHUNK_SIZE = 50_000
+
+# Mesmos textos que o pd.read_excel trata como vazio por padrão
+NA_STRINGS = {
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan',
+    '1.#IND', '1.#QNAN', '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a',
+    'nan', 'null',
+}
+
+
+def _chunk_to_frame(linhas, nomes):
+    df = pd.DataFrame.from_records(linhas, columns=nomes)
+    for col in df.columns:
+        if pd.api.types.is_object_dtype(df[col]) or pd.api.types.is_string_dtype(df[col]):
+            df[col] = df[col].mask(df[col].isin(NA_STRINGS))
+    return df
+
+
+def read_sheet_streaming(workbook, sheet_name, columns, chunk_size=CHUNK_SIZE):
+    """Lê uma aba linha a linha, mantendo só as colunas pedidas que existirem"""
+    linhas = workbook[sheet_name].iter_rows(values_only=True)
+    cabecalho = next(linhas, None) or ()
+
+    indices = [i for i, nome in enumerate(cabecalho) if nome in columns]
+    nomes = [cabecalho[i] for i in indices]
+
+    chunks = []
+    bloco = []
+    for linha in linhas:
+        valores = tuple(linha[i] if i < len(linha) else None for i in indices)
+        # Ignora linhas totalmente vazias (comuns no fim de exportações)
+        if all(v is None for v in valores):
+            continue
+        bloco.append(valores)
+        if len(bloco) >= chunk_size:
+            chunks.append(_chunk_to_frame(bloco, nomes))
+            bloco = []
+
+    if bloco or not chunks:
+        chunks.append(_chunk_to_frame(bloco, nomes))
+
+    return pd.concat(chunks, ignore_index=True) if len(chunks) > 1 else chunks[0]
+
+
+def normalize_frame(df):
+    """Converte colunas com tipos misturados (ex.: datas e '-') para texto
+
+    Deixa o frame com tipos homogêneos por coluna, o que permite gravá-lo em
+    formato colunar (Parquet) sem mudar o resultado do processamento.
+    """
+    for col in df.columns:
+        if pd.api.types.is_object_dtype(df[col]):
+            df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+    return df
+
+
+def _id_texto(valor):
+    # 101.0 (número) e '101' (texto) viram o mesmo texto
+    if isinstance(valor, float) and valor.is_integer():
+        return str(int(valor))
+    return str(valor).strip()
+
+
+def normalize_ids(df_plano, df_real, coluna=ID_COLUMN):
+    """Deixa o Id das duas abas com o mesmo tipo, para que o merge do plano funcione
+
+    A planilha pode guardar o Id como número numa aba e como texto ('101') na
+    outra, ou misturar os dois na mesma coluna. Se todos os Ids das duas abas
+    forem numéricos, as duas ficam com números; senão, as duas ficam com texto.
+    """
+    frames = [df for df in (df_plano, df_real) if coluna in df.columns]
+    numericos = [pd.to_numeric(df[coluna], errors='coerce') for df in frames]
+    if all(n.notna().sum() == df[coluna].notna().sum() for df, n in zip(frames, numericos)):
+        for df, n in zip(frames, numericos):
+            if n.notna().all() and (n % 1 == 0).all():
+                n = n.astype('int64')
+            df[coluna] = n
+    else:
+        for df in frames:
+            df[coluna] = df[coluna].astype(object).map(_id_texto, na_action='ignore')
+    return df_plano, df_real
+
+
+def read_workbook_streaming(source, chunk_size=CHUNK_SIZE):
+    """Lê as abas 'Plano' e 'Real'/'Realizado' de um .xlsx em modo streaming"""
+    wb = load_workbook(source, read_only=True, data_only=True)
+    try:
+        real_sheet = 'Real' if 'Real' in wb.sheetnames else 'Realizado'
+        df_plano = read_sheet_streaming(wb, 'Plano', PLANO_COLUMNS, chunk_size)
+        df_real = read_sheet_streaming(wb, real_sheet, REAL_COLUMNS, chunk_size)
+    finally:
+        wb.close()
+
+    return df_plano, df_real
@@ -0,0 +1,107 @@
+"""Previsão de conclusão do plano por colaborador (Monte Carlo vetorizado).
+
+O ritmo de cada pessoa é estimado pelos cursos já concluídos desde o início
+(a primeira 'Data de início' válida dos cursos dela, ou INICIO_PLANO), em dias
+úteis. A taxa de conclusão de cursos tem uma posterior Gamma, com um prior do
+ritmo médio da equipe para quem tem pouco histórico; as horas que faltam são
+convertidas em cursos pela carga média da pessoa. Cada trajetória sorteia uma
+taxa e o tempo até concluir os cursos restantes (soma de exponenciais, ou seja,
+uma Gamma), tudo em matrizes colaboradores × simulações, sem laços em Python.
+"""
+
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from business_calendar import add_business_days, count_business_days, count_business_days_array
+from pace import REGIAO_FERIADOS
+
+# Início do plano: o ritmo é medido a partir dele para quem não tem data de início válida
+INICIO_PLANO = date(2026, 1, 1)
+SIMULACOES = 2000
+# Peso do ritmo da equipe na estimativa individual, em dias úteis de histórico
+PESO_PRIOR_DIAS = 20
+# Previsões além disso (em dias úteis) ficam no limite
+HORIZONTE_MAX_DIAS = 2500
+
+
+def _historico(df_merged, df_real, hoje):
+    """Cursos concluídos, carga média e dias úteis decorridos de cada linha do df_merged"""
+    chave = ['Id colaborador(a)', 'Colaborador(a)']
+    inicio = df_real['Data de início']
+    if isinstance(inicio.dtype, pd.CategoricalDtype):
+        # Converte só as categorias distintas; o código -1 (vazio) cai no NaT do final
+        datas = pd.to_datetime(pd.Series(inicio.cat.categories, dtype=object), errors='coerce', format='mixed')
+        inicio = np.append(datas.to_numpy(dtype='datetime64[ns]'), np.datetime64('NaT'))[inicio.cat.codes.to_numpy()]
+    else:
+        inicio = pd.to_datetime(inicio.astype(object), errors='coerce', format='mixed').to_numpy(dtype='datetime64[ns]')
+
+    por_pessoa = pd.DataFrame({
+        'concluidos': (df_real['Status'] == 'Concluído').to_numpy(),
+        'carga': df_real['Carga Horária'].to_numpy(dtype=float),
+        'inicio': inicio,
+    }).groupby([df_real[c].to_numpy() for c in chave]).agg(
+        concluidos=('concluidos', 'sum'), carga=('carga', 'mean'), inicio=('inicio', 'min')
+    )
+    por_pessoa = por_pessoa.reindex(pd.MultiIndex.from_arrays([df_merged[c].to_numpy() for c in chave]))
+
+    carga_equipe = df_real['Carga Horária'].mean() if len(df_real) else 1.0
+    carga = por_pessoa['carga'].fillna(carga_equipe).clip(lower=1e-9).to_numpy()
+    concluidos = por_pessoa['concluidos'].fillna(0).to_numpy(dtype=float)
+
+    inicios = por_pessoa['inicio'].to_numpy(dtype='datetime64[D]')
+    # Datas vazias ou anteriores ao plano (ex.: 'jan' vira o ano 1) contam do início do plano
+    inicios = np.where(np.isnat(inicios), np.datetime64(INICIO_PLANO, 'D'), inicios)
+    inicios = np.clip(inicios, np.datetime64(INICIO_PLANO, 'D'), np.datetime64(hoje, 'D'))
+    decorridos = np.maximum(count_business_days_array(inicios, hoje), 1).astype(float)
+    return concluidos, carga, decorridos
+
+
+def forecast_completion(df_merged, df_real, data_limite, hoje=None, simulacoes=SIMULACOES, seed=0,
+                        regiao=REGIAO_FERIADOS):
+    """Simula as datas de conclusão de cada colaborador do df_merged
+
+    Retorna um DataFrame na ordem do df_merged com 'Colaborador(a)',
+    'Horas_Restantes', 'Ritmo_Historico' (horas por dia útil), as datas
+    'Conclusao_P50' e 'Conclusao_P90' (NaT para quem já concluiu) e 'Prob_Prazo',
+    a probabilidade (%) de concluir até `data_limite`.
+    """
+    hoje = hoje or date.today()
+    concluidos, carga, decorridos = _historico(df_merged, df_real, hoje)
+    realizadas = df_merged['Horas_Realizadas'].to_numpy(dtype=float)
+    restantes = np.maximum(df_merged['horas totais'].to_numpy(dtype=float) - realizadas, 0)
+
+    # Posterior Gamma da taxa de cursos por dia útil, com prior no ritmo da equipe
+    taxa_equipe = max(concluidos.sum() / decorridos.sum(), 1e-6)
+    alfa = taxa_equipe * PESO_PRIOR_DIAS + concluidos
+    beta = PESO_PRIOR_DIAS + decorridos
+
+    # Matrizes colaboradores × simulações (float32): taxa sorteada e dias até concluir o restante
+    rng = np.random.default_rng(seed)
+    tamanho = (len(restantes), simulacoes)
+    taxas = rng.standard_gamma(alfa[:, None], size=tamanho, dtype=np.float32)
+    taxas /= beta[:, None].astype(np.float32)
+    np.maximum(taxas, 1e-12, out=taxas)
+    cursos_restantes = np.maximum(restantes / carga, 1e-12)
+    dias = rng.standard_gamma(cursos_restantes[:, None], size=tamanho, dtype=np.float32)
+    dias /= taxas
+    dias[restantes == 0] = 0
+    np.minimum(np.ceil(dias), HORIZONTE_MAX_DIAS, out=dias)
+
+    dias_prazo = count_business_days(hoje, data_limite, regiao)
+    p50, p90 = np.quantile(dias, [0.5, 0.9], axis=1)
+    concluido = restantes == 0
+
+    def _datas(quantil):
+        datas = add_business_days(hoje, quantil.astype(np.int64), regiao).astype('datetime64[ns]')
+        return np.where(concluido, np.datetime64('NaT'), datas)
+
+    return pd.DataFrame({
+        'Colaborador(a)': df_merged['Colaborador(a)'].to_numpy(),
+        'Horas_Restantes': restantes,
+        'Ritmo_Historico': (realizadas / decorridos).round(2),
+        'Conclusao_P50': _datas(p50),
+        'Conclusao_P90': _datas(p90),
+        'Prob_Prazo': ((dias <= dias_prazo).mean(axis=1) * 100).round(1),
+    }, index=df_merged.index)
@@ -0,0 +1,196 @@
+"""Histórico local (SQLite) dos uploads processados, para a visão de evolução.
+
+Cada upload vira um snapshot com os totais da equipe e uma linha por
+colaborador (horas realizadas, percentual e cursos por status). O snapshot é
+identificado pelo hash do conteúdo: reimportar a mesma planilha não duplica o
+histórico e mantém a data em que ela foi vista pela primeira vez. Cada snapshot
+guarda também a fonte (o nome da planilha, ou o conjunto de departamentos no
+modo consolidado), e a evolução só compara snapshots da mesma fonte. As
+consultas da evolução leem só as tabelas já agregadas, pelos índices.
+"""
+
+import os
+import sqlite3
+from contextlib import closing
+from datetime import date, datetime
+
+import pandas as pd
+
+from pipeline import collaborator_index
+
+# Banco do histórico; vazio desativa a gravação e a visão de evolução
+HISTORICO_DB = os.environ.get(
+    'RELATORIO_HISTORICO',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'historico.sqlite3')
+)
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY,
+    chave TEXT NOT NULL UNIQUE,
+    fonte TEXT NOT NULL DEFAULT '',
+    data_referencia TEXT NOT NULL,
+    importado_em TEXT NOT NULL,
+    colaboradores INTEGER NOT NULL,
+    total_planejado REAL NOT NULL,
+    total_realizado REAL NOT NULL,
+    cursos_concluidos INTEGER NOT NULL,
+    cursos_andamento INTEGER NOT NULL,
+    cursos_pendentes INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS colaboradores (
+    snapshot_id INTEGER NOT NULL REFERENCES snapshots (id) ON DELETE CASCADE,
+    colaborador TEXT NOT NULL,
+    id_colaborador TEXT,
+    departamento TEXT,
+    horas_planejadas REAL NOT NULL,
+    horas_realizadas REAL NOT NULL,
+    percentual REAL,
+    cursos_concluidos INTEGER NOT NULL,
+    cursos_andamento INTEGER NOT NULL,
+    cursos_pendentes INTEGER NOT NULL
+);
+"""
+
+# Criados depois de _migrar, que acrescenta a coluna `fonte` a bancos antigos
+INDICES = """
+CREATE INDEX IF NOT EXISTS idx_snapshots_fonte ON snapshots (fonte, data_referencia, id);
+CREATE INDEX IF NOT EXISTS idx_colaboradores_id ON colaboradores (id_colaborador, departamento, snapshot_id);
+CREATE INDEX IF NOT EXISTS idx_colaboradores_snapshot ON colaboradores (snapshot_id);
+"""
+
+# Chaves já gravadas neste processo: evita abrir o banco a cada rerun
+_registrados = set()
+
+
+def _migrar(conexao):
+    colunas = {nome for _, nome, *_ in conexao.execute('PRAGMA table_info(snapshots)')}
+    if 'fonte' not in colunas:
+        # Snapshots gravados antes da coluna ficam numa fonte própria ('')
+        conexao.execute("ALTER TABLE snapshots ADD COLUMN fonte TEXT NOT NULL DEFAULT ''")
+
+
+def _conectar(caminho):
+    os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+    conexao = sqlite3.connect(caminho, timeout=10)
+    conexao.execute('PRAGMA journal_mode=WAL')
+    conexao.execute('PRAGMA foreign_keys=ON')
+    conexao.executescript(ESQUEMA)
+    _migrar(conexao)
+    conexao.executescript(INDICES)
+    return conexao
+
+
+def collaborator_keys(df_merged):
+    """Chave de cada colaborador no histórico: (Id como texto, departamento ou None)"""
+    departamentos = (
+        df_merged['Departamento'].astype(str).tolist() if 'Departamento' in df_merged.columns
+        else [None] * len(df_merged)
+    )
+    return list(zip(df_merged['Id colaborador(a)'].astype(str).tolist(), departamentos))
+
+
+def record_snapshot(chave, df_merged, cube, fonte='', data_referencia=None, caminho=None):
+    """Grava o dataset processado no histórico, se a chave ainda não estiver lá
+
+    `cube` é o KpiCube do dataset completo e `fonte` identifica de onde o
+    dataset veio (veja o docstring do módulo). Retorna True se o snapshot é
+    novo; falhas ao gravar (disco cheio, banco travado) são ignoradas.
+    """
+    caminho = HISTORICO_DB if caminho is None else caminho
+    if not caminho or (caminho, chave) in _registrados:
+        return False
+
+    data_referencia = (data_referencia or date.today()).isoformat()
+    por_status = cube.cursos_por_status
+    chaves = collaborator_index(df_merged)
+    cursos = cube.cursos.reindex(chaves, fill_value=0)
+    # Com a mesma chave em duas linhas do plano, os cursos ficam na primeira
+    # para que as somas por colaborador não dupliquem
+    cursos[chaves.duplicated()] = 0
+    linhas = zip(
+        df_merged['Colaborador(a)'].astype(str),
+        *zip(*collaborator_keys(df_merged)),
+        df_merged['horas totais'].astype(float),
+        df_merged['Horas_Realizadas'].astype(float),
+        df_merged['Percentual'].astype(float),
+        cursos['Concluído'].astype(int),
+        cursos['Em Andamento'].astype(int),
+        cursos['Pendente'].astype(int),
+    )
+
+    try:
+        with closing(_conectar(caminho)) as conexao, conexao:
+            cursor = conexao.execute(
+                'INSERT OR IGNORE INTO snapshots (chave, fonte, data_referencia, importado_em, colaboradores, '
+                'total_planejado, total_realizado, cursos_concluidos, cursos_andamento, cursos_pendentes) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (
+                    chave, fonte, data_referencia, datetime.now().isoformat(timespec='seconds'), cube.colaboradores,
+                    float(cube.total_planejado), float(cube.total_realizado),
+                    int(por_status['Concluído']), int(por_status['Em Andamento']), int(por_status['Pendente']),
+                )
+            )
+            novo = cursor.rowcount == 1
+            if novo:
+                conexao.executemany(
+                    'INSERT INTO colaboradores VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    ((cursor.lastrowid, *linha) for linha in linhas)
+                )
+    except (sqlite3.Error, OSError):
+        # O histórico é complementar: não gravá-lo não deve derrubar o app
+        return False
+    _registrados.add((caminho, chave))
+    return novo
+
+
+def team_trend(fonte='', caminho=None):
+    """Totais da equipe por snapshot da `fonte`, em ordem cronológica"""
+    caminho = HISTORICO_DB if caminho is None else caminho
+    if not caminho or not os.path.exists(caminho):
+        return pd.DataFrame()
+    with closing(_conectar(caminho)) as conexao:
+        df = pd.read_sql_query(
+            'SELECT data_referencia, colaboradores, total_planejado, total_realizado, '
+            'cursos_concluidos, cursos_andamento, cursos_pendentes '
+            'FROM snapshots WHERE fonte = ? ORDER BY data_referencia, id',
+            conexao, params=(fonte,), parse_dates=['data_referencia']
+        )
+    df['percentual'] = df['total_realizado'] / df['total_planejado'] * 100
+    return df
+
+
+def collaborator_trend(colaborador, fonte='', caminho=None):
+    """Evolução de um colaborador nos snapshots da `fonte` em que ele aparece
+
+    `colaborador` é a chave de collaborator_keys: (Id, departamento ou None).
+    """
+    caminho = HISTORICO_DB if caminho is None else caminho
+    if not caminho or not os.path.exists(caminho):
+        return pd.DataFrame()
+    id_colaborador, departamento = colaborador
+    with closing(_conectar(caminho)) as conexao:
+        return pd.read_sql_query(
+            'SELECT s.data_referencia, SUM(c.horas_planejadas) AS total_planejado, '
+            'SUM(c.horas_realizadas) AS total_realizado, '
+            'SUM(c.horas_realizadas) * 100.0 / SUM(c.horas_planejadas) AS percentual, '
+            'SUM(c.cursos_concluidos) AS cursos_concluidos, SUM(c.cursos_andamento) AS cursos_andamento, '
+            'SUM(c.cursos_pendentes) AS cursos_pendentes '
+            'FROM colaboradores c JOIN snapshots s ON s.id = c.snapshot_id '
+            'WHERE s.fonte = ? AND c.id_colaborador = ? AND c.departamento IS ? '
+            'GROUP BY s.id ORDER BY s.data_referencia, s.id',
+            conexao, params=(fonte, id_colaborador, departamento), parse_dates=['data_referencia']
+        )
+
+
+def list_collaborators(fonte='', caminho=None):
+    """Chaves (collaborator_keys) dos colaboradores com histórico na `fonte`"""
+    caminho = HISTORICO_DB if caminho is None else caminho
+    if not caminho or not os.path.exists(caminho):
+        return []
+    with closing(_conectar(caminho)) as conexao:
+        return list(conexao.execute(
+            'SELECT DISTINCT c.id_colaborador, c.departamento FROM colaboradores c '
+            'JOIN snapshots s ON s.id = c.snapshot_id WHERE s.fonte = ?',
+            (fonte,)
+        ))
@@ -0,0 +1,134 @@
+"""Comparação entre um upload novo e o último snapshot processado.
+
+As linhas são casadas pela chave (colaborador, curso) e comparadas por um hash
+das colunas que influenciam o processamento. O resultado diz quais linhas podem
+reaproveitar o status já calculado e quais colaboradores precisam ter as horas
+reagregadas.
+"""
+
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+# Chave do colaborador; com várias planilhas o mesmo Id se repete entre
+# departamentos, então a chave inclui o departamento
+CHAVE_COLABORADOR = ('Id colaborador(a)',)
+CHAVE_COLABORADOR_CONSOLIDADA = ('Departamento', 'Id colaborador(a)')
+# Cursos são casados pela chave do colaborador mais estas colunas
+CHAVE_CURSO = ['Curso']
+COLUNAS_CURSO = ['Colaborador(a)', 'Carga Horária', 'Finalizou o curso?', 'Data de início']
+COLUNAS_PLANO = ['Colaborador(a)', 'horas totais']
+
+
+def collaborator_id_columns(*frames):
+    """Chave do colaborador comum aos frames: com o departamento se todos forem consolidados"""
+    if all('Departamento' in df.columns for df in frames):
+        return CHAVE_COLABORADOR_CONSOLIDADA
+    return CHAVE_COLABORADOR
+
+
+class Snapshot(NamedTuple):
+    """Último dataset processado (hash do arquivo, df_merged e df_real)"""
+    chave: str
+    df_merged: pd.DataFrame
+    df_real: pd.DataFrame
+
+
+class Changes(NamedTuple):
+    """Diferenças entre o snapshot anterior e o upload novo"""
+    # Para cada linha do df_real novo, posição da linha idêntica no snapshot
+    # anterior, ou -1 se a linha é nova ou foi alterada
+    posicao_anterior: np.ndarray
+    # Chaves (colunas em `colunas_chave`) dos colaboradores com algum curso
+    # ou linha do plano diferente: o Id, ou a tupla (departamento, Id)
+    colaboradores: frozenset
+    linhas_alteradas: int
+    linhas_novas: int
+    linhas_removidas: int
+    colunas_chave: tuple = CHAVE_COLABORADOR
+
+    @property
+    def vazio(self):
+        return not self.colaboradores
+
+    def afetados(self, df):
+        """Máscara das linhas de `df` cujo colaborador teve alguma mudança"""
+        colunas = list(self.colunas_chave)
+        if len(colunas) == 1:
+            return df[colunas[0]].isin(self.colaboradores).to_numpy()
+        return pd.MultiIndex.from_frame(df[colunas]).isin(list(self.colaboradores))
+
+
+def _assinar(df, chave, colunas):
+    """Chave (com contador de ocorrência, para chaves repetidas) + hash das colunas"""
+    presentes = [c for c in colunas if c in df.columns]
+    assinado = df[chave].copy()
+    assinado['_ocorrencia'] = df.groupby(chave, sort=False, dropna=False, observed=True).cumcount().to_numpy()
+    assinado['_assinatura'] = pd.util.hash_pandas_object(df[presentes], index=False).to_numpy()
+    assinado['_pos'] = np.arange(len(df))
+    return assinado
+
+
+def _diff(anterior, novo, chave, colunas, colunas_chave):
+    casado = _assinar(novo, chave, colunas).merge(
+        _assinar(anterior, chave, colunas),
+        on=chave + ['_ocorrencia'],
+        how='outer',
+        suffixes=('', '_ant'),
+        indicator=True,
+    )
+    removidas = casado['_merge'] == 'right_only'
+    novas = casado['_merge'] == 'left_only'
+    alteradas = (casado['_merge'] == 'both') & (casado['_assinatura'] != casado['_assinatura_ant'])
+    iguais = (casado['_merge'] == 'both') & ~alteradas
+
+    posicao = np.full(len(novo), -1, dtype=np.int64)
+    posicao[casado.loc[iguais, '_pos'].astype(np.int64)] = casado.loc[iguais, '_pos_ant'].astype(np.int64)
+
+    afetadas = casado.loc[novas | alteradas | removidas, list(colunas_chave)].dropna()
+    if len(colunas_chave) == 1:
+        chaves = set(afetadas[colunas_chave[0]])
+    else:
+        chaves = set(afetadas.itertuples(index=False, name=None))
+    return posicao, chaves, int(alteradas.sum()), int(novas.sum()), int(removidas.sum())
+
+
+def diff_snapshots(anterior, df_plano, df_real):
+    """Compara o upload novo (plano e cursos) com o Snapshot anterior"""
+    colunas_chave = collaborator_id_columns(anterior.df_real, df_real)
+    chave_plano = list(colunas_chave)
+    posicao, chaves_cursos, alteradas, novas, removidas = _diff(
+        anterior.df_real, df_real, chave_plano + CHAVE_CURSO, COLUNAS_CURSO, colunas_chave
+    )
+    _, chaves_plano, *_ = _diff(
+        anterior.df_merged[chave_plano + COLUNAS_PLANO], df_plano[chave_plano + COLUNAS_PLANO],
+        chave_plano, COLUNAS_PLANO, colunas_chave,
+    )
+    return Changes(
+        posicao, frozenset(chaves_cursos | chaves_plano), alteradas, novas, removidas, colunas_chave
+    )
+
+
+def summarize_changes(anterior_merged, df_merged, mudancas):
+    """Tabela com horas e percentual antes/depois dos colaboradores afetados"""
+    chave = list(mudancas.colunas_chave)
+    colunas = chave + ['Colaborador(a)', 'Horas_Realizadas', 'Percentual']
+    antes = anterior_merged.loc[mudancas.afetados(anterior_merged), colunas]
+    depois = df_merged.loc[mudancas.afetados(df_merged), colunas]
+
+    resumo = depois.merge(antes, on=chave, how='outer', suffixes=('', '_antes'))
+    # Categorias diferentes entre os dois uploads: junta os nomes como texto
+    resumo['Colaborador(a)'] = resumo['Colaborador(a)'].astype(object).fillna(resumo['Colaborador(a)_antes'].astype(object))
+    resumo['Δ Horas'] = resumo['Horas_Realizadas'].fillna(0) - resumo['Horas_Realizadas_antes'].fillna(0)
+    resumo['Δ %'] = (resumo['Percentual'].fillna(0) - resumo['Percentual_antes'].fillna(0)).round(1)
+
+    resumo = resumo.rename(columns={
+        'Horas_Realizadas_antes': 'Horas (antes)',
+        'Horas_Realizadas': 'Horas (agora)',
+        'Percentual_antes': '% (antes)',
+        'Percentual': '% (agora)',
+    })
+    departamento = ['Departamento'] if 'Departamento' in chave else []
+    return resumo[['Colaborador(a)'] + departamento + ['Horas (antes)', 'Horas (agora)', 'Δ Horas', '% (antes)', '% (agora)', 'Δ %']] \
+        .sort_values('Δ Horas', ascending=False, key=abs)
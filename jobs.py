@@ -0,0 +1,135 @@
+"""Geração do relatório em segundo plano, com progresso e cancelamento.
+
+`submit_report` enfileira a geração num pool de threads e devolve um
+`ReportJob` na hora; o rerun do Streamlit termina sem esperar o relatório. O
+job recebe o progresso pelo callback `progresso(feitos, total)` da função de
+geração, que também é onde o cancelamento é verificado. Os jobs terminados (e
+os relatórios prontos) ficam num cache LRU com limite de entradas e TTL, então a
+memória usada por relatórios esquecidos é limitada; os que ainda estão na fila
+ou executando ficam fora dele, para que nenhum seja descartado antes de terminar.
+"""
+
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from cache import get_cache
+
+# Relatórios gerados ao mesmo tempo; os demais aguardam na fila
+JOB_WORKERS = int(os.environ.get('RELATORIO_JOB_WORKERS', 2))
+# Jobs terminados mantidos em memória (com o relatório pronto); os menos consultados saem primeiro
+JOB_MAX_ENTRIES = 16
+JOB_TTL = 60 * 60  # segundos
+
+_executor = None
+_executor_lock = threading.Lock()
+
+# Jobs na fila ou executando, por id; vão para o cache LRU ao terminar
+_ativos = {}
+_ativos_lock = threading.Lock()
+
+
+class JobCancelled(Exception):
+    """Levantada dentro da geração quando o job foi cancelado"""
+
+
+class ReportJob:
+    """Um relatório sendo gerado em segundo plano
+
+    `status` é 'na_fila', 'executando', 'concluido', 'cancelado' ou 'erro';
+    `progresso` vai de 0 a 1 e `resultado` guarda o retorno da geração.
+    """
+
+    def __init__(self):
+        self.id = uuid.uuid4().hex
+        self.status = 'na_fila'
+        self.progresso = 0.0
+        self.resultado = None
+        self.erro = None
+        self.concluido_em = None
+        self.segundos = None
+        self._cancelar = threading.Event()
+        self._terminado = threading.Event()
+
+    @property
+    def ativo(self):
+        return self.status in ('na_fila', 'executando')
+
+    def wait(self, timeout=None):
+        """Espera o job terminar (até `timeout` segundos); retorna True se terminou"""
+        return self._terminado.wait(timeout)
+
+    def cancel(self):
+        """Pede o cancelamento; a geração para no próximo pedaço do relatório"""
+        self._cancelar.set()
+
+    def _atualizar(self, feitos, total):
+        if self._cancelar.is_set():
+            raise JobCancelled()
+        self.progresso = min(feitos / total, 1.0) if total else 0.0
+
+    def _executar(self, func, args, kwargs):
+        if self._cancelar.is_set():
+            self.status = 'cancelado'
+            self._terminado.set()
+            return
+        self.status = 'executando'
+        inicio = time.perf_counter()
+        try:
+            self.resultado = func(*args, progresso=self._atualizar, **kwargs)
+        except JobCancelled:
+            self.status = 'cancelado'
+        except Exception as erro:
+            # O erro é exibido na interface de quem pediu o relatório
+            self.erro = f'{type(erro).__name__}: {erro}'
+            self.status = 'erro'
+        else:
+            self.progresso = 1.0
+            self.status = 'concluido'
+        finally:
+            self.segundos = time.perf_counter() - inicio
+            self.concluido_em = datetime.now()
+            self._terminado.set()
+
+
+def _jobs():
+    return get_cache('relatorio_jobs', max_entries=JOB_MAX_ENTRIES, ttl=JOB_TTL)
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix='relatorio')
+        return _executor
+
+
+def _executar_job(job, func, args, kwargs):
+    try:
+        job._executar(func, args, kwargs)
+    finally:
+        # Entra no LRU antes de sair dos ativos, para get_job sempre encontrá-lo
+        _jobs().put(job.id, job)
+        with _ativos_lock:
+            _ativos.pop(job.id, None)
+
+
+def submit_report(func, *args, **kwargs):
+    """Enfileira func(*args, progresso=..., **kwargs) e retorna o ReportJob"""
+    job = ReportJob()
+    with _ativos_lock:
+        _ativos[job.id] = job
+    _get_executor().submit(_executar_job, job, func, args, kwargs)
+    return job
+
+
+def get_job(job_id):
+    """O job com este id, ou None se ele não existe ou já saiu do cache"""
+    if not job_id:
+        return None
+    with _ativos_lock:
+        job = _ativos.get(job_id)
+    return job if job is not None else _jobs().get(job_id)
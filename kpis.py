@@ -0,0 +1,75 @@
+"""Agregação única dos indicadores do dashboard e do relatório.
+
+`build_kpi_cube` percorre o df_real uma vez e monta o cruzamento colaborador ×
+status (quantidade de cursos e horas), além dos totais da equipe. Os cards,
+gráficos e seções do relatório leem os números daqui, em vez de refazer
+filtros e `value_counts()` sobre a tabela de cursos.
+"""
+
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from pipeline import STATUS_CATEGORIES, factorize_collaborators
+
+
+class KpiCube(NamedTuple):
+    """Cursos e horas por colaborador × status, com os totais da equipe"""
+    # Índice pela chave do colaborador (pipeline.collaborator_key_columns),
+    # uma coluna por status (STATUS_CATEGORIES)
+    cursos: pd.DataFrame
+    horas: pd.DataFrame
+    cursos_por_status: pd.Series
+    horas_por_status: pd.Series
+    total_planejado: float
+    total_realizado: float
+    colaboradores: int
+    total_cursos: int
+
+    @property
+    def total_pendente(self):
+        return self.total_planejado - self.total_realizado
+
+    @property
+    def percentual_geral(self):
+        return self.total_realizado / self.total_planejado * 100
+
+    def contagem(self, chave):
+        """Cursos do colaborador com esta chave por status (zeros se ele não tiver cursos)"""
+        if chave in self.cursos.index:
+            return self.cursos.loc[chave]
+        return pd.Series(0, index=STATUS_CATEGORIES)
+
+
+def build_kpi_cube(df_merged, df_real):
+    """Monta o KpiCube a partir do plano agregado e da tabela de cursos"""
+    colaboradores, indice = factorize_collaborators(df_real)
+    status = pd.Categorical(df_real['Status'], categories=STATUS_CATEGORIES).codes.astype(np.int64)
+    n_status = len(STATUS_CATEGORIES)
+
+    # Uma célula (colaborador, status) por linha; linhas sem nome ou status ficam de fora
+    validas = (colaboradores >= 0) & (status >= 0)
+    celula = colaboradores[validas] * n_status + status[validas]
+    tamanho = len(indice) * n_status
+    cursos = np.bincount(celula, minlength=tamanho).reshape(-1, n_status)
+    horas = np.bincount(
+        celula, weights=df_real['Carga Horária'].to_numpy(dtype=float)[validas], minlength=tamanho
+    ).reshape(-1, n_status)
+
+    contagem_status = np.bincount(status[status >= 0], minlength=n_status)
+    horas_status = np.bincount(
+        status[status >= 0], weights=df_real['Carga Horária'].to_numpy(dtype=float)[status >= 0],
+        minlength=n_status
+    )
+
+    return KpiCube(
+        cursos=pd.DataFrame(cursos, index=indice, columns=STATUS_CATEGORIES),
+        horas=pd.DataFrame(horas, index=indice, columns=STATUS_CATEGORIES),
+        cursos_por_status=pd.Series(contagem_status, index=STATUS_CATEGORIES),
+        horas_por_status=pd.Series(horas_status, index=STATUS_CATEGORIES),
+        total_planejado=df_merged['horas totais'].sum(),
+        total_realizado=df_merged['Horas_Realizadas'].sum(),
+        colaboradores=len(df_merged),
+        total_cursos=len(df_real),
+    )
@@ -0,0 +1,87 @@
+"""Parâmetros do prazo e cálculo vetorizado do ritmo necessário.
+
+O prazo final, a fração de dias úteis efetivos e os limites das faixas de
+ritmo ficam num `PaceParams`, compartilhado pelo dashboard, pelo relatório e
+pela previsão. O ritmo de um cenário é uma divisão das horas restantes (já
+extraídas do df_merged em arrays) pelos dias efetivos, e as faixas saem de um
+`searchsorted`: trocar os parâmetros não reprocessa a planilha.
+"""
+
+from datetime import date
+from typing import NamedTuple
+
+import numpy as np
+
+from business_calendar import count_business_days
+
+# Região cujos feriados são descontados no cálculo de dias úteis
+REGIAO_FERIADOS = 'BR'
+
+
+class PaceParams(NamedTuple):
+    """Cenário do prazo: data final, fração de dias úteis efetivos e faixas de ritmo"""
+    data_limite: date = date(2026, 12, 20)
+    # Fração dos dias úteis disponível para estudo (margem para reuniões e imprevistos)
+    fator_efetivo: float = 0.70
+    # Limites (h/dia) de Tranquilo, Bom Ritmo, Atenção e Crítico; acima do último, Plano de Ação
+    faixas: tuple = (1.0, 1.5, 2.0, 3.0)
+
+    @property
+    def ritmo_ideal(self):
+        """Linha de referência do ritmo ideal (limite do Bom Ritmo)"""
+        return self.faixas[1]
+
+    @property
+    def ritmo_maximo(self):
+        """Linha de referência do ritmo máximo (limite da Atenção); acima é crítico"""
+        return self.faixas[2]
+
+
+PARAMETROS_PADRAO = PaceParams()
+
+# Faixas de ritmo, na ordem dos códigos de classify_pace: rótulo, ícone e cor
+ROTULOS_FAIXA = np.array(['✅ Concluído', '🔵 Tranquilo', '🟢 Bom Ritmo', '🟡 Atenção', '🟠 Crítico', '🔴 Plano de Ação'])
+ICONES_FAIXA = ['✅', '🔵', '🟢', '🟡', '🟠', '🔴']
+CORES_FAIXA = np.array(['#28a745', '#3498db', '#2ecc71', '#f1c40f', '#e67e22', '#e74c3c'])
+FAIXA_PLANO_ACAO = len(ROTULOS_FAIXA) - 1
+
+
+class PaceBase(NamedTuple):
+    """Arrays por colaborador (na ordem do df_merged) usados em todos os cenários"""
+    horas_restantes: np.ndarray
+    horas_totais: np.ndarray
+
+
+def pace_base(df_merged):
+    """Extrai do df_merged as horas restantes e totais de cada colaborador"""
+    totais = df_merged['horas totais'].to_numpy(dtype=float)
+    return PaceBase(totais - df_merged['Horas_Realizadas'].to_numpy(dtype=float), totais)
+
+
+def deadline_days(parametros=PARAMETROS_PADRAO, hoje=None, regiao=REGIAO_FERIADOS):
+    """(dias corridos, dias úteis, dias efetivos) de hoje até o prazo do cenário"""
+    hoje = hoje or date.today()
+    dias_totais = (parametros.data_limite - hoje).days
+    dias_uteis_total = count_business_days(hoje, parametros.data_limite, regiao)
+    return dias_totais, dias_uteis_total, int(dias_uteis_total * parametros.fator_efetivo)
+
+
+def classify_pace(ritmo, faixas=PARAMETROS_PADRAO.faixas):
+    """Código da faixa de cada ritmo: 0 concluído, 1..4 pelos limites, 5 plano de ação"""
+    ritmo = np.asarray(ritmo, dtype=float)
+    codigos = np.searchsorted(np.asarray(faixas, dtype=float), ritmo, side='left') + 1
+    codigos[ritmo <= 0] = 0
+    return codigos
+
+
+def compute_pace(base, dias_efetivos, faixas=PARAMETROS_PADRAO.faixas):
+    """(ritmo necessário, ritmo ideal, código da faixa) de cada colaborador no cenário"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ritmo = np.round(base.horas_restantes / dias_efetivos, 2)
+        ritmo_ideal = np.round(base.horas_totais / dias_efetivos, 2)
+    return ritmo, ritmo_ideal, classify_pace(ritmo, faixas)
+
+
+def band_counts(codigos):
+    """Quantidade de colaboradores em cada faixa (na ordem de ROTULOS_FAIXA)"""
+    return np.bincount(codigos, minlength=len(ROTULOS_FAIXA))
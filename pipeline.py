@@ -0,0 +1,449 @@
+"""Pipeline de dados: leitura das planilhas, classificação e agregação.
+
+Fica fora do app.py (que o Streamlit reexecuta como script) para que as
+funções possam ser importadas por processos de um pool e reaproveitadas fora
+da interface.
+"""
+
+import io
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from cache import get_cache, get_disk_cache, hash_bytes
+from excel_reader import PLANO_COLUMNS, REAL_COLUMNS, normalize_frame, normalize_ids, read_workbook_streaming
+from incremental import CHAVE_COLABORADOR_CONSOLIDADA, diff_snapshots
+from profiling import etapa
+
+
+def load_data(uploaded_file, streaming=True):
+    """Carrega os dados do arquivo Excel
+    
+    Arquivos .xlsx são lidos em streaming, só com as colunas usadas pelo app.
+    Arquivos .xls (ou `streaming=False`) usam o pd.read_excel tradicional.
+    """
+    if streaming and zipfile.is_zipfile(uploaded_file):
+        if hasattr(uploaded_file, 'seek'):
+            uploaded_file.seek(0)
+        df_plano, df_real = read_workbook_streaming(uploaded_file)
+        return normalize_ids(normalize_frame(df_plano), normalize_frame(df_real))
+    
+    if hasattr(uploaded_file, 'seek'):
+        uploaded_file.seek(0)
+    xl = pd.ExcelFile(uploaded_file)
+    
+    # Identifica as abas (pode ser Plano/Real ou Plano/Realizado)
+    sheet_names = xl.sheet_names
+    
+    df_plano = pd.read_excel(xl, 'Plano', usecols=lambda c: c in PLANO_COLUMNS)
+    
+    # Tenta encontrar a aba de realizados
+    real_sheet = 'Real' if 'Real' in sheet_names else 'Realizado'
+    df_real = pd.read_excel(xl, real_sheet, usecols=lambda c: c in REAL_COLUMNS)
+    
+    return normalize_ids(normalize_frame(df_plano), normalize_frame(df_real))
+
+
+# Respostas de 'Finalizou o curso?' (em minúsculas) que levam a cada status;
+# qualquer outra resposta é classificada como STATUS_PADRAO
+STATUS_SYNONYMS = {
+    'Concluído': ['sim', 'yes', 's'],
+    'Em Andamento': ['em andamento', 'andamento', 'in progress'],
+}
+STATUS_PADRAO = 'Pendente'
+STATUS_CATEGORIES = ['Concluído', 'Em Andamento', 'Pendente']
+
+
+def classify_status(respostas, datas_inicio=None, synonyms=STATUS_SYNONYMS):
+    """Classifica o status de cada curso de forma vetorizada
+    
+    Cursos pendentes que já têm data de início (diferente de '-') passam a
+    'Em Andamento'. Retorna uma série categórica com STATUS_CATEGORIES.
+    """
+    lookup = {sinonimo: status for status, sinonimos in synonyms.items() for sinonimo in sinonimos}
+    
+    # Uma única normalização da coluna de respostas
+    normalizadas = respostas.astype(str).str.strip().str.lower()
+    status = normalizadas.map(lookup).fillna(STATUS_PADRAO)
+    
+    if datas_inicio is not None:
+        iniciado = datas_inicio.notna() & (datas_inicio.astype(str) != '-')
+        status = status.mask((status == STATUS_PADRAO) & iniciado, 'Em Andamento')
+    
+    return pd.Series(pd.Categorical(status, categories=STATUS_CATEGORIES), index=respostas.index)
+
+
+def process_data(df_plano, df_real, status_synonyms=STATUS_SYNONYMS):
+    """Processa e agrega os dados"""
+    
+    # Classifica o status (a data de início marca cursos pendentes como "Em Andamento")
+    df_real['Status'] = classify_status(
+        df_real['Finalizou o curso?'],
+        df_real['Data de início'] if 'Data de início' in df_real.columns else None,
+        status_synonyms,
+    )
+    
+    # Horas realizadas: carga horária dos cursos concluídos
+    df_real['Horas_Realizadas'] = df_real['Carga Horária'].where(df_real['Status'] == 'Concluído', 0)
+    
+    # Agrupa por colaborador
+    horas_realizadas = df_real.groupby(['Id colaborador(a)', 'Colaborador(a)'], observed=True)['Horas_Realizadas'].sum().reset_index()
+    
+    return _merge_plano(df_plano, horas_realizadas), df_real
+
+
+def _merge_plano(df_plano, horas_realizadas):
+    """Junta as horas realizadas por colaborador ao plano e calcula os percentuais"""
+    df_merged = pd.merge(
+        df_plano,
+        horas_realizadas,
+        on=['Id colaborador(a)', 'Colaborador(a)'],
+        how='left'
+    )
+    df_merged['Horas_Realizadas'] = df_merged['Horas_Realizadas'].fillna(0)
+    df_merged['Percentual'] = (df_merged['Horas_Realizadas'] / df_merged['horas totais'] * 100).round(1)
+    df_merged['Horas_Pendentes'] = df_merged['horas totais'] - df_merged['Horas_Realizadas']
+    
+    return df_merged
+
+
+def process_data_incremental(anterior, df_plano, df_real, status_synonyms=STATUS_SYNONYMS):
+    """Processa um upload novo reaproveitando o Snapshot do upload anterior
+    
+    Só as linhas novas ou alteradas são classificadas, e só os colaboradores
+    afetados têm as horas reagregadas; os demais vêm do snapshot. Retorna
+    (df_merged, df_real, mudancas), com o mesmo resultado de process_data.
+    """
+    mudancas = diff_snapshots(anterior, df_plano, df_real)
+    posicao = mudancas.posicao_anterior
+    reaproveitada = posicao >= 0
+    
+    # Status: copia das linhas idênticas, classifica só as novas/alteradas
+    codigos = np.empty(len(df_real), dtype=np.int8)
+    codigos_anteriores = pd.Categorical(anterior.df_real['Status'], categories=STATUS_CATEGORIES).codes
+    codigos[reaproveitada] = codigos_anteriores[posicao[reaproveitada]]
+    if (~reaproveitada).any():
+        df_novas = df_real.loc[~reaproveitada]
+        codigos[~reaproveitada] = classify_status(
+            df_novas['Finalizou o curso?'],
+            df_novas['Data de início'] if 'Data de início' in df_novas.columns else None,
+            status_synonyms,
+        ).cat.codes.to_numpy()
+    df_real['Status'] = pd.Categorical.from_codes(codigos, categories=STATUS_CATEGORIES)
+    df_real['Horas_Realizadas'] = df_real['Carga Horária'].where(df_real['Status'] == 'Concluído', 0)
+    
+    # Horas: reagrega só os colaboradores afetados
+    chave = ['Id colaborador(a)', 'Colaborador(a)']
+    afetados = mudancas.afetados(df_real)
+    horas_afetados = df_real[afetados].groupby(chave, observed=True)['Horas_Realizadas'].sum().reset_index()
+    horas_mantidas = anterior.df_merged.loc[
+        ~mudancas.afetados(anterior.df_merged),
+        chave + ['Horas_Realizadas']
+    ].drop_duplicates(chave)
+    horas_realizadas = pd.concat([horas_mantidas, horas_afetados], ignore_index=True)
+    
+    return _merge_plano(df_plano, horas_realizadas), df_real, mudancas
+
+
+# Colunas de texto com muitos valores repetidos, guardadas como categorias
+COLUNAS_CATEGORICAS = ['Colaborador(a)', 'Curso', 'Finalizou o curso?', 'Data de início', 'Departamento']
+
+
+def compact_frame(df):
+    """Categorias nas colunas de texto repetitivas e inteiros no menor tipo que cabe
+    
+    As colunas que o app não usa já ficam de fora na leitura (PLANO_COLUMNS e
+    REAL_COLUMNS). Os floats continuam em float64 para não mudar os percentuais.
+    """
+    for col in df.columns:
+        if col in COLUNAS_CATEGORICAS:
+            if not isinstance(df[col].dtype, pd.CategoricalDtype):
+                df[col] = df[col].astype('category')
+        elif pd.api.types.is_integer_dtype(df[col]):
+            df[col] = pd.to_numeric(df[col], downcast='integer')
+    return df
+
+
+def compact_frames(df_merged, df_real):
+    """Compacta os dois frames e retorna (df_merged, df_real, relatorio_memoria)
+    
+    O relatório tem, por frame, as linhas e a memória antes e depois da
+    compactação (em MB).
+    """
+    relatorio = []
+    frames = []
+    for nome, df in (('df_merged', df_merged), ('df_real', df_real)):
+        antes = df.memory_usage(deep=True).sum()
+        df = compact_frame(df)
+        depois = df.memory_usage(deep=True).sum()
+        relatorio.append({
+            'Frame': nome,
+            'Linhas': len(df),
+            'Antes (MB)': round(antes / 2**20, 3),
+            'Depois (MB)': round(depois / 2**20, 3),
+            'Redução (%)': round((1 - depois / antes) * 100, 1) if antes else 0.0,
+        })
+        frames.append(df)
+    return frames[0], frames[1], pd.DataFrame(relatorio)
+
+
+def memory_report(chave):
+    """Relatório de memória (compact_frames) do dataset com esta chave, se em cache"""
+    return get_cache('memoria', max_entries=PIPELINE_CACHE_MAX_ENTRIES).get(chave)
+
+
+def collaborator_key_columns(df):
+    """Colunas que identificam um colaborador no frame
+    
+    Com várias planilhas, o mesmo nome (ou Id) pode aparecer em mais de um
+    departamento, então a chave é ('Departamento', 'Id colaborador(a)'); com
+    uma planilha só, é o nome.
+    """
+    if 'Departamento' in df.columns:
+        return list(CHAVE_COLABORADOR_CONSOLIDADA)
+    return ['Colaborador(a)']
+
+
+def collaborator_key(linha, colunas):
+    """Chave do colaborador de uma linha: o nome, ou a tupla (departamento, Id)"""
+    if len(colunas) == 1:
+        return linha[colunas[0]]
+    return tuple(linha[c] for c in colunas)
+
+
+def collaborator_index(df, colunas=None):
+    """Índice com a chave do colaborador de cada linha do frame"""
+    colunas = colunas or collaborator_key_columns(df)
+    if len(colunas) == 1:
+        return pd.Index(df[colunas[0]].to_numpy(), name=colunas[0])
+    return pd.MultiIndex.from_frame(df[colunas])
+
+
+def factorize_collaborators(df, colunas=None):
+    """Código de cada linha e o índice das chaves de colaborador, na ordem em que aparecem
+    
+    Como no pd.factorize, linhas com a chave incompleta ficam com código -1.
+    """
+    colunas = colunas or collaborator_key_columns(df)
+    if len(colunas) == 1:
+        codigos, chaves = pd.factorize(df[colunas[0]])
+        return codigos, pd.Index(np.asarray(chaves), name=colunas[0])
+    completas = df[colunas].notna().all(axis=1).to_numpy()
+    codigos = np.full(len(df), -1, dtype=np.intp)
+    codigos[completas], chaves = pd.MultiIndex.from_frame(df.loc[completas, colunas]).factorize()
+    return codigos, chaves
+
+
+class GroupIndex:
+    """Índice colaborador → linhas de cursos, construído uma vez por dataset
+    
+    Ordena o df_real pela chave do colaborador (collaborator_key_columns, com
+    ordenação estável, mantendo a ordem original dos cursos) e guarda o
+    intervalo de linhas de cada pessoa. Cada consulta devolve uma fatia do
+    frame ordenado em O(tamanho do grupo), em vez de varrer a tabela inteira
+    com um filtro booleano.
+    """
+    
+    def __init__(self, df_real, colunas=None):
+        colunas = colunas or collaborator_key_columns(df_real)
+        self.frame = df_real.sort_values(colunas, kind='stable', na_position='last')
+        codes, chaves = factorize_collaborators(self.frame, colunas)
+        contagens = np.bincount(codes[codes >= 0], minlength=len(chaves))
+        fins = np.cumsum(contagens)
+        self._limites = dict(zip(chaves, zip((fins - contagens).tolist(), fins.tolist())))
+    
+    def records(self, colunas):
+        """Linhas de cada colaborador em `colunas`, como {chave: lista de tuplas}
+        
+        Converte cada coluna em lista uma vez só e fatia as listas pelos
+        intervalos do índice, em vez de fatiar o frame a cada colaborador; o
+        resultado só tem tipos simples (pode ser enviado a outros processos).
+        """
+        linhas = list(zip(*(self.frame[c].tolist() for c in colunas)))
+        return {chave: linhas[inicio:fim] for chave, (inicio, fim) in self._limites.items()}
+    
+    def get(self, chave):
+        """Cursos do colaborador com esta chave (frame vazio se ele não tiver cursos)"""
+        inicio, fim = self._limites.get(chave, (0, 0))
+        return self.frame.iloc[inicio:fim]
+    
+    __getitem__ = get
+    
+    def __contains__(self, chave):
+        return chave in self._limites
+    
+    def __len__(self):
+        return len(self._limites)
+
+
+# Cache do pipeline (load_data + process_data), chaveado pelo hash do arquivo;
+# com várias planilhas, guarda uma entrada por departamento e uma consolidada
+PIPELINE_CACHE_MAX_ENTRIES = 32
+PIPELINE_CACHE_TTL = 60 * 60  # segundos
+
+# Cache em disco dos frames lidos do Excel (sobrevive a reinícios e sessões)
+SIDECAR_CACHE_DIR = os.environ.get('RELATORIO_CACHE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'planilhas'))
+SIDECAR_CACHE_MAX_ENTRIES = int(os.environ.get('RELATORIO_CACHE_MAX_ENTRIES', 20))
+
+
+def load_data_cached(file_bytes, chave=None):
+    """Carrega o arquivo usando o cache em disco (Parquet) quando disponível
+    
+    Retorna (df_plano, df_real, veio_do_disco).
+    """
+    chave = chave or hash_bytes(file_bytes)
+    disco = get_disk_cache('planilhas', SIDECAR_CACHE_DIR, max_entries=SIDECAR_CACHE_MAX_ENTRIES)
+    
+    with etapa('cache_disco') as registro:
+        frames = disco.get(chave, ['plano', 'real'])
+        registro['linhas'] = len(frames['real']) if frames is not None else 0
+    if frames is not None:
+        # Entradas gravadas antes de normalize_ids podem ter o Id com tipos diferentes
+        df_plano, df_real = normalize_ids(frames['plano'], frames['real'])
+        return df_plano, df_real, True
+    
+    with etapa('leitura_excel') as registro:
+        df_plano, df_real = load_data(io.BytesIO(file_bytes))
+        registro['linhas'] = len(df_real)
+    with etapa('gravacao_cache_disco'):
+        disco.put(chave, {'plano': df_plano, 'real': df_real})
+    return df_plano, df_real, False
+
+
+def load_and_process(file_bytes, anterior=None):
+    """Carrega e processa o arquivo, reaproveitando o resultado de reruns anteriores
+    
+    Com um Snapshot `anterior` (modo incremental), um arquivo ainda não
+    processado é calculado a partir dele, e as mudanças entre os dois uploads
+    também são retornadas.
+    
+    Retorna (df_merged, df_real, grupos, origem, mudancas), onde `grupos` é o
+    GroupIndex dos cursos por colaborador, `origem` é 'memoria' (cache do
+    processo), 'disco' (frames em Parquet, sem reler o Excel) ou 'excel', e
+    `mudancas` é um Changes (ou None, sem snapshot anterior).
+    """
+    chave = hash_bytes(file_bytes)
+    cache = get_cache('pipeline', max_entries=PIPELINE_CACHE_MAX_ENTRIES, ttl=PIPELINE_CACHE_TTL)
+    cache_mudancas = get_cache('mudancas', max_entries=PIPELINE_CACHE_MAX_ENTRIES)
+    cache_memoria = get_cache('memoria', max_entries=PIPELINE_CACHE_MAX_ENTRIES)
+    chave_mudancas = (anterior.chave, chave) if anterior is not None else None
+    
+    def _executar():
+        df_plano, df_real, do_disco = load_data_cached(file_bytes, chave)
+        with etapa('processamento', linhas=len(df_real)):
+            if anterior is not None:
+                df_merged, df_real, mudancas = process_data_incremental(anterior, df_plano, df_real)
+                cache_mudancas.put(chave_mudancas, mudancas)
+            else:
+                df_merged, df_real = process_data(df_plano, df_real)
+        with etapa('compactacao', linhas=len(df_real)):
+            df_merged, df_real, relatorio = compact_frames(df_merged, df_real)
+            cache_memoria.put(chave, relatorio)
+        with etapa('indice_cursos', linhas=len(df_real)):
+            grupos = GroupIndex(df_real)
+        return df_merged, df_real, grupos, 'disco' if do_disco else 'excel'
+    
+    (df_merged, df_real, grupos, origem), hit = cache.get_or_compute(chave, _executar)
+    
+    mudancas = None
+    if anterior is not None:
+        mudancas, _ = cache_mudancas.get_or_compute(
+            chave_mudancas, lambda: diff_snapshots(anterior, df_merged, df_real)
+        )
+    
+    return df_merged, df_real, grupos, 'memoria' if hit else origem, mudancas
+
+
+def summarize_departments(df_merged):
+    """Colaboradores, horas e percentual de conclusão por departamento"""
+    resumo = df_merged.groupby('Departamento', sort=False, observed=True).agg(
+        Colaboradores=('Colaborador(a)', 'size'),
+        Planejado=('horas totais', 'sum'),
+        Realizado=('Horas_Realizadas', 'sum'),
+    ).reset_index()
+    resumo['Percentual'] = (resumo['Realizado'] / resumo['Planejado'] * 100).round(1)
+    return resumo
+
+
+# Processos usados para ler e processar várias planilhas ao mesmo tempo
+PIPELINE_WORKERS = int(os.environ.get('RELATORIO_PIPELINE_WORKERS', os.cpu_count() or 1))
+
+
+def _process_workbook(file_bytes, chave):
+    """Lê e processa uma planilha (executado em um processo do pool)"""
+    df_plano, df_real, do_disco = load_data_cached(file_bytes, chave)
+    df_merged, df_real = process_data(df_plano, df_real)
+    df_merged, df_real, _ = compact_frames(df_merged, df_real)
+    return df_merged, df_real, 'disco' if do_disco else 'excel'
+
+
+def chave_consolidada(arquivos):
+    """Chave do conjunto de planilhas: nome do departamento + hash de cada arquivo"""
+    return hash_bytes('\n'.join(f'{nome}:{hash_bytes(dados)}' for nome, dados in arquivos).encode())
+
+
+def load_and_process_many(arquivos, anterior=None, workers=None):
+    """Carrega e processa várias planilhas (uma por departamento) e consolida
+    
+    `arquivos` é uma lista de (departamento, bytes). Cada planilha é processada
+    separadamente, em paralelo num pool de processos, e o resultado de cada
+    uma fica no cache do pipeline: ao incluir mais um arquivo, só ele é
+    processado. Os frames consolidados ganham a coluna 'Departamento'.
+    
+    Retorna a mesma tupla de load_and_process.
+    """
+    workers = PIPELINE_WORKERS if workers is None else workers
+    chaves = [hash_bytes(dados) for _, dados in arquivos]
+    chave = chave_consolidada(arquivos)
+    cache = get_cache('pipeline', max_entries=PIPELINE_CACHE_MAX_ENTRIES, ttl=PIPELINE_CACHE_TTL)
+    cache_mudancas = get_cache('mudancas', max_entries=PIPELINE_CACHE_MAX_ENTRIES)
+    cache_memoria = get_cache('memoria', max_entries=PIPELINE_CACHE_MAX_ENTRIES)
+    
+    def _executar():
+        resultados = [cache.get(c) for c in chaves]
+        pendentes = [i for i, r in enumerate(resultados) if r is None]
+        
+        with etapa('planilhas_em_paralelo', linhas=len(pendentes)):
+            if len(pendentes) > 1 and workers > 1:
+                with ProcessPoolExecutor(max_workers=min(workers, len(pendentes))) as pool:
+                    processados = list(pool.map(
+                        _process_workbook,
+                        [arquivos[i][1] for i in pendentes],
+                        [chaves[i] for i in pendentes],
+                    ))
+            else:
+                processados = [_process_workbook(arquivos[i][1], chaves[i]) for i in pendentes]
+        
+        for i, (df_merged, df_real, origem) in zip(pendentes, processados):
+            resultados[i] = (df_merged, df_real, GroupIndex(df_real), origem)
+            cache.put(chaves[i], resultados[i])
+        
+        with etapa('consolidacao'):
+            df_merged = pd.concat(
+                [r[0].assign(Departamento=nome) for (nome, _), r in zip(arquivos, resultados)],
+                ignore_index=True,
+            )
+            df_real = pd.concat(
+                [r[1].assign(Departamento=nome) for (nome, _), r in zip(arquivos, resultados)],
+                ignore_index=True,
+            )
+            # Categorias diferentes entre planilhas viram texto no concat
+            df_merged, df_real, relatorio = compact_frames(df_merged, df_real)
+            cache_memoria.put(chave, relatorio)
+            grupos = GroupIndex(df_real)
+        origens = {r[3] for i, r in enumerate(resultados) if i in pendentes}
+        origem = next((o for o in ('excel', 'disco') if o in origens), 'memoria')
+        return df_merged, df_real, grupos, origem
+    
+    (df_merged, df_real, grupos, origem), hit = cache.get_or_compute(chave, _executar)
+    
+    mudancas = None
+    if anterior is not None:
+        mudancas, _ = cache_mudancas.get_or_compute(
+            (anterior.chave, chave), lambda: diff_snapshots(anterior, df_merged, df_real)
+        )
+    
+    return df_merged, df_real, grupos, 'memoria' if hit else origem, mudancas
@@ -0,0 +1,191 @@
+"""Medição de tempo e memória por etapa de cada rerun do dashboard.
+
+Um `StageTimer` registra as etapas do main() (`marcar` fecha a etapa anterior
+e abre a próxima) e, enquanto estiver ativo, também as etapas internas do
+pipeline, que usam `etapa(...)` e não fazem nada quando não há cronômetro
+ativo (por exemplo, no CLI ou nos processos do pool). Cada rerun pode ser
+gravado como uma linha JSON e, opcionalmente, capturado com o cProfile.
+"""
+
+import cProfile
+import io
+import json
+import marshal
+import os
+import pstats
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+_cronometro_atual = ContextVar('cronometro_atual', default=None)
+_primeira_execucao = True
+
+
+def first_run():
+    """True apenas na primeira chamada do processo (partida a frio do servidor)"""
+    global _primeira_execucao
+    primeira, _primeira_execucao = _primeira_execucao, False
+    return primeira
+
+
+def _memoria_rss():
+    """Memória residente do processo em bytes (0 se não for possível medir)"""
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        pass
+    if resource is not None:
+        # Sem /proc (macOS): pico de memória em vez da memória atual
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return 0
+
+
+class StageTimer:
+    """Duração, linhas e variação de memória de cada etapa de um rerun"""
+
+    def __init__(self, inicio=None):
+        self.etapas = []
+        self.inicio = time.perf_counter() if inicio is None else inicio
+        self._aberta = None
+        self._nivel = 0
+
+    def _abrir(self, nome, linhas, nivel):
+        registro = {'etapa': nome, 'nivel': nivel, 'linhas': linhas}
+        registro['_inicio'] = time.perf_counter()
+        registro['_memoria'] = _memoria_rss()
+        self.etapas.append(registro)
+        return registro
+
+    @staticmethod
+    def _fechar(registro):
+        registro['segundos'] = round(time.perf_counter() - registro.pop('_inicio'), 6)
+        registro['memoria_delta_mb'] = round((_memoria_rss() - registro.pop('_memoria')) / 2**20, 2)
+
+    def registrar(self, nome, segundos, linhas=None):
+        """Registra uma etapa já medida por fora (ex.: os imports do script)"""
+        registro = {
+            'etapa': nome, 'nivel': 0, 'linhas': linhas,
+            'segundos': round(segundos, 6), 'memoria_delta_mb': None,
+        }
+        self.etapas.append(registro)
+        return registro
+
+    def marcar(self, nome, linhas=None):
+        """Encerra a etapa de primeiro nível em andamento e inicia `nome`
+
+        Retorna o registro da etapa; `linhas` pode ser preenchido depois.
+        """
+        self.encerrar()
+        self._aberta = self._abrir(nome, linhas, 0)
+        return self._aberta
+
+    def encerrar(self):
+        """Encerra a etapa de primeiro nível em andamento, se houver"""
+        if self._aberta is not None:
+            self._fechar(self._aberta)
+            self._aberta = None
+
+    @contextmanager
+    def etapa(self, nome, linhas=None):
+        """Mede o bloco como uma etapa aninhada na etapa em andamento"""
+        self._nivel += 1
+        registro = self._abrir(nome, linhas, self._nivel)
+        try:
+            yield registro
+        finally:
+            self._fechar(registro)
+            self._nivel -= 1
+
+    @contextmanager
+    def ativo(self):
+        """Torna este o cronômetro usado por `etapa(...)` no contexto atual"""
+        token = _cronometro_atual.set(self)
+        try:
+            yield self
+        finally:
+            _cronometro_atual.reset(token)
+
+    @property
+    def total(self):
+        return time.perf_counter() - self.inicio
+
+    def tabela(self):
+        """Etapas encerradas, sem os campos internos"""
+        return [
+            {k: v for k, v in registro.items() if not k.startswith('_')}
+            for registro in self.etapas if 'segundos' in registro
+        ]
+
+
+@contextmanager
+def etapa(nome, linhas=None):
+    """Mede o bloco no cronômetro ativo; sem cronômetro, só executa o bloco"""
+    cronometro = _cronometro_atual.get()
+    if cronometro is None:
+        yield {}
+        return
+    with cronometro.etapa(nome, linhas) as registro:
+        yield registro
+
+
+def cache_deltas(antes, depois):
+    """Hits e misses de cada cache entre dois `all_stats()`"""
+    return {
+        nome: {
+            'hits': stats['hits'] - antes.get(nome, {}).get('hits', 0),
+            'misses': stats['misses'] - antes.get(nome, {}).get('misses', 0),
+        }
+        for nome, stats in depois.items()
+    }
+
+
+def log_rerun(caminho, cronometro, **extras):
+    """Acrescenta o rerun como uma linha JSON em `caminho` (sem caminho, não grava)"""
+    if not caminho:
+        return
+    registro = {
+        'executado_em': datetime.now().isoformat(timespec='milliseconds'),
+        'total_segundos': round(cronometro.total, 6),
+        **extras,
+        'etapas': cronometro.tabela(),
+    }
+    try:
+        Path(caminho).parent.mkdir(parents=True, exist_ok=True)
+        with open(caminho, 'a', encoding='utf-8') as log:
+            log.write(json.dumps(registro, ensure_ascii=False, default=str) + '\n')
+    except OSError:
+        # O log é só diagnóstico: falhar ao gravá-lo não deve derrubar o app
+        pass
+
+
+@contextmanager
+def capture_profile(ativo=True):
+    """Executa o bloco sob o cProfile; o valor é um dict preenchido ao final
+
+    O dict recebe 'resumo' (as 30 funções com maior tempo acumulado, em texto)
+    e 'dados' (as estatísticas no formato do pstats, para abrir no snakeviz).
+    """
+    resultado = {}
+    if not ativo:
+        yield resultado
+        return
+    perfil = cProfile.Profile()
+    perfil.enable()
+    try:
+        yield resultado
+    finally:
+        perfil.disable()
+        texto = io.StringIO()
+        pstats.Stats(perfil, stream=texto).sort_stats('cumulative').print_stats(30)
+        resultado['resumo'] = texto.getvalue()
+        # Mesmo formato que Profile.dump_stats grava em disco
+        perfil.create_stats()
+        resultado['dados'] = marshal.dumps(perfil.stats)
@@ -0,0 +1,548 @@
+"""Geração do relatório executivo em HTML, em streaming.
+
+O relatório é produzido como uma sequência de pedaços (`iter_report`) a partir
+de templates definidos uma única vez no módulo. Quem consome pode gravar cada
+pedaço direto em um arquivo (`write_report`) sem montar o documento inteiro em
+memória, e o tempo de geração cresce linearmente com o número de colaboradores
+e cursos. Os cartões do detalhamento por colaborador podem ser renderizados em
+paralelo, em um pool de processos.
+"""
+
+import os
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from kpis import build_kpi_cube
+from pace import (
+    CORES_FAIXA, ICONES_FAIXA, PARAMETROS_PADRAO, REGIAO_FERIADOS, classify_pace, compute_pace, deadline_days,
+    pace_base,
+)
+from pipeline import GroupIndex, collaborator_index
+
+# Cabeçalho, estilos, contexto e resumo executivo
+CABECALHO = """
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <meta charset="UTF-8">
+        <style>
+            @page {{ size: A4; margin: 1.2cm; }}
+            body {{ font-family: Arial, sans-serif; font-size: 10px; line-height: 1.3; color: #333; }}
+            .header {{ text-align: center; margin-bottom: 15px; border-bottom: 3px solid #1E3A5F; padding-bottom: 8px; }}
+            .header h1 {{ color: #1E3A5F; margin: 0; font-size: 20px; }}
+            .header p {{ color: #666; margin: 3px 0 0 0; font-size: 11px; }}
+            .section {{ margin-bottom: 12px; }}
+            .section-title {{ background: #1E3A5F; color: white; padding: 6px 10px; font-size: 12px; font-weight: bold; margin-bottom: 8px; border-radius: 4px; }}
+            .storytelling {{ background: #f5f7fa; padding: 10px; border-left: 4px solid #1E3A5F; margin-bottom: 12px; font-size: 10px; }}
+            .metrics-row {{ display: flex; justify-content: space-between; margin-bottom: 12px; gap: 8px; }}
+            .metric-box {{ text-align: center; padding: 8px; border-radius: 6px; flex: 1; }}
+            .metric-box.blue {{ background: #e3f2fd; border: 2px solid #1976d2; }}
+            .metric-box.green {{ background: #e8f5e9; border: 2px solid #28a745; }}
+            .metric-box.orange {{ background: #fff3e0; border: 2px solid #ff9800; }}
+            .metric-box.red {{ background: #ffebee; border: 2px solid #dc3545; }}
+            .metric-box.purple {{ background: #f3e5f5; border: 2px solid #9c27b0; }}
+            .metric-value {{ font-size: 18px; font-weight: bold; }}
+            .metric-label {{ font-size: 9px; color: #666; }}
+            table {{ width: 100%; border-collapse: collapse; font-size: 9px; margin-bottom: 8px; }}
+            th {{ background: #1E3A5F; color: white; padding: 5px; text-align: left; }}
+            td {{ padding: 4px; border-bottom: 1px solid #ddd; }}
+            .status-green {{ color: #28a745; font-weight: bold; }}
+            .status-yellow {{ color: #ff9800; font-weight: bold; }}
+            .status-red {{ color: #dc3545; font-weight: bold; }}
+            .progress-bar {{ width: 100%; height: 12px; background: #e0e0e0; border-radius: 6px; overflow: hidden; }}
+            .progress-fill {{ height: 100%; border-radius: 6px; }}
+            .highlight {{ display: flex; gap: 10px; margin-bottom: 12px; }}
+            .highlight-box {{ flex: 1; padding: 8px; border-radius: 6px; font-size: 10px; }}
+            .highlight-box.success {{ background: #d4edda; border-left: 4px solid #28a745; }}
+            .highlight-box.danger {{ background: #f8d7da; border-left: 4px solid #dc3545; }}
+            .highlight-box.warning {{ background: #fff3cd; border-left: 4px solid #ffc107; }}
+            .page-break {{ page-break-before: always; }}
+            .two-col {{ display: flex; gap: 15px; }}
+            .two-col > div {{ flex: 1; }}
+            .chart-container {{ margin-bottom: 12px; }}
+            .bar-chart {{ width: 100%; }}
+            .bar-row {{ display: flex; align-items: center; margin-bottom: 6px; }}
+            .bar-label {{ width: 140px; font-size: 9px; font-weight: 500; }}
+            .bar-container {{ flex: 1; height: 18px; background: #e0e0e0; border-radius: 4px; position: relative; overflow: hidden; }}
+            .bar-fill {{ height: 100%; border-radius: 4px; display: flex; align-items: center; justify-content: flex-end; padding-right: 5px; }}
+            .bar-text {{ font-size: 8px; color: white; font-weight: bold; }}
+            .bar-value {{ width: 70px; text-align: right; font-size: 9px; font-weight: bold; margin-left: 8px; }}
+            .pie-container {{ display: flex; justify-content: center; align-items: center; gap: 20px; }}
+            .pie-chart {{ width: 120px; height: 120px; border-radius: 50%; position: relative; }}
+            .pie-legend {{ font-size: 10px; }}
+            .pie-legend-item {{ display: flex; align-items: center; gap: 5px; margin-bottom: 4px; }}
+            .legend-color {{ width: 12px; height: 12px; border-radius: 3px; }}
+            .ritmo-bar {{ display: flex; align-items: center; margin-bottom: 4px; }}
+            .ritmo-name {{ width: 130px; font-size: 9px; }}
+            .ritmo-container {{ flex: 1; height: 16px; background: #f0f0f0; border-radius: 4px; position: relative; }}
+            .ritmo-fill {{ height: 100%; border-radius: 4px; }}
+            .ritmo-value {{ width: 60px; text-align: right; font-size: 9px; font-weight: bold; }}
+            .ritmo-line {{ position: absolute; top: 0; bottom: 0; width: 2px; z-index: 10; }}
+            .colaborador-section {{ margin-bottom: 12px; padding: 8px; border: 1px solid #ddd; border-radius: 6px; page-break-inside: avoid; }}
+            .colaborador-header {{ display: flex; justify-content: space-between; align-items: center; margin-bottom: 6px; }}
+            .colaborador-name {{ font-size: 11px; font-weight: bold; color: #1E3A5F; }}
+            .info-grid {{ display: grid; grid-template-columns: repeat(4, 1fr); gap: 8px; margin-bottom: 10px; }}
+            .info-item {{ text-align: center; padding: 5px; background: #f8f9fa; border-radius: 4px; }}
+            .info-value {{ font-size: 14px; font-weight: bold; }}
+            .info-label {{ font-size: 8px; color: #666; }}
+        </style>
+    </head>
+    <body>
+        <div class="header">
+            <h1>📊 Relatório de Acompanhamento de Cursos</h1>
+            <p>Gerado em {gerado_em} | Prazo: {prazo}</p>
+        </div>
+        
+        <div class="section">
+            <div class="storytelling">
+                <strong>🎯 Contexto:</strong> Plano de desenvolvimento focado em <b>liderança, estatística, dados e ferramentas digitais</b>.
+                <strong>📈 Status:</strong> <b>{total_realizado}h</b> de <b>{total_planejado}h</b> concluídas (<b>{percentual_geral:.1f}%</b>).
+                <strong>⏱️ Prazo:</strong> {dias_totais} dias corridos | <b>{dias_uteis} dias efetivos</b> ({fator_efetivo:.0%} dos dias úteis, considerando imprevistos).
+            </div>
+        </div>
+
+        <div class="section">
+            <div class="section-title">📊 RESUMO EXECUTIVO</div>
+            
+            <div class="metrics-row">
+                <div class="metric-box blue">
+                    <div class="metric-value">{n_colaboradores}</div>
+                    <div class="metric-label">Colaboradores</div>
+                </div>
+                <div class="metric-box green">
+                    <div class="metric-value">{total_realizado}h</div>
+                    <div class="metric-label">Concluídas</div>
+                </div>
+                <div class="metric-box orange">
+                    <div class="metric-value">{horas_pendentes}h</div>
+                    <div class="metric-label">Pendentes</div>
+                </div>
+                <div class="metric-box {classe_progresso}">
+                    <div class="metric-value">{percentual_geral:.1f}%</div>
+                    <div class="metric-label">Progresso</div>
+                </div>
+                <div class="metric-box purple">
+                    <div class="metric-value">{dias_uteis}</div>
+                    <div class="metric-label">Dias Úteis</div>
+                </div>
+                <div class="metric-box {classe_criticos}">
+                    <div class="metric-value">{criticos}</div>
+                    <div class="metric-label">Críticos</div>
+                </div>
+            </div>
+
+            <div class="highlight">
+                <div class="highlight-box success">
+                    <strong>🏆 Melhor:</strong> {melhor_nome}<br>
+                    <span style="font-size: 14px; color: #28a745;"><b>{melhor_percentual:.1f}%</b></span> ({melhor_realizado}h/{melhor_planejado}h)
+                </div>
+                <div class="highlight-box danger">
+                    <strong>⚠️ Atenção:</strong> {pior_nome}<br>
+                    <span style="font-size: 14px; color: #dc3545;"><b>{pior_percentual:.1f}%</b></span> ({pior_realizado}h/{pior_planejado}h)
+                </div>
+                <div class="highlight-box warning">
+                    <strong>📚 Cursos:</strong><br>
+                    ✅ {cursos_concluidos} | 🔄 {cursos_andamento} | ❌ {cursos_pendentes}
+                </div>
+            </div>
+        </div>
+
+        <div class="section">
+            <div class="section-title">📈 PROGRESSO POR COLABORADOR (Horas Planejadas vs Realizadas)</div>
+            <div class="chart-container">
+    """
+
+# Uma barra do gráfico de progresso por colaborador
+BARRA_PROGRESSO = """
+                <div class="bar-row">
+                    <div class="bar-label">{nome}</div>
+                    <div class="bar-container">
+                        <div class="bar-fill" style="width: {largura}%; background: {cor};">
+                            <span class="bar-text">{percentual:.0f}%</span>
+                        </div>
+                    </div>
+                    <div class="bar-value" style="color: {cor};">{realizado}h / {planejado}h</div>
+                </div>
+        """
+
+# Fecha o gráfico de progresso e abre o de ritmo
+INICIO_RITMO = """
+            </div>
+        </div>
+
+        <div class="section">
+            <div class="section-title">⏱️ RITMO NECESSÁRIO PARA CUMPRIR O PRAZO (Horas por dia útil)</div>
+            <div class="chart-container" style="position: relative;">
+    """
+
+# Uma barra do gráfico de ritmo necessário
+BARRA_RITMO = """
+                <div class="ritmo-bar">
+                    <div class="ritmo-name">{nome}</div>
+                    <div class="ritmo-container">
+                        <div class="ritmo-fill" style="width: {largura}%; background: {cor};"></div>
+                        <div class="ritmo-line" style="left: {linha_ideal}%; background: #2ecc71;"></div>
+                        <div class="ritmo-line" style="left: {linha_maxima}%; background: #e74c3c;"></div>
+                    </div>
+                    <div class="ritmo-value" style="color: {cor};">{icone} {ritmo:.1f}h/dia</div>
+                </div>
+        """
+
+# Legenda do ritmo e abertura do detalhamento por colaborador
+INICIO_DETALHAMENTO = """
+            </div>
+            <div style="font-size: 8px; color: #666; margin-top: 5px;">
+                Legenda: 🔵 Tranquilo (≤{f1:g}h) | 🟢 Bom Ritmo ({f1:g}-{f2:g}h) | 🟡 Atenção ({f2:g}-{f3:g}h) | 🟠 Crítico ({f3:g}-{f4:g}h) | 🔴 Plano de Ação (>{f4:g}h)
+            </div>
+        </div>
+
+        <div class="page-break"></div>
+        
+        <div class="section">
+            <div class="section-title">📋 DETALHAMENTO POR COLABORADOR</div>
+    """
+
+QUEBRA_PAGINA = '<div class="page-break"></div>'
+
+# Cartão de um colaborador (até o cabeçalho da tabela de cursos)
+CARTAO_COLABORADOR = """
+            <div class="colaborador-section">
+                <div class="colaborador-header">
+                    <span class="colaborador-name">👤 {nome}</span>
+                    <span style="color: {cor}; font-weight: bold; font-size: 12px;">{percentual:.1f}%</span>
+                </div>
+                <div class="progress-bar" style="margin-bottom: 6px; height: 10px;">
+                    <div class="progress-fill" style="width: {largura}%; background: {cor};"></div>
+                </div>
+                <div class="info-grid">
+                    <div class="info-item">
+                        <div class="info-value" style="color: #1976d2;">{planejado}h</div>
+                        <div class="info-label">Planejado</div>
+                    </div>
+                    <div class="info-item">
+                        <div class="info-value" style="color: #28a745;">{realizado}h</div>
+                        <div class="info-label">Concluído</div>
+                    </div>
+                    <div class="info-item">
+                        <div class="info-value" style="color: #dc3545;">{pendente}h</div>
+                        <div class="info-label">Pendente</div>
+                    </div>
+                    <div class="info-item">
+                        <div class="info-value" style="color: {cor_ritmo};">{ritmo:.1f}h</div>
+                        <div class="info-label">Ritmo/dia</div>
+                    </div>
+                </div>
+                <div style="font-size: 9px; margin-bottom: 4px;">
+                    <span class="status-green">✅ {concluidos}</span> |
+                    <span class="status-yellow">🔄 {andamento}</span> |
+                    <span class="status-red">❌ {pendentes}</span>
+                </div>
+                <table>
+                    <tr><th>Curso</th><th style="width: 45px;">Carga</th><th style="width: 70px;">Status</th></tr>
+        """
+
+# Uma linha da tabela de cursos do colaborador
+LINHA_CURSO = """
+                    <tr>
+                        <td>{curso}</td>
+                        <td>{carga}h</td>
+                        <td class="{classe}">{icone}</td>
+                    </tr>
+            """
+
+# Fecha a tabela e o cartão do colaborador
+FIM_CARTAO = """
+                </table>
+            </div>
+        """
+
+# Fecha o documento
+RODAPE = """
+        </div>
+    </body>
+    </html>
+    """
+
+# Colaboradores por página no detalhamento
+CARTOES_POR_PAGINA = 4
+
+# Custos medidos por benchmarks/report_cards.py (10k colaboradores, 100k cursos):
+# renderizar um cartão, enviá-lo a um processo e receber o HTML de volta
+# (pickle, pago pelo processo principal) e subir o pool
+CUSTO_CARTAO = 60e-6  # segundos por cartão
+CUSTO_IPC_CARTAO = 22e-6  # segundos por cartão
+CUSTO_POOL = 0.04  # segundos
+
+
+def min_colaboradores_paralelo(workers):
+    """Colaboradores a partir dos quais `workers` processos compensam (None: nunca)
+
+    Com os custos medidos, 2 processos compensam a partir de ~5k colaboradores
+    e 4 a partir de ~1,7k.
+    """
+    if workers <= 1:
+        return None
+    ganho = CUSTO_CARTAO * (1 - 1 / workers) - CUSTO_IPC_CARTAO
+    return CUSTO_POOL / ganho if ganho > 0 else None
+
+# Processos usados para renderizar o detalhamento por colaborador do relatório
+RELATORIO_WORKERS = int(os.environ.get('RELATORIO_WORKERS', os.cpu_count() or 1))
+
+ICONES_STATUS = {'Concluído': '✅', 'Em Andamento': '🔄'}
+CLASSES_STATUS = {'Concluído': 'status-green', 'Em Andamento': 'status-yellow'}
+
+
+def _cor_percentual(percentual):
+    return '#28a745' if percentual >= 70 else ('#ff9800' if percentual >= 30 else '#dc3545')
+
+
+def _cor_ritmo_cartao(ritmo, faixas):
+    # Cor da faixa do ritmo; no cartão, ritmo zero fica com a cor de Tranquilo
+    return str(CORES_FAIXA[bisect_left(faixas, ritmo) + 1])
+
+
+def _iter_progresso(df_ordenado):
+    max_horas = df_ordenado['horas totais'].max()
+    for nome, percentual, realizado, planejado in zip(
+        df_ordenado['Colaborador(a)'].tolist(),
+        df_ordenado['Percentual'].tolist(),
+        df_ordenado['Horas_Realizadas'].tolist(),
+        df_ordenado['horas totais'].tolist(),
+    ):
+        yield BARRA_PROGRESSO.format(
+            nome=nome[:20],
+            largura=realizado / max_horas * 100,
+            cor=_cor_percentual(percentual),
+            percentual=percentual,
+            realizado=int(realizado),
+            planejado=int(planejado),
+        )
+
+
+def _iter_ritmo(df_pace, parametros):
+    max_ritmo = max(df_pace['Ritmo_Necessario'].max(), parametros.faixas[-1])
+    linha_ideal = parametros.ritmo_ideal / max_ritmo * 100
+    linha_maxima = parametros.ritmo_maximo / max_ritmo * 100
+    codigos = classify_pace(df_pace['Ritmo_Necessario'].to_numpy(), parametros.faixas).tolist()
+    for nome, ritmo, codigo in zip(df_pace['Colaborador(a)'].tolist(), df_pace['Ritmo_Necessario'].tolist(), codigos):
+        yield BARRA_RITMO.format(
+            nome=nome[:18],
+            largura=min((ritmo / max_ritmo * 100), 100) if ritmo > 0 else 0,
+            cor=str(CORES_FAIXA[codigo]),
+            linha_ideal=linha_ideal,
+            linha_maxima=linha_maxima,
+            icone=ICONES_FAIXA[codigo],
+            ritmo=ritmo,
+        )
+
+
+def render_collaborator_section(nome, percentual, planejado, realizado, pendente, ritmo, cursos,
+                                faixas=PARAMETROS_PADRAO.faixas):
+    """HTML do cartão de um colaborador
+
+    `cursos` é uma lista de tuplas (curso, carga horária, status) e `faixas`
+    os limites das faixas de ritmo (PaceParams.faixas).
+    """
+    status = [s for _, _, s in cursos]
+    cor = _cor_percentual(percentual)
+
+    partes = [CARTAO_COLABORADOR.format(
+        nome=nome,
+        cor=cor,
+        percentual=percentual,
+        largura=min(percentual, 100),
+        planejado=int(planejado),
+        realizado=int(realizado),
+        pendente=int(pendente),
+        cor_ritmo=_cor_ritmo_cartao(ritmo, faixas),
+        ritmo=ritmo,
+        concluidos=status.count('Concluído'),
+        andamento=status.count('Em Andamento'),
+        pendentes=status.count('Pendente'),
+    )]
+    for curso, carga, situacao in cursos:
+        curso = str(curso)
+        partes.append(LINHA_CURSO.format(
+            curso=curso[:50] + ('...' if len(curso) > 50 else ''),
+            carga=int(carga),
+            classe=CLASSES_STATUS.get(situacao, 'status-red'),
+            icone=ICONES_STATUS.get(situacao, '❌'),
+        ))
+    partes.append(FIM_CARTAO)
+    return ''.join(partes)
+
+
+def _render_args(args):
+    return render_collaborator_section(*args)
+
+
+def _iter_detalhamento(df_ordenado, grupos, ritmo_por_colab, faixas, workers=1):
+    # Argumentos de cada cartão (só tipos simples, para enviar aos processos),
+    # montados numa passada só: os cursos de todos vêm do índice de uma vez
+    cursos_por_colab = grupos.records(['Curso', 'Carga Horária', 'Status'])
+    chaves = collaborator_index(df_ordenado)
+    args = [
+        (nome, percentual, planejado, realizado, pendente, ritmo, cursos_por_colab.get(chave, []), faixas)
+        for chave, nome, percentual, planejado, realizado, pendente, ritmo in zip(
+            chaves.tolist(),
+            df_ordenado['Colaborador(a)'].tolist(),
+            df_ordenado['Percentual'].tolist(),
+            df_ordenado['horas totais'].tolist(),
+            df_ordenado['Horas_Realizadas'].tolist(),
+            df_ordenado['Horas_Pendentes'].tolist(),
+            ritmo_por_colab.reindex(chaves).astype(float).tolist(),
+        )
+    ]
+
+    minimo = min_colaboradores_paralelo(workers)
+    if minimo is not None and len(args) >= minimo:
+        pool = ProcessPoolExecutor(max_workers=workers)
+        try:
+            # map devolve os cartões na ordem original
+            cartoes = pool.map(_render_args, args, chunksize=max(1, len(args) // (workers * 4)))
+            yield from _paginar(cartoes)
+        finally:
+            # Se a geração for interrompida (job cancelado), não espera os cartões pendentes
+            pool.shutdown(wait=False, cancel_futures=True)
+    else:
+        yield from _paginar(map(_render_args, args))
+
+
+def _paginar(cartoes):
+    for i, cartao in enumerate(cartoes):
+        if i > 0 and i % CARTOES_POR_PAGINA == 0:
+            yield QUEBRA_PAGINA
+        yield cartao
+
+
+def iter_report(df_merged, df_real, percentual_geral, total_realizado, total_planejado,
+                grupos, dias_totais, dias_uteis, workers=1, cube=None, parametros=PARAMETROS_PADRAO):
+    """Gera o relatório HTML em pedaços, na ordem do documento
+
+    `grupos` é o GroupIndex dos cursos por colaborador (com a chave de
+    pipeline.collaborator_key_columns). Com `workers`
+    maior que 1, os cartões do detalhamento são renderizados em paralelo.
+    `cube` é o KpiCube do dataset (montado aqui se não for informado) e
+    `parametros` o cenário do prazo (pace.PaceParams).
+    """
+    # Encontra melhores e piores desempenhos
+    melhor = df_merged.loc[df_merged['Percentual'].idxmax()]
+    pior = df_merged.loc[df_merged['Percentual'].idxmin()]
+
+    # Prepara dados de ritmo
+    base = pace_base(df_merged)
+    df_pace = df_merged.copy()
+    df_pace['Horas_Restantes'] = base.horas_restantes
+    df_pace['Ritmo_Necessario'] = compute_pace(base, dias_uteis, parametros.faixas)[0]
+    df_pace = df_pace.sort_values('Ritmo_Necessario', ascending=False)
+    ritmo_por_colab = df_pace.set_index(collaborator_index(df_pace))['Ritmo_Necessario']
+    ritmo_por_colab = ritmo_por_colab[~ritmo_por_colab.index.duplicated()]
+
+    # Contagem de status
+    if cube is None:
+        cube = build_kpi_cube(df_merged, df_real)
+    contagem = cube.cursos_por_status
+
+    # Críticos (acima do ritmo máximo do cenário)
+    criticos = int((df_pace['Ritmo_Necessario'] > parametros.ritmo_maximo).sum())
+
+    yield CABECALHO.format(
+        gerado_em=datetime.now().strftime('%d/%m/%Y às %H:%M'),
+        prazo=parametros.data_limite.strftime('%d/%m/%Y'),
+        fator_efetivo=parametros.fator_efetivo,
+        total_realizado=int(total_realizado),
+        total_planejado=int(total_planejado),
+        percentual_geral=percentual_geral,
+        dias_totais=dias_totais,
+        dias_uteis=dias_uteis,
+        n_colaboradores=len(df_merged),
+        horas_pendentes=int(total_planejado - total_realizado),
+        classe_progresso='green' if percentual_geral >= 50 else 'red',
+        classe_criticos='green' if criticos == 0 else 'red',
+        criticos=criticos,
+        melhor_nome=melhor['Colaborador(a)'],
+        melhor_percentual=melhor['Percentual'],
+        melhor_realizado=int(melhor['Horas_Realizadas']),
+        melhor_planejado=int(melhor['horas totais']),
+        pior_nome=pior['Colaborador(a)'],
+        pior_percentual=pior['Percentual'],
+        pior_realizado=int(pior['Horas_Realizadas']),
+        pior_planejado=int(pior['horas totais']),
+        cursos_concluidos=int(contagem.get('Concluído', 0)),
+        cursos_andamento=int(contagem.get('Em Andamento', 0)),
+        cursos_pendentes=int(contagem.get('Pendente', 0)),
+    )
+
+    df_ordenado = df_merged.sort_values('Percentual', ascending=False)
+
+    # Gráfico de barras - Progresso
+    yield from _iter_progresso(df_ordenado)
+    yield INICIO_RITMO
+
+    # Gráfico de ritmo
+    yield from _iter_ritmo(df_pace, parametros)
+    yield INICIO_DETALHAMENTO.format(**dict(zip(('f1', 'f2', 'f3', 'f4'), parametros.faixas)))
+
+    # Detalhamento compacto
+    yield from _iter_detalhamento(df_ordenado, grupos, ritmo_por_colab, parametros.faixas, workers)
+    yield RODAPE
+
+
+def report_chunk_count(n_colaboradores):
+    """Quantos pedaços o iter_report gera para `n_colaboradores` (base do progresso)"""
+    # Cabeçalho, início do ritmo, início do detalhamento e rodapé, mais três
+    # pedaços por colaborador (progresso, ritmo e cartão) e as quebras de página
+    return 4 + 3 * n_colaboradores + max(n_colaboradores - 1, 0) // CARTOES_POR_PAGINA
+
+
+def _com_progresso(chunks, total, progresso):
+    for feitos, chunk in enumerate(chunks, 1):
+        progresso(feitos, total)
+        yield chunk
+
+
+def write_report(output, chunks, encoding=None):
+    """Grava os pedaços do relatório em um arquivo aberto, sem acumulá-los
+
+    Com `encoding`, o arquivo é binário e cada pedaço é codificado ao ser gravado.
+    """
+    if encoding is None:
+        for chunk in chunks:
+            output.write(chunk)
+    else:
+        for chunk in chunks:
+            output.write(chunk.encode(encoding))
+    return output
+
+
+def generate_pdf_content(df_merged, df_real, percentual_geral, total_realizado, total_planejado, grupos=None,
+                         output=None, workers=None, cube=None, parametros=None, progresso=None, encoding=None):
+    """Gera conteúdo HTML para PDF com gráficos
+
+    Sem `output`, retorna o HTML como string. Com um arquivo texto em `output`,
+    grava o relatório nele pedaço a pedaço (sem montar a string inteira) e
+    retorna o próprio arquivo; com `encoding`, `output` é um arquivo binário e
+    recebe os pedaços já codificados. `workers` (padrão: RELATORIO_WORKERS) define
+    quantos processos renderizam o detalhamento por colaborador. `cube` é o
+    KpiCube do dataset, se já tiver sido montado, e `parametros` o cenário do
+    prazo (padrão: pace.PARAMETROS_PADRAO). `progresso(feitos, total)` é
+    chamado a cada pedaço; uma exceção levantada nele interrompe a geração.
+    """
+    if grupos is None:
+        grupos = GroupIndex(df_real)
+    parametros = parametros or PARAMETROS_PADRAO
+
+    # Dias corridos e dias efetivos (fração dos dias úteis) até o prazo
+    dias_totais, _, dias_uteis = deadline_days(parametros, regiao=REGIAO_FERIADOS)
+
+    chunks = iter_report(
+        df_merged, df_real, percentual_geral, total_realizado, total_planejado,
+        grupos, dias_totais, dias_uteis,
+        workers=RELATORIO_WORKERS if workers is None else workers, cube=cube, parametros=parametros
+    )
+    if progresso is not None:
+        chunks = _com_progresso(chunks, report_chunk_count(len(df_merged)), progresso)
+    if output is None:
+        return ''.join(chunks)
+    return write_report(output, chunks, encoding)
@@ -0,0 +1,39 @@
+import pandas as pd
+from openpyxl import Workbook
+
+from excel_reader import normalize_ids
+from pipeline import load_data, process_data
+
+
+def _planilha(caminho, ids_plano, ids_real):
+    wb = Workbook()
+    plano = wb.active
+    plano.title = 'Plano'
+    plano.append(['Id colaborador(a)', 'Colaborador(a)', 'horas totais'])
+    for id_colab, nome in zip(ids_plano, ['Ana', 'Bia']):
+        plano.append([id_colab, nome, 40])
+    real = wb.create_sheet('Real')
+    real.append(['Id colaborador(a)', 'Colaborador(a)', 'Curso', 'Carga Horária', 'Finalizou o curso?', 'Data de início'])
+    for id_colab, nome, resposta in zip(ids_real, ['Ana', 'Bia'], ['Sim', 'Não']):
+        real.append([id_colab, nome, f'Curso {nome}', 10, resposta, '-'])
+    wb.save(caminho)
+    return caminho
+
+
+def test_id_como_texto_em_uma_aba(tmp_path):
+    caminho = _planilha(tmp_path / 'ids.xlsx', ['101', '102'], [101, 102])
+    for streaming in (True, False):
+        with open(caminho, 'rb') as arquivo:
+            df_plano, df_real = load_data(arquivo, streaming=streaming)
+        df_merged, _ = process_data(df_plano, df_real)
+        assert df_merged['Id colaborador(a)'].tolist() == [101, 102]
+        assert df_merged['Horas_Realizadas'].tolist() == [10, 0]
+
+
+def test_ids_nao_numericos_viram_texto_nas_duas_abas():
+    df_plano = pd.DataFrame({'Id colaborador(a)': ['A1', 102]})
+    df_real = pd.DataFrame({'Id colaborador(a)': ['A1', 102.0, None]})
+    df_plano, df_real = normalize_ids(df_plano, df_real)
+    assert df_plano['Id colaborador(a)'].tolist() == ['A1', '102']
+    assert df_real['Id colaborador(a)'].tolist()[:2] == ['A1', '102']
+    assert df_real['Id colaborador(a)'].isna().iloc[2]
@@ -0,0 +1,58 @@
+import sqlite3
+from datetime import date
+
+import pandas as pd
+
+import history
+from kpis import build_kpi_cube
+from pipeline import process_data
+
+
+def _dataset(horas_realizadas, departamento=None):
+    df_plano = pd.DataFrame({
+        'Id colaborador(a)': [1, 2],
+        'Colaborador(a)': ['Colaborador 1', 'Colaborador 1'],
+        'horas totais': [40, 40],
+    })
+    df_real = pd.DataFrame({
+        'Id colaborador(a)': [1, 2],
+        'Colaborador(a)': ['Colaborador 1', 'Colaborador 1'],
+        'Curso': ['Curso A', 'Curso A'],
+        'Carga Horária': [horas_realizadas, 10],
+        'Finalizou o curso?': ['Sim', 'Não'],
+    })
+    df_merged, df_real = process_data(df_plano, df_real)
+    if departamento is not None:
+        df_merged['Departamento'] = departamento
+        df_real['Departamento'] = departamento
+    return df_merged, build_kpi_cube(df_merged, df_real)
+
+
+def test_evolucao_separada_por_fonte_e_por_id(tmp_path):
+    caminho = str(tmp_path / 'historico.sqlite3')
+    for chave, horas, dia in (('a1', 10, 1), ('a2', 20, 2)):
+        df_merged, cube = _dataset(horas)
+        history.record_snapshot(chave, df_merged, cube, fonte='equipe', data_referencia=date(2026, 5, dia), caminho=caminho)
+    df_merged, cube = _dataset(30, departamento='DeptA')
+    history.record_snapshot('b1', df_merged, cube, fonte='DeptA + DeptB', caminho=caminho)
+
+    assert len(history.team_trend('equipe', caminho=caminho)) == 2
+    assert len(history.team_trend('DeptA + DeptB', caminho=caminho)) == 1
+    assert set(history.list_collaborators('equipe', caminho=caminho)) == {('1', None), ('2', None)}
+
+    # Mesmo nome, Ids diferentes: cada um tem a sua evolução
+    evolucao = history.collaborator_trend(('1', None), 'equipe', caminho=caminho)
+    assert evolucao['total_realizado'].tolist() == [10, 20]
+    evolucao = history.collaborator_trend(('1', 'DeptA'), 'DeptA + DeptB', caminho=caminho)
+    assert evolucao['total_realizado'].tolist() == [30]
+
+
+def test_banco_antigo_ganha_a_coluna_fonte(tmp_path):
+    caminho = str(tmp_path / 'historico.sqlite3')
+    esquema_antigo = history.ESQUEMA.replace("    fonte TEXT NOT NULL DEFAULT '',\n", '')
+    assert 'fonte' not in esquema_antigo
+    with sqlite3.connect(caminho) as conexao:
+        conexao.executescript(esquema_antigo)
+    df_merged, cube = _dataset(10)
+    assert history.record_snapshot('a1', df_merged, cube, fonte='equipe', caminho=caminho)
+    assert len(history.team_trend('equipe', caminho=caminho)) == 1
@@ -0,0 +1,45 @@
+import pandas as pd
+
+from incremental import Snapshot, diff_snapshots, summarize_changes
+from pipeline import compact_frames, process_data
+
+
+def _departamento(horas_curso_2):
+    df_plano = pd.DataFrame({
+        'Id colaborador(a)': [1, 2],
+        'Colaborador(a)': ['Colaborador 1', 'Colaborador 2'],
+        'horas totais': [40, 40],
+    })
+    df_real = pd.DataFrame({
+        'Id colaborador(a)': [1, 1, 2],
+        'Colaborador(a)': ['Colaborador 1', 'Colaborador 1', 'Colaborador 2'],
+        'Curso': ['Curso A', 'Curso B', 'Curso A'],
+        'Carga Horária': [5, horas_curso_2, 12],
+        'Finalizou o curso?': ['Sim', 'Sim', 'Não'],
+    })
+    return process_data(df_plano, df_real)
+
+
+def _consolidado(horas_curso_2_dept_a):
+    frames = [
+        (nome, _departamento(horas))
+        for nome, horas in (('DeptA', horas_curso_2_dept_a), ('DeptB', 12))
+    ]
+    df_merged = pd.concat([m.assign(Departamento=nome) for nome, (m, _) in frames], ignore_index=True)
+    df_real = pd.concat([r.assign(Departamento=nome) for nome, (_, r) in frames], ignore_index=True)
+    return compact_frames(df_merged, df_real)[:2]
+
+
+def test_ids_repetidos_entre_departamentos():
+    anterior = Snapshot('antes', *_consolidado(5))
+    df_merged, df_real = _consolidado(12)
+
+    mudancas = diff_snapshots(anterior, df_merged, df_real)
+    assert mudancas.colaboradores == {('DeptA', 1)}
+    assert mudancas.linhas_alteradas == 1
+    assert mudancas.afetados(df_merged).tolist() == [True, False, False, False]
+
+    resumo = summarize_changes(anterior.df_merged, df_merged, mudancas)
+    assert len(resumo) == 1
+    assert resumo['Departamento'].tolist() == ['DeptA']
+    assert resumo['Δ Horas'].tolist() == [7]